@@ -0,0 +1,923 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for streaming processed data out of the database into archives.
+"""
+from __future__ import unicode_literals
+import io
+import os
+import sys
+import gzip
+import json
+import time
+import zlib
+import struct
+import shutil
+import hashlib
+import tempfile
+import threading
+from functools import partial
+from contextlib import contextmanager
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, models
+from django.utils import six
+from django.utils.six.moves import queue
+from calaccess_processed.uploads import get_part_size, get_part_store, upload_archive
+
+# Size of the chunks handed from the database to the archives
+CHUNK_SIZE = 64 * 1024
+
+# ZipFile can only write a member from a stream in Python 3.6 and later
+ZIP_STREAMING = sys.version_info >= (3, 6)
+
+# and only sets the compression level in Python 3.7 and later
+ZIP_LEVELS = sys.version_info >= (3, 7)
+
+# Rows in each row group of a Parquet file, which are held in memory while writing
+PARQUET_ROW_GROUP_SIZE = 100000
+
+# Extensions added to the names of processed files archived with each compression
+ARCHIVE_EXTENSIONS = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Layouts of the ZIP records written without ZipFile, from section 4.3 of PKWARE's APPNOTE.TXT:
+# signature, version needed, flags, compression, time, date, CRC-32, compressed and uncompressed size,
+# file name length, extra field length
+ZIP_LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+ZIP_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+# signature, version made by, version needed, flags, compression, time, date, CRC-32, compressed and
+# uncompressed size, file name, extra field and comment lengths, first disk, internal and external
+# attributes, offset of the local header
+ZIP_CENTRAL_HEADER = struct.Struct('<4s6H3I5H2I')
+ZIP_CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+# signature, size of the rest of the record, version made by, version needed, this disk, first disk,
+# entries on this disk, entries, central directory size, central directory offset
+ZIP64_END_RECORD = struct.Struct('<4sQ2H2I4Q')
+ZIP64_END_RECORD_SIGNATURE = b'PK\x06\x06'
+# signature, first disk, offset of the ZIP64 end record, disks
+ZIP64_END_LOCATOR = struct.Struct('<4sIQI')
+ZIP64_END_LOCATOR_SIGNATURE = b'PK\x06\x07'
+# signature, this disk, first disk, entries on this disk, entries, central directory size,
+# central directory offset, comment length
+ZIP_END_RECORD = struct.Struct('<4s4H2IH')
+ZIP_END_RECORD_SIGNATURE = b'PK\x05\x06'
+# ID of the extra field holding the sizes and offsets too big for the records above
+ZIP64_EXTRA_ID = 0x0001
+# Sizes, offsets and counts past these are stored in ZIP64 records, as ZipFile does
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+# Versions needed to extract members with and without ZIP64 records
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+# Flag for file names encoded as UTF-8
+ZIP_UTF8_FLAG = 0x800
+
+
+class StreamPipe(object):
+    """
+    A file-like pipe handing bytes written in one thread to a reader in another.
+
+    At most max_chunks chunks are held at once, so a writer that gets ahead of
+    its reader waits instead of filling up memory.
+    """
+    def __init__(self, max_chunks=16):
+        """
+        Set up an empty pipe.
+        """
+        self.queue = queue.Queue(max_chunks)
+        self.buffer = b''
+        self.finished = False
+        self.abandoned = False
+
+    def put(self, item):
+        """
+        Add an item to the queue, waiting while it's full unless the reader stops reading.
+
+        Returns False if the reader stopped reading.
+        """
+        while not self.abandoned:
+            try:
+                self.queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def write(self, data):
+        """
+        Add a chunk of bytes to the pipe, waiting while it's full.
+        """
+        if not self.put(data):
+            raise IOError("Reader of the pipe stopped reading")
+
+    def close(self, error=None):
+        """
+        Signal the reader that no more bytes are coming, or that the writer failed with error.
+        """
+        self.put(error or b'')
+
+    def abandon(self):
+        """
+        Signal the writer that the reader has stopped reading.
+        """
+        self.abandoned = True
+
+    def read(self, size=-1):
+        """
+        Return up to size bytes from the pipe, or all the rest if size is negative.
+        """
+        while not self.finished and (size < 0 or len(self.buffer) < size):
+            chunk = self.queue.get()
+            if isinstance(chunk, Exception):
+                self.finished = True
+                raise IOError("Writer to the pipe failed: %s" % chunk)
+            elif not chunk:
+                self.finished = True
+            else:
+                self.buffer += chunk
+        if size < 0:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+class TeeWriter(object):
+    """
+    A file-like object that writes what it's given to several others in chunks.
+    """
+    def __init__(self, *targets):
+        """
+        Set up writing to the target file-like objects.
+        """
+        self.targets = targets
+        self.pending = []
+        self.pending_size = 0
+        self.size = 0
+
+    def write(self, data):
+        """
+        Collect data, writing it to the targets once there's a full chunk.
+        """
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        self.pending.append(data)
+        self.pending_size += len(data)
+        if self.pending_size >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Write any collected data to the targets.
+        """
+        if self.pending:
+            chunk = b''.join(self.pending)
+            for target in self.targets:
+                target.write(chunk)
+            self.size += len(chunk)
+            self.pending = []
+            self.pending_size = 0
+
+
+class HashWriter(object):
+    """
+    A file-like object that keeps a running hash of what's written to it and nothing else.
+    """
+    def __init__(self, algorithm='sha256'):
+        """
+        Start an empty hash.
+        """
+        self.hash = hashlib.new(algorithm)
+
+    def write(self, data):
+        """
+        Add data to the hash.
+        """
+        self.hash.update(data)
+
+    def hexdigest(self):
+        """
+        Return the hex digest of everything written so far.
+        """
+        return self.hash.hexdigest()
+
+
+def get_compressor(compression):
+    """
+    Return a new compressor, with compress and flush methods, for the named compression.
+    """
+    if compression == 'gzip':
+        # A deflate stream with a gzip header and trailer
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor().compressobj()
+    raise ValueError("Unknown compression: %s" % compression)
+
+
+class CompressWriter(object):
+    """
+    A file-like object that compresses what it's given and writes it to another.
+    """
+    def __init__(self, target, compression):
+        """
+        Set up writing to the target file-like object with the named compression.
+        """
+        self.target = target
+        self.compressor = get_compressor(compression)
+        self.size = 0
+
+    def write(self, data):
+        """
+        Compress data and write whatever the compressor has ready to the target.
+        """
+        self.write_compressed(self.compressor.compress(data))
+
+    def close(self):
+        """
+        Write the end of the compressed stream to the target, without closing it.
+        """
+        self.write_compressed(self.compressor.flush())
+
+    def write_compressed(self, data):
+        """
+        Write compressed data to the target.
+        """
+        if data:
+            self.target.write(data)
+            self.size += len(data)
+
+
+class CompressReader(object):
+    """
+    A file-like object that reads another file's bytes compressed.
+    """
+    def __init__(self, src, compression):
+        """
+        Set up reading from the src file-like object with the named compression.
+        """
+        self.src = src
+        self.compressor = get_compressor(compression)
+        self.buffer = b''
+        self.finished = False
+        self.size = 0
+
+    def read(self, size=-1):
+        """
+        Return up to size compressed bytes, or all the rest if size is negative.
+        """
+        while not self.finished and (size < 0 or len(self.buffer) < size):
+            data = self.src.read(CHUNK_SIZE)
+            if data:
+                self.buffer += self.compressor.compress(data)
+            else:
+                self.buffer += self.compressor.flush()
+                self.finished = True
+        if size < 0:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.size += len(data)
+        return data
+
+
+@contextmanager
+def open_archive(processed_file):
+    """
+    Open a processed file's archive for reading the .csv in it, decompressing it if needed.
+    """
+    file_archive = processed_file.file_archive
+    file_archive.open('rb')
+    try:
+        if processed_file.archive_compression == 'gzip':
+            yield gzip.GzipFile(fileobj=file_archive, mode='rb')
+        elif processed_file.archive_compression == 'zstd':
+            import zstandard
+            yield io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(file_archive), CHUNK_SIZE)
+        else:
+            yield file_archive
+    finally:
+        file_archive.close()
+
+
+def get_zip_compression():
+    """
+    Return a tuple (compression type, compression level) for members of processed ZIP archives.
+
+    The level comes from the CALACCESS_ZIP_COMPRESSION_LEVEL setting, from 1 (fastest)
+    to 9 (smallest), defaulting to zlib's 6. Level 0 stores members uncompressed.
+    """
+    level = getattr(settings, 'CALACCESS_ZIP_COMPRESSION_LEVEL', 6)
+    if level == 0:
+        return ZIP_STORED, None
+    return ZIP_DEFLATED, level
+
+
+def open_zip(zip_path, mode):
+    """
+    Open the ZIP archive at zip_path with the processed archives' compression.
+    """
+    compression, level = get_zip_compression()
+    if ZIP_LEVELS and level is not None:
+        return ZipFile(zip_path, mode, compression, allowZip64=True, compresslevel=level)
+    return ZipFile(zip_path, mode, compression, allowZip64=True)
+
+
+def open_zip_member(zip_path, name):
+    """
+    Open a new member of the ZIP archive at zip_path for writing.
+
+    The archive is created if it doesn't exist. Returns a tuple (archive, member).
+    """
+    zf = open_zip(zip_path, 'a' if os.path.exists(zip_path) else 'w')
+    return zf, zf.open(name, 'w', force_zip64=True)
+
+
+def can_stream(storage):
+    """
+    Return whether a storage backend can save a file from a stream it can't seek.
+
+    FileSystemStorage reads what it saves from start to finish. Other backends,
+    like S3Boto3Storage, seek back to the start first.
+    """
+    if not isinstance(storage, FileSystemStorage):
+        return False
+    # Subclasses may save differently
+    return six.get_unbound_function(type(storage)._save) is six.get_unbound_function(FileSystemStorage._save)
+
+
+def spool(content):
+    """
+    Copy everything read from the file-like object content to a temporary file, and return it open at the start.
+    """
+    tmp_file = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(content, tmp_file, CHUNK_SIZE)
+        tmp_file.seek(0)
+    except Exception:
+        tmp_file.close()
+        raise
+    return tmp_file
+
+
+def save_archive(field_file, archive_name, content):
+    """
+    Save the contents of the file-like object content to a processed file's archive field's storage.
+
+    Backends that can't save from a stream get a seekable temporary copy of the
+    content. Returns the name of the saved file.
+    """
+    storage = field_file.storage
+    spooled = None if can_stream(storage) else spool(content)
+    try:
+        return storage.save(
+            archive_name,
+            File(spooled or content, name=os.path.basename(archive_name)),
+            max_length=field_file.field.max_length,
+        )
+    finally:
+        if spooled:
+            spooled.close()
+
+
+def copy_archive(field_file, archive_name, source_name):
+    """
+    Copy an archive already in a processed file's archive field's storage to a new name.
+
+    Each version gets its own copy, so removing an earlier version's archives
+    never removes a later one's. Backends that can copy or link their objects
+    do it themselves, without the data being uploaded again. Returns the name of
+    the copy.
+    """
+    storage = field_file.storage
+    store = get_part_store(storage)
+    if store is None:
+        with storage.open(source_name, 'rb') as source:
+            return save_archive(field_file, archive_name, source)
+    name = storage.get_available_name(archive_name, max_length=field_file.field.max_length)
+    store.copy(source_name, name)
+    return name
+
+
+def export_to_archive(copy_sql, processed_file, file_name, zip_path, csv_path, previous_file=None,
+                      compression=None):
+    """
+    Stream the output of a COPY ... TO STDOUT query into a processed file's archive.
+
+    The same bytes are written to a new member of the ZIP archive at zip_path
+    in the same pass. If zip_path is None, or Python can't stream into a ZIP
+    archive, they're written to the local file at csv_path instead, to be
+    zipped later.
+
+    If compression is 'gzip' or 'zstd', the archive is compressed as it's
+    written and its name gets the matching extension. The processed file's
+    archive_compression and archive_size are set to match.
+
+    The SHA-256 hash of the uncompressed bytes is set as processed_file's
+    file_hash. If previous_file, the same file in an earlier version, has a
+    hash and the same compression, the upload waits until the hash is known,
+    and a file with the same contents gets a copy of previous_file's archive
+    made by the storage backend instead of uploading the data again.
+
+    The archive is saved without saving processed_file. Returns a tuple
+    (rows copied or -1 if unknown, bytes copied).
+    """
+    pipe = StreamPipe()
+    hasher = HashWriter()
+    errors = []
+    saved_names = []
+    compression = compression or ''
+
+    # Work out the archive's name here, since it may need the database
+    file_archive = processed_file.file_archive
+    archive_file_name = file_name + ARCHIVE_EXTENSIONS.get(compression, '')
+    archive_name = file_archive.field.generate_filename(processed_file, archive_file_name)
+
+    # Large archives can be uploaded in parts, which a retry can pick up from
+    part_size = get_part_size()
+    part_store = get_part_store(file_archive.storage) if part_size else None
+
+    def save(content):
+        try:
+            if part_store:
+                saved_names.append(
+                    upload_archive(processed_file, file_archive, archive_name, content, part_store, part_size)
+                )
+            else:
+                saved_names.append(save_archive(file_archive, archive_name, content))
+        except Exception as e:
+            errors.append(e)
+            pipe.abandon()
+
+    def save_in_thread(content):
+        try:
+            save(content)
+        finally:
+            # Uploads in parts record them over the thread's own database connection, so don't leave it open
+            connection.close()
+
+    # Upload while copying, unless the file may turn out to be unchanged
+    deferred = bool(previous_file and previous_file.file_hash and previous_file.file_archive)
+    deferred = deferred and previous_file.archive_compression == compression
+    if not deferred:
+        storage_thread = threading.Thread(target=save_in_thread, args=(pipe,))
+        storage_thread.start()
+
+    if zip_path and ZIP_STREAMING:
+        zf, local_file = open_zip_member(zip_path, file_name)
+    else:
+        zf, local_file = None, open(csv_path, 'wb')
+
+    upload = CompressWriter(pipe, compression) if compression else pipe
+    writer = TeeWriter(hasher, local_file) if deferred else TeeWriter(upload, hasher, local_file)
+    error = None
+    try:
+        with connection.cursor() as c:
+            c.cursor.copy_expert(copy_sql, writer)
+            rowcount = c.cursor.rowcount
+        writer.flush()
+        if compression and not deferred:
+            upload.close()
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        local_file.close()
+        if zf:
+            zf.close()
+        if not deferred:
+            pipe.close(error)
+            storage_thread.join()
+            # The copy stops when the storage backend stops reading, so raise the backend's error
+            if error is not None and errors:
+                raise errors[0]
+
+    processed_file.file_hash = hasher.hexdigest()
+    processed_file.archive_compression = compression
+    processed_file.archive_size = upload.size if compression else writer.size
+    if deferred:
+        if processed_file.file_hash == previous_file.file_hash:
+            saved_names.append(copy_archive(file_archive, archive_name, previous_file.file_archive.name))
+            processed_file.archive_size = previous_file.archive_size
+        else:
+            if zf:
+                # Upload the member just written, the last in the ZIP archive with its name
+                zf = ZipFile(zip_path)
+                local_file = zf.open(file_name)
+            else:
+                local_file = open(csv_path, 'rb')
+            try:
+                upload = CompressReader(local_file, compression) if compression else local_file
+                save(upload)
+                if compression:
+                    processed_file.archive_size = upload.size
+            finally:
+                local_file.close()
+                if zf:
+                    zf.close()
+
+    if errors:
+        raise errors[0]
+    file_archive.name = saved_names[0]
+    return rowcount, writer.size
+
+
+def compress_file(compression, level, path):
+    """
+    Compress the file at path for a ZIP archive into a temporary file beside it.
+
+    Returns a tuple (path, temporary file path, CRC-32, compressed size, uncompressed size).
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix='.zip-member', dir=os.path.dirname(path))
+    crc = 0
+    file_size = 0
+    # A raw deflate stream, without a zlib header, as ZIP archives expect
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if compression == ZIP_DEFLATED else None
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file, open(path, 'rb') as src:
+            while True:
+                data = src.read(CHUNK_SIZE)
+                if not data:
+                    break
+                crc = zlib.crc32(data, crc)
+                file_size += len(data)
+                tmp_file.write(compressor.compress(data) if compressor else data)
+            if compressor:
+                tmp_file.write(compressor.flush())
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return path, tmp_path, crc & 0xffffffff, os.path.getsize(tmp_path), file_size
+
+
+def get_zip_end_offset(fp):
+    """
+    Return the offset of the central directory of the ZIP archive open as fp, where its members end.
+    """
+    fp.seek(0, os.SEEK_END)
+    size = fp.tell()
+    # The end record is last, followed only by a comment of up to 64 KB
+    tail_size = min(size, ZIP_END_RECORD.size + 0xFFFF)
+    fp.seek(size - tail_size)
+    tail = fp.read(tail_size)
+    position = tail.rfind(ZIP_END_RECORD_SIGNATURE)
+    if position < 0:
+        raise IOError("No end of central directory record found")
+    offset = ZIP_END_RECORD.unpack(tail[position:position + ZIP_END_RECORD.size])[6]
+
+    # Archives with ZIP64 records locate theirs just before the end record
+    position -= ZIP64_END_LOCATOR.size
+    if position >= 0 and tail[position:position + 4] == ZIP64_END_LOCATOR_SIGNATURE:
+        record_offset = ZIP64_END_LOCATOR.unpack(tail[position:position + ZIP64_END_LOCATOR.size])[2]
+        fp.seek(record_offset)
+        offset = ZIP64_END_RECORD.unpack(fp.read(ZIP64_END_RECORD.size))[9]
+    return offset
+
+
+def get_zip_data_offset(fp, zinfo):
+    """
+    Return the offset of the compressed data of the member zinfo in the ZIP archive open as fp.
+    """
+    fp.seek(zinfo.header_offset)
+    header = ZIP_LOCAL_HEADER.unpack(fp.read(ZIP_LOCAL_HEADER.size))
+    if header[0] != ZIP_LOCAL_HEADER_SIGNATURE:
+        raise IOError("Bad local header for %s" % zinfo.filename)
+    return zinfo.header_offset + ZIP_LOCAL_HEADER.size + header[9] + header[10]
+
+
+def encode_zip_name(zinfo):
+    """
+    Return the file name of a ZIP member as bytes, and its flags with the UTF-8 flag set to match.
+    """
+    if isinstance(zinfo.filename, bytes):
+        return zinfo.filename, zinfo.flag_bits
+    try:
+        return zinfo.filename.encode('ascii'), zinfo.flag_bits & ~ZIP_UTF8_FLAG
+    except UnicodeEncodeError:
+        return zinfo.filename.encode('utf-8'), zinfo.flag_bits | ZIP_UTF8_FLAG
+
+
+def strip_zip64_extra(extra):
+    """
+    Return the extra field of a ZIP member without its ZIP64 field, which is written again as needed.
+    """
+    fields = []
+    position = 0
+    while position + 4 <= len(extra):
+        field_id, length = struct.unpack('<2H', extra[position:position + 4])
+        if field_id != ZIP64_EXTRA_ID:
+            fields.append(extra[position:position + 4 + length])
+        position += 4 + length
+    return b''.join(fields)
+
+
+class RawZipWriter(object):
+    """
+    Appends members that are already compressed to a ZIP archive, without compressing them again.
+
+    ZipFile can't copy compressed data as it is, so the records around it are
+    written here as APPNOTE.TXT lays them out. Members already in the archive are
+    read with ZipFile and kept. Closing the writer writes the central directory
+    for every member, with ZIP64 records where sizes or offsets need them.
+    """
+    def __init__(self, zip_path):
+        """
+        Open the archive at zip_path, creating it if it doesn't exist.
+        """
+        self.members = []
+        self.comment = b''
+        if os.path.exists(zip_path):
+            with ZipFile(zip_path) as zf:
+                self.members = zf.infolist()
+                self.comment = zf.comment
+            self.fp = open(zip_path, 'r+b')
+            # New members replace the old central directory, which is written again on close
+            self.fp.seek(get_zip_end_offset(self.fp))
+            self.fp.truncate()
+        else:
+            self.fp = open(zip_path, 'wb')
+
+    def __enter__(self):
+        """
+        Return the writer.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the writer.
+        """
+        self.close()
+
+    def write(self, zinfo, src):
+        """
+        Append a member already compressed as zinfo describes.
+
+        zinfo needs its CRC, sizes and compression type set. Its compressed data is
+        copied from the file-like object src.
+        """
+        zinfo.flag_bits = 0
+        zinfo.header_offset = self.fp.tell()
+        zinfo.extra = b''
+        name, zinfo.flag_bits = encode_zip_name(zinfo)
+        if zinfo.file_size > ZIP64_LIMIT or zinfo.compress_size > ZIP64_LIMIT:
+            extra = struct.pack('<2H2Q', ZIP64_EXTRA_ID, 16, zinfo.file_size, zinfo.compress_size)
+            version, compress_size, file_size = ZIP64_VERSION, 0xFFFFFFFF, 0xFFFFFFFF
+        else:
+            extra = b''
+            version, compress_size, file_size = ZIP_VERSION, zinfo.compress_size, zinfo.file_size
+        zinfo.create_version = zinfo.extract_version = version
+        dos_date, dos_time = self.get_dos_date_time(zinfo)
+        self.fp.write(ZIP_LOCAL_HEADER.pack(
+            ZIP_LOCAL_HEADER_SIGNATURE, version, zinfo.flag_bits, zinfo.compress_type,
+            dos_time, dos_date, zinfo.CRC, compress_size, file_size, len(name), len(extra),
+        ))
+        self.fp.write(name)
+        self.fp.write(extra)
+
+        remaining = zinfo.compress_size
+        while remaining > 0:
+            data = src.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                raise IOError("Compressed data for %s ended early" % zinfo.filename)
+            self.fp.write(data)
+            remaining -= len(data)
+        self.members.append(zinfo)
+
+    @staticmethod
+    def get_dos_date_time(zinfo):
+        """
+        Return the date and time a ZIP member was modified, packed as MS-DOS does.
+        """
+        year, month, day, hour, minute, second = zinfo.date_time
+        return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+    def write_central_header(self, zinfo):
+        """
+        Write the central directory header of a member.
+        """
+        name, flags = encode_zip_name(zinfo)
+        # Sizes and offsets too big for the header go in a ZIP64 extra field, in this order
+        zip64 = [
+            value for value in (zinfo.file_size, zinfo.compress_size, zinfo.header_offset)
+            if value > ZIP64_LIMIT
+        ]
+        extra = strip_zip64_extra(zinfo.extra)
+        if zip64:
+            extra = struct.pack('<2H%dQ' % len(zip64), ZIP64_EXTRA_ID, 8 * len(zip64), *zip64) + extra
+        version = max(zinfo.extract_version, ZIP64_VERSION if zip64 else ZIP_VERSION)
+        comment = zinfo.comment or b''
+        dos_date, dos_time = self.get_dos_date_time(zinfo)
+        self.fp.write(ZIP_CENTRAL_HEADER.pack(
+            ZIP_CENTRAL_HEADER_SIGNATURE,
+            zinfo.create_system << 8 | max(zinfo.create_version, version),
+            version, flags, zinfo.compress_type, dos_time, dos_date, zinfo.CRC,
+            zinfo.compress_size if zinfo.compress_size <= ZIP64_LIMIT else 0xFFFFFFFF,
+            zinfo.file_size if zinfo.file_size <= ZIP64_LIMIT else 0xFFFFFFFF,
+            len(name), len(extra), len(comment), 0, zinfo.internal_attr, zinfo.external_attr,
+            zinfo.header_offset if zinfo.header_offset <= ZIP64_LIMIT else 0xFFFFFFFF,
+        ))
+        self.fp.write(name)
+        self.fp.write(extra)
+        self.fp.write(comment)
+
+    def close(self):
+        """
+        Write the central directory and the end records, then close the archive.
+        """
+        if self.fp is None:
+            return
+        try:
+            offset = self.fp.tell()
+            for zinfo in self.members:
+                self.write_central_header(zinfo)
+            size = self.fp.tell() - offset
+            count = len(self.members)
+
+            if count > ZIP_FILECOUNT_LIMIT or offset > ZIP64_LIMIT or size > ZIP64_LIMIT:
+                record_offset = self.fp.tell()
+                self.fp.write(ZIP64_END_RECORD.pack(
+                    ZIP64_END_RECORD_SIGNATURE, ZIP64_END_RECORD.size - 12,
+                    ZIP64_VERSION, ZIP64_VERSION, 0, 0, count, count, size, offset,
+                ))
+                self.fp.write(ZIP64_END_LOCATOR.pack(ZIP64_END_LOCATOR_SIGNATURE, 0, record_offset, 1))
+                count = min(count, 0xFFFF)
+                size = min(size, 0xFFFFFFFF)
+                offset = min(offset, 0xFFFFFFFF)
+            self.fp.write(ZIP_END_RECORD.pack(
+                ZIP_END_RECORD_SIGNATURE, 0, 0, count, count, size, offset, len(self.comment),
+            ))
+            self.fp.write(self.comment)
+        finally:
+            self.fp.close()
+            self.fp = None
+
+
+def add_files_to_zip(zip_path, files, processes=None):
+    """
+    Add local files to the ZIP archive at zip_path, compressing them at the same time.
+
+    files is a list of (path, name in archive) tuples. Each file is compressed in
+    a separate thread, up to the CALACCESS_ZIP_PROCESSES setting or the number of
+    CPUs at once, and added to the archive in order as soon as it's ready. The
+    result is a standard ZIP64 archive.
+    """
+    compression, level = get_zip_compression()
+    processes = min(processes or getattr(settings, 'CALACCESS_ZIP_PROCESSES', cpu_count()), len(files))
+    names = dict(files)
+    func = partial(compress_file, compression, level if level is not None else -1)
+
+    pool = ThreadPool(max(processes, 1))
+    try:
+        with RawZipWriter(zip_path) as writer:
+            for path, tmp_path, crc, compress_size, file_size in pool.imap(func, [p for p, n in files]):
+                try:
+                    st = os.stat(path)
+                    zinfo = ZipInfo(names[path], time.localtime(st.st_mtime)[:6])
+                    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+                    zinfo.compress_type = compression
+                    zinfo.CRC = crc
+                    zinfo.compress_size = compress_size
+                    zinfo.file_size = file_size
+                    with open(tmp_path, 'rb') as src:
+                        writer.write(zinfo, src)
+                finally:
+                    os.remove(tmp_path)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def compact_zip(zip_path):
+    """
+    Rewrite the ZIP archive at zip_path without older copies of members added more than once.
+
+    Archives appended to by more than one run can contain the same file twice.
+    The members kept are copied as they are, without being compressed again.
+    """
+    with ZipFile(zip_path) as zf:
+        names = zf.namelist()
+    if len(names) == len(set(names)):
+        return
+
+    tmp_path = '%s.tmp' % zip_path
+    with ZipFile(zip_path) as zf:
+        # Later members with the same name replace earlier ones
+        latest = dict((info.filename, info) for info in zf.infolist())
+    with open(zip_path, 'rb') as src, RawZipWriter(tmp_path) as writer:
+        for name in sorted(latest):
+            info = latest[name]
+            src.seek(get_zip_data_offset(src, info))
+            zinfo = ZipInfo(name, info.date_time)
+            zinfo.external_attr = info.external_attr
+            zinfo.compress_type = info.compress_type
+            zinfo.CRC = info.CRC
+            zinfo.compress_size = info.compress_size
+            zinfo.file_size = info.file_size
+            writer.write(zinfo, src)
+    os.rename(tmp_path, zip_path)
+
+
+def get_parquet_type(field):
+    """
+    Return the pyarrow data type for the values of a concrete model field.
+
+    Foreign keys take the type of the field they refer to. Values of fields
+    without a matching type, like arrays and JSON, are stored as strings.
+    """
+    import pyarrow as pa
+
+    if field.is_relation:
+        return get_parquet_type(field.target_field)
+    if isinstance(field, (models.BooleanField, models.NullBooleanField)):
+        return pa.bool_()
+    if isinstance(field, models.SmallIntegerField):
+        return pa.int16()
+    if isinstance(field, (models.BigIntegerField, models.BigAutoField)):
+        return pa.int64()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pa.int32()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    # DateTimeField is a subclass of DateField, so check it first
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def get_parquet_schema(model):
+    """
+    Return the pyarrow schema for a Parquet file of a model's concrete fields.
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        pa.field(f.column, get_parquet_type(f), nullable=True)
+        for f in model._meta.concrete_fields
+    ])
+
+
+def to_parquet_string(value):
+    """
+    Return a value as a string for a Parquet string column.
+    """
+    if value is None or isinstance(value, six.text_type):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return six.text_type(value)
+
+
+def export_to_parquet(model, path, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """
+    Write every row of a model to a compressed Parquet file at path.
+
+    Rows are read through a server-side cursor and written one row group at a
+    time, so only row_group_size rows are held in memory.
+
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = get_parquet_schema(model)
+    fields = model._meta.concrete_fields
+    strings = [schema.field(i).type == pa.string() for i in range(len(fields))]
+
+    def write_row_group(writer, rows):
+        columns = [
+            pa.array(
+                [to_parquet_string(r[i]) for r in rows] if strings[i] else [r[i] for r in rows],
+                type=schema.field(i).type,
+            ) for i in range(len(fields))
+        ]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    count = 0
+    rows = []
+    writer = pq.ParquetWriter(path, schema, compression='snappy')
+    try:
+        queryset = model._base_manager.order_by().values_list(*[f.attname for f in fields])
+        for row in queryset.iterator():
+            rows.append(row)
+            if len(rows) >= row_group_size:
+                write_row_group(writer, rows)
+                count += len(rows)
+                rows = []
+        if rows:
+            write_row_group(writer, rows)
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
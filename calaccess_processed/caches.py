@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Caches of near-static database objects looked up over and over while processing.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+
+# Most posts the post cache holds at once
+POST_CACHE_SIZE = 4096
+
+
+class IdentityCache(object):
+    """
+    Maps keys to database objects, so each is looked up only once.
+
+    Every lookup of the same key returns the same instance until the cache is
+    cleared. Commands clear it when they start, and after they flush or load the
+    objects it holds. If maxsize is set, the least recently used object is dropped
+    to make room for each new one past that many.
+    """
+    def __init__(self, maxsize=None):
+        """
+        Start with nothing cached.
+        """
+        self.maxsize = maxsize
+        self.objects = OrderedDict()
+
+    def get(self, key, lookup):
+        """
+        Return the object cached with key, calling lookup to get it if it's not cached.
+        """
+        try:
+            obj = self.objects.pop(key)
+        except KeyError:
+            obj = lookup()
+            if self.maxsize and len(self.objects) >= self.maxsize:
+                self.objects.popitem(last=False)
+        # The most recently used objects are kept at the end
+        self.objects[key] = obj
+        return obj
+
+    def __contains__(self, key):
+        """
+        Return whether an object is cached with key.
+        """
+        return key in self.objects
+
+    def clear(self):
+        """
+        Forget every cached object.
+        """
+        self.objects = OrderedDict()
+
+
+# OCD parties, organizations and divisions, and indexes of raw tables, kept for a whole command
+ocd_cache = IdentityCache()
+
+# OCD posts looked up by office name, which are many more
+post_cache = IdentityCache(maxsize=POST_CACHE_SIZE)
+
+
+def clear_caches():
+    """
+    Forget every cached OCD object and index.
+    """
+    ocd_cache.clear()
+    post_cache.clear()
@@ -3,9 +3,11 @@
 """
 Utilities for correcting raw data.
 """
-from .candidate_party import candidate_party
+from .candidate_party import CandidatePartyCorrections, candidate_party, candidate_party_corrections
 
 
 __all__ = (
+    'CandidatePartyCorrections',
     'candidate_party',
+    'candidate_party_corrections',
 )
@@ -5,7 +5,85 @@ Utilities for correcting connection between candidates and parties.
 """
 import os
 import csv
-from django.apps import apps
+
+
+class CandidatePartyCorrections(object):
+    """
+    Manual corrections to the parties of candidates, read from a CSV file.
+
+    The file is parsed once into a dict keyed on (candidate name, year, election
+    type, office) and parsed again only after it's modified.
+    """
+    def __init__(self, path):
+        """
+        Set up reading corrections from the CSV file at path.
+        """
+        self.path = path
+        self.clear()
+
+    def clear(self):
+        """
+        Forget the parsed corrections, so they're read again on next use.
+        """
+        self.mtime = None
+        self.corrections = {}
+
+    def load(self):
+        """
+        Parse the corrections file, unless it hasn't changed since it was last parsed.
+        """
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+
+        corrections = {}
+        with open(self.path, 'r') as f:
+            for d in csv.DictReader(f):
+                # Only the rows we've corrected
+                if d['party']:
+                    key = (d['candidate_name'], str(d['year']), d['election_type'], d['office'])
+                    corrections.setdefault(key, []).append(d['party'])
+
+        self.corrections = corrections
+        self.mtime = mtime
+
+    def get_party_name(self, candidate_name, year, election_type, office):
+        """
+        Returns the corrected party name for a given candidate name, year, election_type and office.
+
+        Returns None if no correction is found.
+        """
+        self.load()
+        matches = self.corrections.get((candidate_name, str(year), election_type, office), [])
+
+        # If there's more than one result throw an error
+        if len(matches) > 1:
+            raise Exception('More than one correction found.')
+        # If there's no match return None
+        elif len(matches) == 0:
+            return None
+        # If there's only one match return that
+        else:
+            return matches[0]
+
+    def get_party(self, candidate_name, year, election_type, office):
+        """
+        Returns the correct OCD party organization object for a given candidate name, year, election_type and office.
+
+        Returns None if no correction is found. Party objects come from the OCD cache.
+        """
+        from calaccess_processed.models.proxies import OCDPartyProxy
+
+        name = self.get_party_name(candidate_name, year, election_type, office)
+        if name is None:
+            return None
+        return OCDPartyProxy.objects.get_by_name(name)
+
+
+# The corrections shipped with the app
+candidate_party_corrections = CandidatePartyCorrections(
+    os.path.join(os.path.abspath(os.path.dirname(__file__)), "candidate_party.csv")
+)
 
 
 def candidate_party(candidate_name, year, election_type, office):
@@ -14,35 +92,4 @@ def candidate_party(candidate_name, year, election_type, office):
 
     Returns None if no correction is found.
     """
-    from calaccess_processed.models.proxies import OCDPartyProxy
-
-    # Get the path to our corrections file
-    app = apps.get_app_config("calaccess_processed")
-    module_dir = os.path.abspath(os.path.dirname(app.module.__file__))
-    corrections_path = os.path.join(module_dir, 'corrections', "candidate_party.csv")
-
-    # Open up the corrections
-    with open(corrections_path, 'r') as f:
-        corrections = csv.DictReader(f)
-        # Filter down to the ones we've corrected
-        corrections = [d for d in corrections if d['party']]
-
-    # Filter down to the ones that match
-    matches = [
-        d['party'] for d in corrections if (
-            d['candidate_name'] == candidate_name and
-            str(d['year']) == str(year) and
-            d['election_type'] == election_type and
-            d['office'] == office
-        )
-    ]
-
-    # If there's more than one result throw an error
-    if len(matches) > 1:
-        raise Exception('More than one correction found.')
-    # If there's no match return None
-    elif len(matches) == 0:
-        return None
-    # If there's only one match return that
-    else:
-        return OCDPartyProxy.objects.get_by_name(matches[0])
+    return candidate_party_corrections.get_party(candidate_name, year, election_type, office)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for comparing processed tables with their archives from an earlier version.
+"""
+from __future__ import unicode_literals
+from django.db import connection, models
+from calaccess_processed.archives import open_archive
+
+
+def is_surrogate(field):
+    """
+    Return True if the field's values are assigned by the database, and so differ between versions.
+    """
+    return isinstance(field, models.AutoField)
+
+
+def get_natural_key(model):
+    """
+    Return the list of fields that identify a model's rows in every version, or None.
+
+    That's the first of its unique_together sets, or its primary key if it's not
+    assigned by the database.
+    """
+    if model._meta.unique_together:
+        return [model._meta.get_field(name) for name in model._meta.unique_together[0]]
+    if not is_surrogate(model._meta.pk):
+        return [model._meta.pk]
+    return None
+
+
+def get_translation(field):
+    """
+    Return the natural key of the model a foreign key field refers to by a surrogate key, or None.
+
+    Rows are compared on these columns of the other model instead of its surrogate key.
+    """
+    if not field.is_relation or not is_surrogate(field.target_field):
+        return None
+    key = get_natural_key(field.related_model)
+    if not key or any(f.is_relation and is_surrogate(f.target_field) for f in key):
+        return None
+    return key
+
+
+class VersionDiff(object):
+    """
+    Compares processed tables with their .csv archives from an earlier version.
+
+    Each archive is loaded into a temporary table named for the table with a
+    "base_" prefix. Rows are matched on the model's natural key, with foreign
+    keys to surrogate keys translated into the natural keys they refer to, so
+    the diff doesn't depend on ids assigned by the database in either version.
+    """
+    def __init__(self, base_version):
+        """
+        Set up comparisons with the given ProcessedDataVersion.
+        """
+        self.base_version = base_version
+        # db_table: temporary table name, or None if the base version has no archive of it
+        self.base_tables = {}
+
+    def load_base_table(self, model):
+        """
+        Load the base version's archive of a model into a temporary table, if it hasn't been loaded.
+
+        Returns the name of the temporary table, or None if the base version has no archive.
+        """
+        db_table = model._meta.db_table
+        if db_table in self.base_tables:
+            return self.base_tables[db_table]
+
+        base_file = self.base_version.files.filter(file_name=model._meta.object_name).first()
+        if not base_file or not base_file.file_archive:
+            self.base_tables[db_table] = None
+            return None
+
+        base_table = 'base_%s' % db_table
+        with open_archive(base_file) as csv_file:
+            # Name the columns in the file's header, in case the table's have changed since
+            header = csv_file.readline().decode('utf-8')
+            columns = ', '.join(
+                '"%s"' % c.strip().strip('"') for c in header.split(',')
+            )
+            with connection.cursor() as c:
+                c.execute('DROP TABLE IF EXISTS "%s"' % base_table)
+                # Without the table's NOT NULL constraints, which columns missing from the file would break
+                c.execute(
+                    'CREATE TEMPORARY TABLE "%s" AS SELECT * FROM "%s" WITH NO DATA' % (base_table, db_table)
+                )
+                c.cursor.copy_expert(
+                    'COPY "%s" (%s) FROM STDIN CSV' % (base_table, columns),
+                    csv_file,
+                )
+                c.execute('ANALYZE "%s"' % base_table)
+
+        self.base_tables[db_table] = base_table
+        return base_table
+
+    def get_select(self, model, base):
+        """
+        Return SQL selecting a model's natural key and compared columns from its table or base table.
+
+        Returns a tuple (sql, key column names, compared column names), or None if the
+        base version is missing a table it needs.
+        """
+        def table_for(m):
+            return self.load_base_table(m) if base else m._meta.db_table
+
+        table = table_for(model)
+        if not table:
+            return None
+
+        key_columns = []
+        selects = []
+        joins = []
+        translated = set()
+        for field in get_natural_key(model) or []:
+            translation = get_translation(field)
+            if translation:
+                related_table = table_for(field.related_model)
+                if not related_table:
+                    return None
+                alias = 'k%s' % len(joins)
+                joins.append(
+                    'LEFT JOIN "{0}" {1} ON {1}."{2}" = t."{3}"'.format(
+                        related_table,
+                        alias,
+                        field.target_field.column,
+                        field.column,
+                    )
+                )
+                for f in translation:
+                    key_columns.append(f.column)
+                    selects.append('{0}."{1}" AS "{1}"'.format(alias, f.column))
+                translated.add(field.column)
+            else:
+                key_columns.append(field.column)
+                selects.append('t."{0}" AS "{0}"'.format(field.column))
+
+        # Compare everything else that doesn't depend on ids assigned by the database
+        value_columns = [
+            f.column for f in model._meta.concrete_fields
+            if f.column not in key_columns and f.column not in translated and not (
+                is_surrogate(f) or (f.is_relation and is_surrogate(f.target_field))
+            )
+        ]
+        selects.extend('t."{0}" AS "{0}"'.format(c) for c in value_columns)
+
+        sql = 'SELECT {0}, TRUE AS present FROM "{1}" t {2}'.format(
+            ', '.join(selects),
+            table,
+            ' '.join(joins),
+        )
+        return sql, key_columns, value_columns
+
+    def get_copy_sql(self, model):
+        """
+        Return a COPY ... TO STDOUT query of the rows added, removed or changed in a model's table.
+
+        Each row has a "change" column ("added", "removed" or "changed"), followed by
+        the natural key and then the compared columns of the current version, which
+        are empty for removed rows. Rows match when their natural keys are equal or
+        both null. Tables without a natural key only have added and removed rows.
+
+        Returns None if the base version doesn't have the archives to compare.
+        """
+        base = self.get_select(model, True)
+        if not base:
+            return None
+        current, key_columns, value_columns = self.get_select(model, False)
+        base = base[0]
+
+        if not key_columns:
+            columns = ', '.join('"%s"' % c for c in value_columns)
+            sql = """
+                SELECT 'added' AS change, {0} FROM (
+                    SELECT {0} FROM ({1}) cur EXCEPT ALL SELECT {0} FROM ({2}) base
+                ) added
+                UNION ALL
+                SELECT 'removed' AS change, {0} FROM (
+                    SELECT {0} FROM ({2}) base EXCEPT ALL SELECT {0} FROM ({1}) cur
+                ) removed
+            """.format(columns, current, base)
+        else:
+            changed = ''
+            if value_columns:
+                changed = ' OR ({0}) IS DISTINCT FROM ({1})'.format(
+                    ', '.join('cur."%s"' % c for c in value_columns),
+                    ', '.join('base."%s"' % c for c in value_columns),
+                )
+            # Keys come from whichever side has the row, values from the current version
+            select_columns = ['COALESCE(cur."{0}", base."{0}") AS "{0}"'.format(c) for c in key_columns]
+            select_columns.extend('cur."%s"' % c for c in value_columns)
+            sql = """
+                SELECT
+                    CASE
+                        WHEN base.present IS NULL THEN 'added'
+                        WHEN cur.present IS NULL THEN 'removed'
+                        ELSE 'changed'
+                    END AS change,
+                    {0}
+                FROM ({1}) cur
+                FULL OUTER JOIN ({2}) base
+                ON {3}
+                WHERE base.present IS NULL OR cur.present IS NULL{4}
+            """.format(
+                ', '.join(select_columns),
+                current,
+                base,
+                ' AND '.join(
+                    # Same as cur."k" IS NOT DISTINCT FROM base."k", which a FULL OUTER JOIN can't use
+                    '(cur."{0}" IS NULL) = (base."{0}" IS NULL) '
+                    'AND COALESCE(cur."{0}"::text, \'\') = COALESCE(base."{0}"::text, \'\')'.format(c)
+                    for c in key_columns
+                ),
+                changed,
+            )
+        return 'COPY (%s) TO STDOUT CSV HEADER;' % sql
+
+    def drop(self):
+        """
+        Drop the temporary tables loaded from the base version.
+        """
+        with connection.cursor() as c:
+            for base_table in self.base_tables.values():
+                if base_table:
+                    c.execute('DROP TABLE IF EXISTS "%s"' % base_table)
+        self.base_tables = {}
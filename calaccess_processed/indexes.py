@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for dropping a table's indexes and constraints before a load and rebuilding them after.
+"""
+from __future__ import unicode_literals
+import re
+import time
+import logging
+from functools import partial
+from multiprocessing.pool import ThreadPool
+from django.conf import settings
+from django.db import connection
+logger = logging.getLogger(__name__)
+
+
+def build_index(maintenance_work_mem, close, index):
+    """
+    Execute the CREATE INDEX statement of an (index name, sql) tuple.
+
+    Returns a tuple (index name, seconds taken). If close is True, the current
+    thread's database connection is closed afterward.
+    """
+    name, sql = index
+    try:
+        with connection.cursor() as c:
+            if maintenance_work_mem:
+                c.execute('SET maintenance_work_mem = %s', [maintenance_work_mem])
+            start = time.time()
+            try:
+                c.execute(sql)
+            finally:
+                if maintenance_work_mem:
+                    c.execute('RESET maintenance_work_mem')
+            return name, time.time() - start
+    finally:
+        if close:
+            connection.close()
+
+
+class IndexRebuilder(object):
+    """
+    Drops the indexes and constraints on a database table and rebuilds them in parallel.
+
+    The primary key, and any unique constraints referenced by other tables' foreign
+    keys, are left in place. Indexes, including those behind unique constraints, are
+    built at the same time on separate database connections. Foreign keys are added
+    as NOT VALID and then validated, so their rows are checked without blocking reads.
+    """
+    def __init__(self, db_table, processes=None, maintenance_work_mem=None):
+        """
+        Set up the rebuild of the given table.
+
+        processes is the number of database connections building indexes at the same
+        time and maintenance_work_mem is the memory each may use (e.g., '1GB').
+        Default to the CALACCESS_INDEX_PROCESSES and CALACCESS_MAINTENANCE_WORK_MEM
+        settings, or one connection with the server's default memory.
+        """
+        self.db_table = db_table
+        self.processes = processes or getattr(settings, 'CALACCESS_INDEX_PROCESSES', 1)
+        self.maintenance_work_mem = maintenance_work_mem or getattr(
+            settings,
+            'CALACCESS_MAINTENANCE_WORK_MEM',
+            None,
+        )
+        # (index name, CREATE INDEX statement) tuples
+        self.indexes = []
+        # (constraint name, constraint type, definition, index name, CREATE INDEX statement) tuples
+        self.constraints = []
+        # (index or constraint name, seconds taken) tuples
+        self.timings = []
+
+    def collect(self):
+        """
+        Read the definitions of the table's droppable indexes and constraints.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT
+                    con.conname,
+                    con.contype,
+                    pg_get_constraintdef(con.oid),
+                    CASE WHEN con.contype = 'u' THEN i.relname END,
+                    CASE WHEN con.contype = 'u' THEN pg_get_indexdef(con.conindid) END
+                FROM pg_constraint con
+                LEFT JOIN pg_class i
+                ON i.oid = con.conindid
+                WHERE con.conrelid = %s::regclass
+                AND (
+                    con.contype = 'f'
+                    OR (
+                        con.contype = 'u'
+                        AND NOT EXISTS (
+                            SELECT 1
+                            FROM pg_constraint ref
+                            WHERE ref.contype = 'f'
+                            AND ref.conindid = con.conindid
+                        )
+                    )
+                )
+                ORDER BY con.contype, con.conname
+                """,
+                [self.db_table],
+            )
+            self.constraints = c.fetchall()
+
+            c.execute(
+                """
+                SELECT i.relname, pg_get_indexdef(i.oid)
+                FROM pg_index x
+                JOIN pg_class i
+                ON i.oid = x.indexrelid
+                WHERE x.indrelid = %s::regclass
+                AND NOT EXISTS (
+                    SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid
+                )
+                ORDER BY i.relname
+                """,
+                [self.db_table],
+            )
+            self.indexes = c.fetchall()
+
+    def drop(self):
+        """
+        Drop the collected indexes and constraints, foreign keys first.
+        """
+        with connection.cursor() as c:
+            for name, contype, definition, index_name, index_sql in self.constraints:
+                c.execute('ALTER TABLE "%s" DROP CONSTRAINT "%s"' % (self.db_table, name))
+            for name, sql in self.indexes:
+                c.execute('DROP INDEX "%s"' % name)
+
+    def rebuild(self):
+        """
+        Re-create the collected indexes and constraints.
+
+        Returns a list of (index or constraint name, seconds taken) tuples.
+        """
+        self.timings = []
+
+        # Build every index, including those behind unique constraints, at the same time
+        indexes = list(self.indexes) + [
+            (index_name, index_sql) for name, contype, definition, index_name, index_sql
+            in self.constraints if contype == 'u'
+        ]
+        processes = min(self.processes, len(indexes))
+        if processes > 1:
+            pool = ThreadPool(processes)
+            try:
+                results = pool.map(partial(build_index, self.maintenance_work_mem, True), indexes)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [build_index(self.maintenance_work_mem, False, index) for index in indexes]
+        for name, seconds in results:
+            self.record(name, seconds)
+
+        with connection.cursor() as c:
+            # Attach the unique indexes to their constraints and add unchecked foreign keys
+            for name, contype, definition, index_name, index_sql in self.constraints:
+                if contype == 'u':
+                    deferrable = re.search(r' (NOT )?DEFERRABLE.*$', definition)
+                    c.execute(
+                        'ALTER TABLE "{0}" ADD CONSTRAINT "{1}" UNIQUE USING INDEX "{2}"{3}'.format(
+                            self.db_table,
+                            name,
+                            index_name,
+                            deferrable.group(0) if deferrable else '',
+                        )
+                    )
+                else:
+                    c.execute(
+                        'ALTER TABLE "{0}" ADD CONSTRAINT "{1}" {2} NOT VALID'.format(
+                            self.db_table,
+                            name,
+                            definition.replace(' NOT VALID', ''),
+                        )
+                    )
+
+            # Then check the existing rows against the foreign keys
+            for name, contype, definition, index_name, index_sql in self.constraints:
+                if contype == 'f':
+                    start = time.time()
+                    c.execute('ALTER TABLE "%s" VALIDATE CONSTRAINT "%s"' % (self.db_table, name))
+                    self.record(name, time.time() - start)
+
+        return self.timings
+
+    def record(self, name, seconds):
+        """
+        Record and log how long it took to build an index or validate a constraint.
+        """
+        self.timings.append((name, seconds))
+        logger.info('Built %s on %s in %.1f secs' % (name, self.db_table, seconds))
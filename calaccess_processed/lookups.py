@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+In-memory indexes of raw and filing rows looked up over and over while processing.
+"""
+from __future__ import unicode_literals
+from array import array
+from datetime import date
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+
+class FilerTypeIndex(object):
+    """
+    An in-memory index of the party, race and district of each filer over time.
+
+    The rows of every filer are packed into arrays of integers, ordered by filer
+    and effective date. A sorted array of filer ids, and another of where each
+    filer's rows start, find the slice of a filer's rows with a binary search, and
+    the row in effect on a date with another. Of rows effective on the same date,
+    the last one given wins, which is the one with the highest id when rows come
+    from RawFilerToFilerTypeCdManager.build_index.
+    """
+    # Stands in for a null code in the arrays
+    NULL = -1
+
+    def __init__(self, rows):
+        """
+        Index rows of (filer_id, effect_dt, party_cd, race, district_cd) ordered by filer_id and effect_dt.
+
+        Rows without a filer id or effective date are left out. Raises ValueError
+        if the rows aren't ordered by filer_id.
+        """
+        self.filer_ids = array('l')
+        # Where each filer's rows start, plus where the last filer's end
+        self.starts = array('l')
+        self.dates = array('l')
+        self.party_codes = array('l')
+        self.races = array('l')
+        self.district_codes = array('l')
+
+        for filer_id, effect_dt, party_cd, race, district_cd in rows:
+            if filer_id is None or effect_dt is None:
+                continue
+            if not self.filer_ids or filer_id > self.filer_ids[-1]:
+                self.filer_ids.append(filer_id)
+                self.starts.append(len(self.dates))
+            elif filer_id < self.filer_ids[-1]:
+                raise ValueError("Filer type rows must be ordered by filer_id")
+            self.dates.append(effect_dt.toordinal())
+            self.party_codes.append(self.NULL if party_cd is None else party_cd)
+            self.races.append(self.NULL if race is None else race)
+            self.district_codes.append(self.NULL if district_cd is None else district_cd)
+        self.starts.append(len(self.dates))
+
+    def get_code(self, codes, i):
+        """
+        Return the code at index i of an array, or None if it's null.
+        """
+        code = codes[i]
+        return None if code == self.NULL else code
+
+    def get(self, filer_id, election_date):
+        """
+        Return a tuple (party_cd, race, district_cd) from the filer's latest row effective by election_date.
+
+        Returns None if there's no such row. Raises ValueError if election_date is None.
+        """
+        if election_date is None:
+            raise ValueError("Cannot look up filer types effective on a null date")
+        try:
+            filer_id = int(filer_id)
+        except (TypeError, ValueError):
+            return None
+        j = bisect_left(self.filer_ids, filer_id)
+        if j == len(self.filer_ids) or self.filer_ids[j] != filer_id:
+            return None
+        start, stop = self.starts[j], self.starts[j + 1]
+
+        # The last of the filer's rows on or before the date
+        i = bisect_right(self.dates, election_date.toordinal(), start, stop) - 1
+        if i < start:
+            return None
+        return (
+            self.get_code(self.party_codes, i),
+            self.get_code(self.races, i),
+            self.get_code(self.district_codes, i),
+        )
+
+
+class Form501Matcher(object):
+    """
+    Matches scraped candidates to Form 501 filings held in memory.
+
+    Filings are indexed by their upper-cased office and district along with
+    their filer id, their "<last_name>, <first_name>" name and their
+    "<last_name>, <first_name> <middle_name>" name. Matches follow the same
+    rules as querying Form501Filing, without touching the database, down to
+    a null office, district or election type only matching filings where it's
+    null too.
+    """
+    def __init__(self, filings):
+        """
+        Index the Form501Filing objects in filings.
+
+        Filings without an election year are left out, since they can't match.
+        """
+        self.by_filer_id = defaultdict(list)
+        self.by_short_name = defaultdict(list)
+        self.by_full_name = defaultdict(list)
+
+        for filing in filings:
+            if filing.election_year is None:
+                continue
+            office = None if filing.office is None else filing.office.upper()
+            # Like the database's CONCAT, null names are joined as empty strings
+            short_name = '{}, {}'.format(filing.last_name or '', filing.first_name or '')
+            full_name = '{} {}'.format(short_name, filing.middle_name or '')
+            self.by_filer_id[(office, filing.district, filing.filer_id)].append(filing)
+            self.by_short_name[(office, filing.district, short_name)].append(filing)
+            self.by_full_name[(office, filing.district, full_name)].append(filing)
+
+    @staticmethod
+    def latest(filings, election_year):
+        """
+        Return the most recently filed of the filings for election_year or earlier, or None if there are none.
+
+        Like the database, a filing without a date_filed counts as the most recent.
+        """
+        matches = [f for f in filings if f.election_year <= election_year]
+        if not matches:
+            return None
+        return max(matches, key=lambda f: (f.date_filed is None, f.date_filed or date.min))
+
+    def match(self, office, district, election_year, election_type, filer_id='', name=''):
+        """
+        Return the latest Form501Filing matching a candidate, or None if there isn't one.
+
+        Matches on filer_id if it isn't blank, otherwise on name. Either way, first
+        try filings for the same type of election, then filings for any type.
+        """
+        office = None if office is None else office.upper()
+
+        if filer_id != '':
+            filings = self.by_filer_id.get((office, district, filer_id), [])
+        else:
+            # Use the "<last_name>, <first_name> <middle_name>" format unless
+            # there are any with the "<last_name>, <first_name>" format
+            filings = self.by_short_name.get((office, district, name), [])
+            if self.latest(filings, election_year) is None:
+                filings = self.by_full_name.get((office, district, name), [])
+
+        same_type = [f for f in filings if f.election_type == election_type]
+        return self.latest(same_type, election_year) or self.latest(filings, election_year)
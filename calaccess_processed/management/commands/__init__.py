@@ -13,6 +13,7 @@ from django.core.management.base import BaseCommand
 from django.core.management import CommandError, call_command
 from calaccess_raw import get_data_directory
 from calaccess_raw.models import RawDataVersion
+from calaccess_processed.caches import clear_caches
 from calaccess_processed.models import ProcessedDataVersion, OCDDivisionProxy
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,9 @@ class CalAccessCommand(BaseCommand):
         # Start the clock
         self.start_datetime = timezone.now()
 
+        # Look up OCD objects afresh in each command
+        clear_caches()
+
         # set up processed data directory
         self.data_dir = get_data_directory()
         self.processed_data_dir = os.path.join(
@@ -4,11 +4,20 @@
 Export and archive a .csv file for a given model.
 """
 import os
+import shutil
 from django.apps import apps
+from django.conf import settings
 from django.core.files import File
 from django.core.management import CommandError
-from django.db import connection
+from calaccess_processed.archives import (
+    ARCHIVE_EXTENSIONS,
+    ZIP_STREAMING,
+    copy_archive,
+    export_to_archive,
+    export_to_parquet,
+)
 from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.managers import get_estimated_count
 from calaccess_processed.models.tracking import (
     ProcessedDataVersion,
     ProcessedDataFile,
@@ -30,6 +39,29 @@ class Command(CalAccessCommand):
             'model_name',
             help="Name of the model to archive"
         )
+        parser.add_argument(
+            "--spool",
+            action="store_true",
+            dest="spool",
+            default=False,
+            help="Write a local .csv to be added to the processed zip later, instead of "
+                 "streaming into it (for archiving more than one model at a time)."
+        )
+        parser.add_argument(
+            "--compression",
+            choices=sorted(ARCHIVE_EXTENSIONS),
+            dest="compression",
+            default=getattr(settings, 'CALACCESS_ARCHIVE_COMPRESSION', None),
+            help="Compress the archived .csv as it's exported (zstd requires zstandard)."
+        )
+        parser.add_argument(
+            "--parquet",
+            action="store_true",
+            dest="parquet",
+            default=getattr(settings, 'CALACCESS_ARCHIVE_PARQUET', False),
+            help="Also archive a .parquet file, with typed and compressed columns "
+                 "(requires pyarrow)."
+        )
 
     def handle(self, *args, **options):
         """
@@ -37,6 +69,13 @@ class Command(CalAccessCommand):
         """
         super(Command, self).handle(*args, **options)
         self.model_name = options['model_name']
+        self.spool = options['spool'] or not ZIP_STREAMING
+        self.compression = options['compression']
+        if self.compression == 'zstd':
+            try:
+                import zstandard  # noqa
+            except ImportError:
+                raise CommandError("Archiving zstd files requires zstandard (pip install zstandard).")
 
         # get the full path for archiving the csv
         self.csv_path = os.path.join(
@@ -62,30 +101,85 @@ class Command(CalAccessCommand):
         except ProcessedDataFile.DoesNotExist:
             self.processed_file = self.version.files.create(
                 file_name=self.model_name,
-                records_count=self.model.objects.count(),
             )
 
-        # Remove previous .CSV files
-        self.processed_file.file_archive.delete()
+        # Remove previous .CSV files, unless another version is pointing at them
+        self.processed_file.delete_archive('file_archive')
+        if not self.spool and os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+
+        # The same file from the last version, whose archive an unchanged file can copy
+        previous_file = self.processed_file.get_previous_file()
 
-        # Write out to the temp directory
+        # Stream the .CSV into the archive and the processed zip at the same time
         copy_sql = "COPY %s TO STDOUT CSV HEADER;" % self.db_table
-        with open(self.csv_path, 'wb') as stdout:
-            with connection.cursor() as c:
-                c.cursor.copy_expert(copy_sql, stdout)
-
-        # Open up the .CSV file for reading so we can wrap it in the Django File obj
-        with open(self.csv_path, 'rb') as csv_file:
-            # Save the .CSV on the raw data file
-            self.processed_file.file_archive.save(
-                '%s.csv' % self.model_name,
-                File(csv_file),
-            )
+        copied_count, self.processed_file.file_size = export_to_archive(
+            copy_sql,
+            self.processed_file,
+            '%s.csv' % self.model_name,
+            None if self.spool else os.path.join(self.data_dir, 'processed.zip'),
+            self.csv_path,
+            previous_file=previous_file,
+            compression=self.compression,
+        )
+        unchanged = bool(previous_file) and self.processed_file.file_hash == previous_file.file_hash
+        if unchanged and self.verbosity > 2:
+            self.log(" %s.csv is unchanged since the last version, copying its archive" % self.model_name)
+
+        # COPY reports how many rows it wrote, so there's no need to count them
+        if copied_count >= 0:
+            self.processed_file.records_count = copied_count
+        elif not self.processed_file.records_count:
+            self.processed_file.records_count = get_estimated_count(self.db_table) or 0
+
+        if options['parquet']:
+            if unchanged and previous_file.parquet_archive:
+                self.reuse_parquet(previous_file)
+            else:
+                self.archive_parquet()
 
         # Save it to the model
-        self.processed_file.file_size = os.path.getsize(self.csv_path)
         self.processed_file.save()
 
+    def archive_parquet(self):
+        """
+        Export the model to a .parquet file, archive it and leave it to be added to the processed zip.
+        """
+        parquet_name = '%s.parquet' % self.model_name
+        parquet_path = os.path.join(self.processed_data_dir, parquet_name)
+        self.log(" Archiving %s" % parquet_name)
+
+        try:
+            export_to_parquet(self.model, parquet_path)
+        except ImportError:
+            raise CommandError("Archiving .parquet files requires pyarrow (pip install pyarrow).")
+
+        self.processed_file.delete_archive('parquet_archive')
+        with open(parquet_path, 'rb') as parquet_file:
+            self.processed_file.parquet_archive.save(parquet_name, File(parquet_file), save=False)
+        self.processed_file.parquet_size = os.path.getsize(parquet_path)
+
+    def reuse_parquet(self, previous_file):
+        """
+        Copy the .parquet archive of an unchanged file, and leave a local copy to be added to the processed zip.
+        """
+        parquet_path = os.path.join(self.processed_data_dir, '%s.parquet' % self.model_name)
+        previous_file.parquet_archive.open('rb')
+        try:
+            with open(parquet_path, 'wb') as parquet_file:
+                shutil.copyfileobj(previous_file.parquet_archive, parquet_file)
+        finally:
+            previous_file.parquet_archive.close()
+
+        self.processed_file.delete_archive('parquet_archive')
+        parquet_archive = self.processed_file.parquet_archive
+        self.processed_file.parquet_archive = copy_archive(
+            parquet_archive,
+            parquet_archive.field.generate_filename(self.processed_file, '%s.parquet' % self.model_name),
+            previous_file.parquet_archive.name,
+        )
+        self.processed_file.parquet_size = previous_file.parquet_size
+
     def get_model(self):
         """
         Return the model with model_name, or None.
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export and archive .csv files for a set of models at the same time.
+"""
+from functools import partial
+from multiprocessing.pool import ThreadPool
+from django import db
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.utils.timezone import now
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.models.tracking import ProcessedDataVersion
+
+
+def archive_model(options, record_times, close, model_name):
+    """
+    Archive the model with the given name.
+
+    If close is True, the current thread's database connection is closed afterward.
+
+    Returns a tuple (model_name, error), where error is None if the archive succeeded.
+    """
+    try:
+        version = ProcessedDataVersion.objects.latest('process_start_datetime')
+        if record_times:
+            processed_file, created = version.files.get_or_create(file_name=model_name)
+            processed_file.process_start_datetime = now()
+            processed_file.save()
+
+        call_command('archivecalaccessprocessedfile', model_name, **options)
+
+        if record_times:
+            processed_file.refresh_from_db()
+            processed_file.process_finish_datetime = now()
+            processed_file.save()
+    except Exception as e:
+        return model_name, e
+    finally:
+        if close:
+            db.connection.close()
+    return model_name, None
+
+
+class Command(CalAccessCommand):
+    """
+    Export and archive .csv files for a set of models at the same time.
+    """
+    help = 'Export and archive .csv files for a set of models at the same time.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            'model_names',
+            nargs='+',
+            help="Names of the models to archive"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            dest="concurrency",
+            default=getattr(settings, 'CALACCESS_ARCHIVE_CONCURRENCY', 1),
+            help="Most models exported at the same time, each over its own database connection."
+        )
+        parser.add_argument(
+            "--record-times",
+            action="store_true",
+            dest="record_times",
+            default=False,
+            help="Record when each model's archiving starts and finishes as its processing times."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        model_names = options['model_names']
+        concurrency = max(min(options['concurrency'] or 1, len(model_names)), 1)
+
+        archive_options = dict(verbosity=self.verbosity, no_color=self.no_color)
+        if concurrency > 1:
+            # Only one model at a time can be streamed into the processed zip
+            archive_options['spool'] = True
+            if self.verbosity > 2:
+                self.log(" Archiving %s models at a time" % concurrency)
+
+        # Each thread opens its own database connection
+        func = partial(archive_model, archive_options, options['record_times'], concurrency > 1)
+        if concurrency > 1:
+            pool = ThreadPool(concurrency)
+            try:
+                results = list(pool.imap_unordered(func, model_names))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [func(model_name) for model_name in model_names]
+
+        failures = [(model_name, error) for model_name, error in results if error]
+        for model_name, error in failures:
+            self.failure(" Archiving %s failed: %s" % (model_name, error))
+        if failures:
+            raise CommandError("Archiving failed for %s models" % len(failures))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export and archive a SQLite database, and optionally a DuckDB database, of all processed files.
+"""
+import os
+import sqlite3
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.management import CommandError
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.models.tracking import ProcessedDataVersion
+from calaccess_processed.snapshots import export_to_duckdb, export_to_sqlite
+
+
+class Command(CalAccessCommand):
+    """
+    Export and archive a SQLite database, and optionally a DuckDB database, of all processed files.
+    """
+    help = 'Export and archive a SQLite database, and optionally a DuckDB database, of all processed files.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--duckdb",
+            action="store_true",
+            dest="duckdb",
+            default=getattr(settings, 'CALACCESS_ARCHIVE_DUCKDB', False),
+            help="Also archive a DuckDB database (requires duckdb)."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.header("Exporting processed files to a database snapshot")
+
+        # get the current version
+        self.version = ProcessedDataVersion.objects.latest('process_start_datetime')
+
+        # and the models of the files archived for it
+        self.model_list = self.get_model_list()
+
+        self.export_sqlite()
+        if options['duckdb']:
+            self.export_duckdb()
+        self.version.save()
+        self.success("Snapshot archived")
+
+    def get_model_list(self):
+        """
+        Return the models of the processed files archived for the current version.
+        """
+        models_by_name = dict((m._meta.object_name, m) for m in apps.get_models())
+        return [
+            models_by_name[f.file_name] for f in self.version.files.order_by('file_name')
+            if f.file_archive and f.file_name in models_by_name
+        ]
+
+    def export_sqlite(self):
+        """
+        Export each model to a new SQLite database and archive it.
+        """
+        sqlite_path = os.path.join(self.data_dir, 'processed.sqlite')
+        if os.path.exists(sqlite_path):
+            os.remove(sqlite_path)
+
+        conn = sqlite3.connect(sqlite_path)
+        try:
+            # The file is built from scratch, so skip the journal and fsyncs
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            for model in self.model_list:
+                if self.verbosity > 2:
+                    self.log(" Exporting %s to SQLite" % model._meta.object_name)
+                export_to_sqlite(model, conn)
+            conn.execute('ANALYZE')
+        finally:
+            conn.close()
+
+        self.archive(sqlite_path, self.version.sqlite_archive)
+        self.version.sqlite_size = os.path.getsize(sqlite_path)
+
+    def export_duckdb(self):
+        """
+        Export each model to a new DuckDB database and archive it.
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise CommandError("Archiving DuckDB databases requires duckdb (pip install duckdb).")
+
+        duckdb_path = os.path.join(self.data_dir, 'processed.duckdb')
+        if os.path.exists(duckdb_path):
+            os.remove(duckdb_path)
+        csv_path = os.path.join(self.data_dir, 'snapshot.csv')
+
+        conn = duckdb.connect(duckdb_path)
+        try:
+            for model in self.model_list:
+                if self.verbosity > 2:
+                    self.log(" Exporting %s to DuckDB" % model._meta.object_name)
+                export_to_duckdb(model, conn, csv_path)
+            conn.execute('CHECKPOINT')
+        finally:
+            conn.close()
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+
+        self.archive(duckdb_path, self.version.duckdb_archive)
+        self.version.duckdb_size = os.path.getsize(duckdb_path)
+
+    def archive(self, path, field_file):
+        """
+        Save the local file at path to one of the current version's archives, replacing any earlier one.
+        """
+        if self.verbosity > 2:
+            self.log(" Archiving %s" % os.path.basename(path))
+        field_file.delete(save=False)
+        with open(path, 'rb') as f:
+            field_file.save(os.path.basename(path), File(f), save=False)
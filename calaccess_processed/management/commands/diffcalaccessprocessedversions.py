@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export and archive the rows changed in each processed file since an earlier version.
+"""
+import os
+import shutil
+from django.apps import apps
+from django.core.files import File
+from django.core.management import CommandError
+from django.db import connection
+from calaccess_processed.archives import add_files_to_zip
+from calaccess_processed.diffs import VersionDiff
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.models.tracking import ProcessedDataVersion
+
+
+class Command(CalAccessCommand):
+    """
+    Export and archive the rows changed in each processed file since an earlier version.
+    """
+    help = 'Export and archive the rows changed in each processed file since an earlier version.'
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--base-version",
+            type=int,
+            dest="base_version",
+            default=None,
+            help="Id of the processed version to compare with (defaults to the one before the latest)."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        self.diff_dir = os.path.join(self.data_dir, 'processed-diff')
+        self.zip_path = os.path.join(self.data_dir, 'processed-diff.zip')
+
+        # get the current version and the one to compare it with
+        self.version = ProcessedDataVersion.objects.latest('process_start_datetime')
+        self.base_version = self.get_base_version(options['base_version'])
+        if not self.base_version:
+            self.warn("No earlier processed version to compare with")
+            return
+
+        self.header(
+            "Comparing processed files with version released at %s" % (
+                self.base_version.raw_version.release_datetime.ctime()
+            )
+        )
+
+        # Start with an empty directory of diff files
+        if os.path.exists(self.diff_dir):
+            shutil.rmtree(self.diff_dir)
+        os.makedirs(self.diff_dir)
+
+        diff = VersionDiff(self.base_version)
+        try:
+            for processed_file in self.version.files.order_by('file_name'):
+                self.diff_file(diff, processed_file)
+        finally:
+            diff.drop()
+
+        self.zip()
+        self.success("Diffs archived")
+
+    def get_base_version(self, base_version_id):
+        """
+        Return the ProcessedDataVersion to compare with, or None if there isn't one.
+        """
+        if base_version_id:
+            try:
+                return ProcessedDataVersion.objects.get(id=base_version_id)
+            except ProcessedDataVersion.DoesNotExist:
+                raise CommandError("No processed version with id %s" % base_version_id)
+        return ProcessedDataVersion.objects.filter(
+            process_start_datetime__lt=self.version.process_start_datetime,
+            process_finish_datetime__isnull=False,
+        ).order_by('-process_start_datetime').first()
+
+    def diff_file(self, diff, processed_file):
+        """
+        Export the rows changed in a processed file since the base version to the diff directory.
+        """
+        model_list = [
+            m for m in apps.get_models()
+            if m._meta.object_name == processed_file.file_name
+        ]
+        if len(model_list) != 1 or not processed_file.file_archive:
+            return
+        model = model_list[0]
+
+        # Files with the same contents have nothing to compare
+        base_file = self.base_version.files.filter(file_name=processed_file.file_name).first()
+        if base_file and processed_file.file_hash and processed_file.file_hash == base_file.file_hash:
+            if self.verbosity > 2:
+                self.log(" %s.csv is unchanged" % processed_file.file_name)
+            return
+
+        copy_sql = diff.get_copy_sql(model)
+        if not copy_sql:
+            if self.verbosity > 1:
+                self.warn(" %s.csv can't be compared without earlier archives" % processed_file.file_name)
+            return
+
+        if self.verbosity > 2:
+            self.log(" Comparing %s.csv" % processed_file.file_name)
+        csv_path = os.path.join(self.diff_dir, '%s.csv' % processed_file.file_name)
+        with open(csv_path, 'wb') as csv_file:
+            with connection.cursor() as c:
+                c.cursor.copy_expert(copy_sql, csv_file)
+                rowcount = c.cursor.rowcount
+        if self.verbosity > 2:
+            self.log(" %s rows added, removed or changed" % rowcount)
+
+    def zip(self):
+        """
+        Zip the diff files and archive the zip on the current version.
+        """
+        if self.verbosity > 2:
+            self.log(" Zipping diffs")
+        if os.path.exists(self.zip_path):
+            os.remove(self.zip_path)
+        add_files_to_zip(
+            self.zip_path,
+            [(os.path.join(self.diff_dir, f), f) for f in sorted(os.listdir(self.diff_dir))],
+        )
+
+        self.version.diff_archive.delete(save=False)
+        self.version.diff_base_version = self.base_version
+        self.version.diff_size = os.path.getsize(self.zip_path)
+        with open(self.zip_path, 'rb') as zf:
+            self.version.diff_archive.save(os.path.basename(self.zip_path), File(zf), save=False)
+        self.version.save()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export OCD elections, contests, candidacies, people and posts as newline-delimited JSON.
+"""
+import io
+import os
+from opencivicdata.core.models import Person, Post
+from opencivicdata.elections.models import (
+    BallotMeasureContest,
+    Candidacy,
+    CandidateContest,
+    Election,
+    RetentionContest,
+)
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.ndjson import NDJSON_BATCH_SIZE, export_to_ndjson
+
+
+class Command(CalAccessCommand):
+    """
+    Export OCD elections, contests, candidacies, people and posts as newline-delimited JSON.
+    """
+    help = 'Export OCD elections, contests, candidacies, people and posts as newline-delimited JSON.'
+
+    # (file name, model) tuples of what to export
+    exports = (
+        ('elections', Election),
+        ('candidate_contests', CandidateContest),
+        ('ballot_measure_contests', BallotMeasureContest),
+        ('retention_contests', RetentionContest),
+        ('candidacies', Candidacy),
+        ('people', Person),
+        ('posts', Post),
+    )
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--output-dir",
+            dest="output_dir",
+            default=None,
+            help="Directory to write the .ndjson files to (defaults to ocd-json in the data directory)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            dest="batch_size",
+            default=NDJSON_BATCH_SIZE,
+            help="Objects read from the database at a time, along with their identifiers and sources."
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        output_dir = options['output_dir'] or os.path.join(self.data_dir, 'ocd-json')
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        self.header("Exporting OCD data as newline-delimited JSON")
+        for file_name, model in self.exports:
+            path = os.path.join(output_dir, '%s.ndjson' % file_name)
+            with io.open(path, 'w', encoding='utf-8') as out:
+                count = export_to_ndjson(model.objects.all(), out, batch_size=options['batch_size'])
+            if self.verbosity > 1:
+                self.log(" Exported %s %s to %s" % (count, model._meta.verbose_name_plural, path))
+
+        self.success("Done!")
@@ -17,6 +17,7 @@ from opencivicdata.elections.models import (
     BallotMeasureContest,
     RetentionContest
 )
+from calaccess_processed.caches import clear_caches
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -49,3 +50,6 @@ class Command(CalAccessCommand):
             if self.verbosity > 0:
                 self.log("Flushing {} {} objects".format(qs.count(), qs.model.__name__))
             qs.delete()
+
+        # Forget the deleted objects cached for lookups
+        clear_caches()
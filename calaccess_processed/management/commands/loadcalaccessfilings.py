@@ -3,13 +3,139 @@
 """
 Load and archive the CAL-ACCESS Filing and FilingVersion models.
 """
+import os
+import time
+import logging
+from functools import partial
+from collections import OrderedDict
 from django.apps import apps
 from django.conf import settings
 from django.core.management import call_command
-from django.db import connection
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils.timezone import now
 from calaccess_processed.management.commands import CalAccessCommand
 from calaccess_processed.models.tracking import ProcessedDataFile
+from calaccess_processed.scheduler import LoadScheduler
+from calaccess_processed.stages import LoadStage, get_stage_list
+logger = logging.getLogger(__name__)
+
+
+def load_model(model_label, swap=False):
+    """
+    Flush and load the processed model (or build the load stage) with the given label.
+
+    If swap is True, load into a staging table and swap it in for the live table.
+
+    Returns a tuple (number of rows loaded into the model, list of (index or
+    constraint name, seconds taken) tuples from rebuilding the model's indexes).
+
+    Defined at the module level so it can be run in a worker process.
+    """
+    if model_label.startswith('stage:'):
+        LoadStage(model_label.split(':', 1)[1]).load_raw_data()
+        return None, []
+    m = apps.get_model(model_label)
+    if swap:
+        return m.objects.load_raw_data_and_swap(), []
+    with connection.cursor() as c:
+        c.execute('TRUNCATE TABLE "%s" CASCADE' % (m._meta.db_table))
+    timings = []
+    return m.objects.load_raw_data(timings=timings), timings
+
+
+def load_model_in_chunks(chunk_size, processed_version_id, verbosity, model_label, log=None):
+    """
+    Load the processed model with the given label in chunks of filings, committing each.
+
+    Resumes after the last chunk recorded in the model's ProcessedDataFile, if any.
+    Load stages are built all at once. Progress is reported to the log function if
+    verbosity is 1 or more, or to the module's logger if there's no log function.
+
+    Returns a tuple (number of rows in the model, including those from earlier
+    runs, empty list of index timings).
+
+    Defined at the module level so it can be run in a worker process.
+    """
+    if model_label.startswith('stage:'):
+        return load_model(model_label)
+    m = apps.get_model(model_label)
+    processed_file = ProcessedDataFile.objects.get(
+        version_id=processed_version_id,
+        file_name=m._meta.object_name,
+    )
+    if processed_file.last_loaded_filing_id is None:
+        with connection.cursor() as c:
+            c.execute('TRUNCATE TABLE "%s" CASCADE' % (m._meta.db_table))
+        processed_file.records_count = 0
+    if verbosity < 1:
+        log = None
+    elif log is None:
+        log = logger.info
+    m.objects.load_raw_data_in_chunks(
+        chunk_size,
+        start_after=processed_file.last_loaded_filing_id,
+        callback=ChunkProgress(processed_file, log=log),
+    )
+    return processed_file.records_count, []
+
+
+class ChunkProgress(object):
+    """
+    Records and reports the progress of a model loaded in chunks of filings.
+    """
+    def __init__(self, processed_file, log=None):
+        """
+        Set up tracking of the load recorded by processed_file, reporting to the log function.
+        """
+        self.processed_file = processed_file
+        self.log = log
+        self.start_time = time.time()
+        self.first_filing_id = None
+        self.rows = 0
+
+    def __call__(self, first_filing_id, last_filing_id, max_filing_id, rows):
+        """
+        Record a completed chunk and report the load rate and estimated time remaining.
+        """
+        if self.first_filing_id is None:
+            self.first_filing_id = first_filing_id
+        self.rows += rows
+
+        self.processed_file.last_loaded_filing_id = last_filing_id
+        self.processed_file.records_count += rows
+        self.processed_file.save()
+
+        if self.log:
+            elapsed = max(time.time() - self.start_time, 0.001)
+            done = last_filing_id - self.first_filing_id + 1
+            remaining = elapsed * (max_filing_id - last_filing_id) / done
+            self.log(
+                " Loaded {0} rows into {1} through filing_id {2} of {3} "
+                "({4:.0f} rows/sec, about {5:.0f} secs left)".format(
+                    rows,
+                    self.processed_file.file_name,
+                    last_filing_id,
+                    max_filing_id,
+                    self.rows / elapsed,
+                    remaining,
+                )
+            )
+
+
+def load_model_filings(filing_ids, model_label):
+    """
+    Load the rows for the given filings into the processed model (or load stage) with the given label.
+
+    Returns a tuple (None, empty list of index timings), since the number of rows
+    loaded isn't the number in the model.
+    """
+    if model_label.startswith('stage:'):
+        LoadStage(model_label.split(':', 1)[1]).load_raw_data(filing_ids=filing_ids)
+        return None, []
+    m = apps.get_model(model_label)
+    m.objects.load_raw_data(filing_ids=filing_ids)
+    return None, []
 
 
 class Command(CalAccessCommand):
@@ -30,6 +156,53 @@ class Command(CalAccessCommand):
             default=False,
             help="Force re-start (overrides auto-resume)."
         )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            dest="processes",
+            default=getattr(settings, 'CALACCESS_LOAD_PROCESSES', 1),
+            help="Number of worker processes loading independent models at the same time."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            dest="incremental",
+            default=False,
+            help="Only reload new or amended filings, in a single transaction (ignores --processes)."
+        )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            dest="swap",
+            default=False,
+            help="Load each model into a staging table and swap it in, so the live "
+                 "tables are never empty (ignored with --incremental)."
+        )
+        parser.add_argument(
+            "--unlogged",
+            action="store_true",
+            dest="unlogged",
+            default=getattr(settings, 'CALACCESS_LOAD_UNLOGGED', False),
+            help="Switch the tables to UNLOGGED while loading them, skipping the write-ahead "
+                 "log, and back to LOGGED afterward (ignored with --incremental or --swap)."
+        )
+        parser.add_argument(
+            "--keep-unlogged",
+            action="store_true",
+            dest="keep_unlogged",
+            default=getattr(settings, 'CALACCESS_KEEP_UNLOGGED', False),
+            help="Leave the tables UNLOGGED after loading them with --unlogged. Unlogged "
+                 "tables are emptied if the database server crashes."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            dest="chunk_size",
+            default=getattr(settings, 'CALACCESS_LOAD_CHUNK_SIZE', None),
+            help="Load each model in chunks spanning this many filing_id values, committing "
+                 "each, and resume unfinished models after their last completed chunk "
+                 "(ignored with --incremental or --swap)."
+        )
 
     def handle(self, *args, **options):
         """
@@ -38,6 +211,12 @@ class Command(CalAccessCommand):
         super(Command, self).handle(*args, **options)
 
         self.force_restart = options.get("restart")
+        self.processes = options.get("processes") or 1
+        self.incremental = options.get("incremental")
+        self.swap = options.get("swap")
+        self.chunk_size = None if self.incremental or self.swap else options.get("chunk_size")
+        self.unlogged = options.get("unlogged") and not (self.incremental or self.swap)
+        self.keep_unlogged = options.get("keep_unlogged")
 
         # get or create the ProcessedDataVersion instance
         self.processed_version, created = self.get_or_create_processed_version()
@@ -59,28 +238,75 @@ class Command(CalAccessCommand):
             self.processed_version.process_start_datetime = now()
             self.processed_version.save()
 
-        # handle version models first
-        version_models = self.get_model_list('version')
-        self.load_model_list(version_models)
+        # handle version models first, then filing models, unless the
+        # dependencies between their load queries allow otherwise
+        model_list = self.get_model_list('version') + self.get_model_list('filing')
+        if self.incremental:
+            filing_ids = self.get_changed_filing_ids()
+            if self.verbosity >= 2:
+                self.log(" Reloading {0} new or amended filings.".format(len(filing_ids)))
+            # Roll back everything if any model fails, so a re-run finds the same filings
+            with transaction.atomic():
+                self.load_model_list(model_list, filing_ids=filing_ids)
+        elif self.chunk_size:
+            if self.force_restart:
+                self.processed_version.files.update(last_loaded_filing_id=None)
+            self.load_model_list(model_list)
+        else:
+            self.load_model_list(model_list)
+            if self.swap:
+                self.validate_swapped_models(model_list)
 
-        # then filing models
-        filing_models = self.get_model_list('filing')
-        self.load_model_list(filing_models)
+        # archive if django project setting enabled, including models finished by an earlier run
+        if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
+            model_names = [m._meta.object_name for m in model_list]
+            model_names.extend(self.get_unarchived_model_names(model_names))
+            if model_names:
+                call_command(
+                    'archivecalaccessprocessedfiles',
+                    *model_names,
+                    verbosity=self.verbosity,
+                    no_color=self.no_color
+                )
 
         self.success("Done!")
 
-    def get_model_list(self, model_type):
+    def get_filing_models(self):
         """
-        Return a list of models of the specified type to be loaded.
-
-        model_type must be "version" of "filing".
+        Return a list of every filing and filing version model.
         """
-        non_abstract_models = [
+        return [
             m for m in apps.get_app_config('calaccess_processed').get_models()
             if not m._meta.abstract and
             'filings' in str(m)
         ]
 
+    def get_unarchived_model_names(self, exclude=()):
+        """
+        Return a list of the names of filing and filing version models finished loading but not archived.
+
+        Models finished by an interrupted run are skipped when the load resumes,
+        but may never have been archived. Names in exclude are left out.
+        """
+        model_names = set(m._meta.object_name for m in self.get_filing_models())
+        unarchived = self.processed_version.files.filter(
+            process_finish_datetime__isnull=False,
+        ).filter(
+            Q(file_archive='') | Q(file_archive__isnull=True)
+        ).order_by('file_name').values_list('file_name', flat=True)
+        return [
+            name for name in unarchived
+            if name in model_names and name not in exclude
+        ]
+
+    def get_model_list(self, model_type):
+        """
+        Return a list of models of the specified type to be loaded.
+
+        model_type must be "version" of "filing".
+        """
+        non_abstract_models = self.get_filing_models()
+
         if model_type == 'version':
             models_to_load = [
                 m for m in non_abstract_models if 'Version' in str(m)
@@ -92,8 +318,9 @@ class Command(CalAccessCommand):
         else:
             raise Exception('model_type must be "version" or "filing".')
 
-        # if not forcing a restart, filter out the models already loaded
-        if not self.force_restart:
+        # if not forcing a restart, filter out the models already loaded,
+        # unless only reloading changed filings, which touches every model
+        if not self.force_restart and not self.incremental:
             loaded_models_q = ProcessedDataFile.objects.filter(
                 version=self.processed_version,
                 process_finish_datetime__isnull=False,
@@ -129,36 +356,201 @@ class Command(CalAccessCommand):
 
         return models_to_load
 
-    def load_model_list(self, model_list):
+    def get_changed_filing_ids(self):
         """
-        Iterate over the given list of models, loading each one.
+        Return a list of filing_id values that are new, amended or removed in the raw data.
+
+        Compares the raw (FILING_ID, AMEND_ID) pairs to those already in the processed
+        filing version models.
+        """
+        sql_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+            'sql',
+            'select_changed_filing_ids.sql',
+        )
+        with open(sql_path) as f:
+            sql = f.read()
+        with connection.cursor() as c:
+            c.execute(sql)
+            return [row[0] for row in c.fetchall()]
+
+    def load_model_list(self, model_list, filing_ids=None):
+        """
+        Load each of the given models after the models its load query reads from.
+
+        Models with no unloaded dependencies between them are loaded at the same
+        time if more than one worker process is available.
+
+        If a list of filing_ids is provided, only the rows for those filings are
+        replaced, one model at a time.
+
+        Any load stages the models read are built first.
         """
-        # iterate over all of filing models
+        self.models_by_label = dict((m._meta.label, m) for m in model_list)
+
+        # map each table to be loaded to the label and dependencies of its loader
+        loaders_by_table = OrderedDict()
+        stage_list = self.get_stage_list(model_list)
+        for stage in stage_list:
+            loaders_by_table[stage.db_table] = (stage.label, stage.load_dependencies)
         for m in model_list:
-            # set up the ProcessedDataFile instance
-            processed_file, created = ProcessedDataFile.objects.get_or_create(
-                version=self.processed_version,
-                file_name=m._meta.object_name,
+            loaders_by_table[m._meta.db_table] = (m._meta.label, m.objects.load_dependencies)
+
+        dependencies = [
+            (
+                label,
+                [loaders_by_table[t][0] for t in tables if t in loaders_by_table]
+            ) for label, tables in loaders_by_table.values()
+        ]
+        if filing_ids is None:
+            scheduler = LoadScheduler(dependencies, processes=self.processes)
+            if self.chunk_size:
+                # Worker processes can't write to the command's output, so they report to the logger
+                func = partial(
+                    load_model_in_chunks,
+                    self.chunk_size,
+                    self.processed_version.id,
+                    self.verbosity,
+                    log=self.log if scheduler.processes == 1 else None,
+                )
+            else:
+                func = partial(load_model, swap=self.swap)
+        else:
+            scheduler = LoadScheduler(dependencies)
+            func = partial(load_model_filings, filing_ids)
+            # clear out the filings' old rows, dependent models first
+            for model_label in reversed(scheduler.order):
+                if model_label not in self.models_by_label:
+                    continue
+                m = self.models_by_label[model_label]
+                deleted = m.objects.delete_filings(filing_ids)
+                if self.verbosity > 2:
+                    self.log(" Deleted {0} rows from {1}".format(deleted, m._meta.db_table))
+
+        if self.verbosity > 2 and scheduler.processes > 1:
+            self.log(" Loading with %s worker processes" % scheduler.processes)
+
+        unlogged_labels = set()
+        if filing_ids is None and self.unlogged:
+            unlogged_labels = self.get_unloggable_labels(model_list)
+            # Logged tables can't refer to unlogged ones, so switch dependent models first
+            for model_label in reversed(scheduler.order):
+                if model_label in unlogged_labels:
+                    self.models_by_label[model_label].objects.set_logged(False)
+
+        try:
+            scheduler.run(
+                func,
+                start_callback=self.start_model,
+                finish_callback=self.finish_model,
             )
-            processed_file.process_start_datetime = now()
-            processed_file.save()
-            # flush the processed model
-            if self.verbosity > 2:
-                self.log(" Truncating %s" % m._meta.db_table)
-            with connection.cursor() as c:
-                c.execute('TRUNCATE TABLE "%s" CASCADE' % (m._meta.db_table))
-            # load the processed model
-            if self.verbosity > 2:
-                self.log(" Loading %s" % m._meta.db_table)
-            m.objects.load_raw_data()
+            if filing_ids is not None:
+                # The stages only hold the changed filings' rows, so don't leave them around
+                for stage in stage_list:
+                    stage.drop()
+        finally:
+            if not self.keep_unlogged:
+                for model_label in scheduler.order:
+                    if model_label in unlogged_labels:
+                        m = self.models_by_label[model_label]
+                        if self.verbosity > 2:
+                            self.log(" Switching %s back to LOGGED" % m._meta.db_table)
+                        m.objects.set_logged(True)
 
-            processed_file.records_count = m.objects.count()
-            processed_file.process_finish_datetime = now()
-            processed_file.save()
+    def get_unloggable_labels(self, model_list):
+        """
+        Return the set of labels of the given models whose tables can be switched to UNLOGGED.
 
-            # archive if django project setting enabled
-            if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
-                call_command(
-                    'archivecalaccessprocessedfile',
-                    m._meta.object_name,
+        Logged tables can't refer to unlogged ones, so a model stays LOGGED if a
+        table that isn't being loaded, like one finished in an earlier run, refers
+        to it. So do the models it refers to in turn.
+        """
+        tables = dict((m._meta.db_table, m) for m in model_list)
+        while True:
+            logged = [
+                db_table for db_table, m in tables.items()
+                if not m.objects.referencing_tables.issubset(tables)
+            ]
+            if not logged:
+                break
+            for db_table in sorted(logged):
+                if self.verbosity > 0:
+                    self.log(
+                        " Leaving %s LOGGED, since a table that isn't being loaded refers to it" % db_table
+                    )
+                del tables[db_table]
+        return set(m._meta.label for m in tables.values())
+
+    def validate_swapped_models(self, model_list):
+        """
+        Validate the foreign keys left NOT VALID by swapping in the given models.
+
+        Each swap validates what it can, but foreign keys from models swapped in
+        later can only be validated once those are loaded too.
+        """
+        for m in model_list:
+            for table, name in m.objects.validate_referencing_constraints():
+                self.warn(
+                    " Foreign key {0} on {1} is NOT VALID, since some of its rows "
+                    "refer to rows missing from {2}".format(name, table, m._meta.db_table)
                 )
+
+    def get_stage_list(self, model_list):
+        """
+        Return a list of the load stages read by the given models, directly or through other stages.
+        """
+        stages_by_table = dict((s.db_table, s) for s in get_stage_list())
+        stage_list = []
+        tables = [t for m in model_list for t in m.objects.load_dependencies]
+        while tables:
+            stage = stages_by_table.pop(tables.pop(), None)
+            if stage:
+                stage_list.append(stage)
+                tables.extend(stage.load_dependencies)
+        return stage_list
+
+    def start_model(self, model_label):
+        """
+        Record the start of loading the processed model with the given label.
+        """
+        if model_label not in self.models_by_label:
+            if self.verbosity > 2:
+                self.log(" Building %s" % model_label)
+            return
+        m = self.models_by_label[model_label]
+        # set up the ProcessedDataFile instance
+        processed_file, created = ProcessedDataFile.objects.get_or_create(
+            version=self.processed_version,
+            file_name=m._meta.object_name,
+        )
+        processed_file.process_start_datetime = now()
+        processed_file.save()
+        if self.verbosity > 2:
+            self.log(" Loading %s" % m._meta.db_table)
+
+    def finish_model(self, model_label, result):
+        """
+        Record the completion of loading the processed model with the given label.
+
+        result is a tuple (number of rows in the model, if known without counting
+        them, list of (index or constraint name, seconds taken) tuples from
+        rebuilding its indexes).
+        """
+        if model_label not in self.models_by_label:
+            return
+        m = self.models_by_label[model_label]
+        result, timings = result
+        if self.verbosity > 2:
+            for name, seconds in timings:
+                self.log(" Built {0} on {1} in {2:.1f} secs".format(name, m._meta.db_table, seconds))
+        processed_file = ProcessedDataFile.objects.get(
+            version=self.processed_version,
+            file_name=m._meta.object_name,
+        )
+        if result is None or result < 0:
+            result = m.objects.count()
+        processed_file.records_count = result
+        # Nothing left to resume
+        processed_file.last_loaded_filing_id = None
+        processed_file.process_finish_datetime = now()
+        processed_file.save()
@@ -4,6 +4,7 @@
 Load the OCD CandidateContest and related models with scraped CAL-ACCESS data.
 """
 from calaccess_processed.models import (
+    OCDPostProxy,
     OCDRunoffProxy,
     OCDCandidacyProxy,
     ScrapedCandidateProxy,
@@ -25,6 +26,15 @@ class Command(CalAccessCommand):
         super(Command, self).handle(*args, **options)
         self.header("Load Candidate Contests")
 
+        # Resolve the post for each office candidates are running for up front
+        office_names = ScrapedCandidateProxy.objects.values_list('office_name', flat=True).distinct()
+        new_posts = OCDPostProxy.objects.prewarm(office_names)
+        if self.verbosity > 1:
+            for post in new_posts:
+                self.log(' Created new Post: %s' % post.label)
+            if new_posts:
+                self.log(' Created %s new Posts' % len(new_posts))
+
         # Load everything we can from the scrape
         for scraped_election in ScrapedCandidateElectionProxy.objects.all():
 
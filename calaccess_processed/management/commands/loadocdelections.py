@@ -5,7 +5,6 @@ Load OCD elections models with data extracted and scraped from CAL-ACCESS.
 """
 from django.apps import apps
 from django.conf import settings
-from django.utils.timezone import now
 from django.core.management import call_command
 from calaccess_processed.management.commands import LoadOCDElectionsBase
 
@@ -96,28 +95,22 @@ class Command(LoadOCDElectionsBase):
         core_models = [
             m for m in apps.get_app_config('core').get_models()
             if not m._meta.abstract and
-            m.objects.count() > 0
+            m.objects.exists()
         ]
 
         elections_models = [
             m for m in apps.get_app_config('elections').get_models()
             if not m._meta.abstract and
-            m.objects.count() > 0
+            m.objects.exists()
         ]
 
         models_to_load = core_models + elections_models
 
-        for m in models_to_load:
-            processed_data_file, created = self.processed_version.files.get_or_create(
-                file_name=m._meta.object_name,
-            )
-            processed_data_file.process_start_datetime = now()
-            processed_data_file.save()
-
+        if models_to_load:
             call_command(
-                'archivecalaccessprocessedfile',
-                m._meta.object_name,
+                'archivecalaccessprocessedfiles',
+                *[m._meta.object_name for m in models_to_load],
+                verbosity=self.verbosity,
+                no_color=self.no_color,
+                record_times=True
             )
-            processed_data_file.refresh_from_db()
-            processed_data_file.process_finish_datetime = now()
-            processed_data_file.save()
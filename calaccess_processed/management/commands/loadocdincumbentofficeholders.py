@@ -37,13 +37,18 @@ class Command(CalAccessCommand):
         """
         Load OCD Election, Membership and related models with data scraped from CAL-ACCESS website.
         """
-        for incumbent in ScrapedIncumbentProxy.objects.all():
-            # Get or create post
-            post, post_created = OCDPostProxy.objects.get_or_create_by_name(
-                incumbent.office_name,
-            )
-            if post_created and self.verbosity > 2:
+        # Resolve the post for each office held up front
+        office_names = ScrapedIncumbentProxy.objects.values_list('office_name', flat=True).distinct()
+        new_posts = OCDPostProxy.objects.prewarm(office_names)
+        if self.verbosity > 2:
+            for post in new_posts:
                 self.log(' Created new Post: %s' % post.label)
+            if new_posts:
+                self.log(' Created %s new Posts' % len(new_posts))
+
+        for incumbent in ScrapedIncumbentProxy.objects.all():
+            # Get the post, created above if it's new
+            post = OCDPostProxy.objects.get_or_create_by_name(incumbent.office_name)[0]
             # Get or person
             person, person_created = OCDPersonProxy.objects.get_or_create_from_calaccess(
                 incumbent.parsed_name,
@@ -6,6 +6,7 @@ Load OCD Organization model with parties extracted from raw CAL-ACCESS data.
 import re
 from opencivicdata.core.models import Organization
 from calaccess_raw.models.common import LookupCodesCd
+from calaccess_processed.caches import clear_caches
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -23,6 +24,8 @@ class Command(CalAccessCommand):
         super(Command, self).handle(*args, **options)
         self.header('Loading Parties')
         self.load()
+        # Cached party objects may have been replaced
+        clear_caches()
         self.success("Done!")
 
     def load(self):
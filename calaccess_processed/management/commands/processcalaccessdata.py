@@ -8,7 +8,7 @@ from django.conf import settings
 from django.core.files import File
 from django.utils.timezone import now
 from django.core.management import call_command
-from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+from calaccess_processed.archives import add_files_to_zip, compact_zip
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -38,6 +38,7 @@ class Command(CalAccessCommand):
         # Set options
         super(Command, self).handle(*args, **options)
         self.force_restart = options.get("restart")
+        self.zip_path = os.path.join(self.data_dir, 'processed.zip')
 
         # Get or create the logger record
         self.processed_version, created = self.get_or_create_processed_version()
@@ -59,6 +60,9 @@ class Command(CalAccessCommand):
             if self.force_restart:
                 self.processed_version.process_finish_datetime = None
             self.processed_version.save()
+            # files are zipped as they're archived, so start a new zip
+            if os.path.exists(self.zip_path):
+                os.remove(self.zip_path)
 
         # then load
         self.load()
@@ -67,6 +71,22 @@ class Command(CalAccessCommand):
         if getattr(settings, 'CALACCESS_STORE_ARCHIVE', False):
             # then zip
             self.zip()
+            # and archive the changes since the last version, if enabled
+            if getattr(settings, 'CALACCESS_ARCHIVE_DIFFS', False):
+                call_command(
+                    'diffcalaccessprocessedversions',
+                    verbosity=self.verbosity,
+                    no_color=self.no_color,
+                )
+                self.duration()
+            # and a database snapshot, if enabled
+            if getattr(settings, 'CALACCESS_ARCHIVE_SNAPSHOT', False):
+                call_command(
+                    'archivecalaccessprocessedsnapshot',
+                    verbosity=self.verbosity,
+                    no_color=self.no_color,
+                )
+                self.duration()
 
         # Wrap up the log
         self.processed_version.process_finish_datetime = now()
@@ -95,34 +115,30 @@ class Command(CalAccessCommand):
 
     def zip(self):
         """
-        Zip up all processed data files and archive the zip.
+        Finish the zip of all processed data files and archive it.
+
+        Files are added to the zip as they're archived, except where Python can't
+        write to a zip from a stream. Those are added here from the csv dir.
         """
         if self.verbosity:
             self.header("Zipping processed files")
 
         # Remove previous zip file
         self.processed_version.zip_archive.delete()
-        zip_path = os.path.join(self.data_dir, 'processed.zip')
-
-        # enable zipfile compression
-        compression = ZIP_DEFLATED
-
-        try:
-            zf = ZipFile(zip_path, 'w', compression, allowZip64=True)
-        except RuntimeError:
-            self.error('Zip file cannot be compressed (check zlib module).')
-            compression = ZIP_STORED
-            zf = ZipFile(zip_path, 'w', compression, allowZip64=True)
+        zip_path = self.zip_path
 
-        # loop over and save files in csv dir
-        for f in os.listdir(self.processed_data_dir):
-            if self.verbosity > 2:
+        # compress any files left in csv dir at the same time and add them
+        file_names = sorted(os.listdir(self.processed_data_dir))
+        if self.verbosity > 2:
+            for f in file_names:
                 self.log(" Adding %s to zip" % f)
-            csv_path = os.path.join(self.processed_data_dir, f)
-            zf.write(csv_path, f)
+        add_files_to_zip(
+            zip_path,
+            [(os.path.join(self.processed_data_dir, f), f) for f in file_names],
+        )
 
-        # close the zip file
-        zf.close()
+        # drop the older copies of any files archived again after a restart
+        compact_zip(zip_path)
         if self.verbosity > 2:
             self.log(" All files zipped")
 
@@ -5,108 +5,561 @@ Custom managers for working with CAL-ACCESS processed data models.
 """
 from __future__ import unicode_literals
 import os
-from django.db import models, connection
+import re
+import sys
+import hashlib
+import logging
+from django.apps import apps
+from django.utils import six
+from django.db import models, connection, transaction, IntegrityError
+from calaccess_processed.indexes import IndexRebuilder
+from calaccess_processed.scheduler import get_sql_table_names
+logger = logging.getLogger(__name__)
+
+
+# Matches quoted upper-case table names, like the raw CAL-ACCESS tables, read by raw sql
+RAW_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|from|join)\s+"([A-Z0-9_]+)"')
+
+
+def get_model_by_db_table(db_table):
+    """
+    Return the installed model with the given database table name, or None.
+    """
+    for m in apps.get_models():
+        if m._meta.db_table == db_table:
+            return m
+    return None
+
+
+def get_constrained_fields(model):
+    """
+    Return list of the model's fields with db_constraint set to True.
+    """
+    return [
+        f for f in model._meta.fields
+        if hasattr(f, 'db_constraint') and f.db_constraint
+    ]
+
+
+def get_referencing_tables(db_table):
+    """
+    Return set of database tables, other than db_table itself, with constrained foreign keys to db_table.
+    """
+    tables = set(
+        m._meta.db_table for m in apps.get_models()
+        for f in get_constrained_fields(m)
+        if f.related_model._meta.db_table == db_table
+    )
+    tables.discard(db_table)
+    return tables
+
+
+def get_staging_name(name):
+    """
+    Return a short, unique name for the staging copy of an index or constraint.
+    """
+    return 'staging_%s' % hashlib.md5(name.encode('utf-8')).hexdigest()[:20]
+
+
+def get_table_columns(db_table):
+    """
+    Return list of the column names of a database table, with or without a model.
+    """
+    model = get_model_by_db_table(db_table)
+    if model:
+        return [f.column for f in model._meta.fields]
+    with connection.cursor() as c:
+        return [col.name for col in connection.introspection.get_table_description(c, db_table)]
+
+
+def get_estimated_count(db_table):
+    """
+    Return the planner's estimate of the number of rows in a database table.
+
+    Much cheaper than counting on large tables, and accurate as of the table's last
+    VACUUM or ANALYZE. Returns None if the table has never been analyzed.
+    """
+    with connection.cursor() as c:
+        c.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [db_table])
+        count = c.fetchone()[0]
+    return count if count >= 0 else None
+
+
+def get_filing_filter(db_table, predicate='= ANY(%s)'):
+    """
+    Return a sql condition limiting a database table to the rows for some filings.
+
+    predicate is applied to the table's filing_id values, and its parameters are
+    the condition's parameters. By default it expects a list of filing_id values.
+    Returns None if the table is not linked to a filing.
+    """
+    columns = get_table_columns(db_table)
+    for column in columns:
+        if column.upper() == 'FILING_ID':
+            return '"%s" %s' % (column, predicate)
+    model = get_model_by_db_table(db_table)
+    if model and 'filing_version_id' in columns:
+        version_table = model._meta.get_field('filing_version').related_model._meta.db_table
+        return 'filing_version_id IN (SELECT id FROM "%s" WHERE filing_id %s)' % (version_table, predicate)
+    return None
+
+
+def get_raw_table_names(sql):
+    """
+    Return set of the quoted upper-case table names after FROM or JOIN in a raw sql query.
+
+    Quoted upper-case column names, like "FILING_ID", are left out.
+    """
+    return set(RAW_TABLE_PATTERN.findall(sql))
+
+
+def get_filing_linked_sources(sql, exclude_table=None):
+    """
+    Return list of database tables read by a raw sql query that are linked to a filing.
+
+    Raw CAL-ACCESS tables come first, then processed tables (including load stages)
+    in the order needed to filter each by filing_id.
+    """
+    raw_tables = []
+    for db_table in sorted(get_raw_table_names(sql)):
+        if get_model_by_db_table(db_table) and get_filing_filter(db_table):
+            raw_tables.append(db_table)
+
+    processed_tables = []
+    for db_table in sorted(get_sql_table_names(sql)):
+        if db_table != exclude_table and get_filing_filter(db_table):
+            processed_tables.append(db_table)
+    # Filing versions must be shadowed before anything filtered through them
+    processed_tables.sort(key=lambda t: 'filing_version_id IN' in get_filing_filter(t))
+
+    return raw_tables + processed_tables
+
+
+def get_filing_id_range(sql, exclude_table=None):
+    """
+    Return the lowest and highest filing_id values in the tables read by a raw sql query.
+
+    Returns (None, None) if none of the tables are linked directly to a filing.
+    """
+    first, last = None, None
+    with connection.cursor() as c:
+        for db_table in get_filing_linked_sources(sql, exclude_table=exclude_table):
+            column = [col for col in get_table_columns(db_table) if col.upper() == 'FILING_ID']
+            if not column:
+                continue
+            c.execute('SELECT MIN("{1}"), MAX("{1}") FROM "{0}"'.format(db_table, column[0]))
+            low, high = c.fetchone()
+            if low is not None:
+                first = low if first is None else min(first, low)
+                last = high if last is None else max(last, high)
+    return first, last
+
+
+def execute_for_filing_filter(sql, predicate, params, exclude_table=None):
+    """
+    Execute a raw sql load query limited to the rows for some filings.
+
+    The query runs unchanged, but with every table it reads that is linked to a
+    filing shadowed by a temporary table of the same name holding only the rows
+    where the filing_id values match predicate (see get_filing_filter). The table
+    the query loads should be passed as exclude_table.
+
+    Returns the number of rows affected by the query.
+    """
+    shadowed = []
+    with connection.cursor() as c:
+        try:
+            for db_table in get_filing_linked_sources(sql, exclude_table=exclude_table):
+                # Temporary tables take precedence over others with the same name
+                c.execute(
+                    'CREATE TEMPORARY TABLE "{0}" AS SELECT * FROM "{0}" WHERE {1}'.format(
+                        db_table,
+                        get_filing_filter(db_table, predicate),
+                    ),
+                    params,
+                )
+                shadowed.append(db_table)
+                c.execute('ANALYZE "%s"' % db_table)
+            c.execute(sql)
+            return c.rowcount
+        finally:
+            for db_table in reversed(shadowed):
+                c.execute('DROP TABLE pg_temp."%s"' % db_table)
+
+
+def execute_for_filings(sql, filing_ids, exclude_table=None):
+    """
+    Execute a raw sql load query limited to the rows for a list of filing_id values.
+
+    Returns the number of rows affected by the query.
+    """
+    return execute_for_filing_filter(sql, '= ANY(%s)', [list(filing_ids)], exclude_table=exclude_table)
+
+
+def execute_for_filing_range(sql, first, last, exclude_table=None):
+    """
+    Execute a raw sql load query limited to the rows for a range of filing_id values.
+
+    Returns the number of rows affected by the query.
+    """
+    return execute_for_filing_filter(sql, 'BETWEEN %s AND %s', [first, last], exclude_table=exclude_table)
 
 
 class ProcessedDataManager(models.Manager):
     """
     Utilities for loading raw CAL-ACCESS data into processed data models.
     """
-    def add_constraints_and_indexes(self):
+    def load_raw_data(self, filing_ids=None, timings=None):
+        """
+        Load the model by executing its raw sql load query.
+
+        Temporarily drops the constraints and indexes on the model's table, then
+        rebuilds them in parallel (see IndexRebuilder). If a timings list is
+        provided, an (index or constraint name, seconds taken) tuple is added to
+        it for each one rebuilt.
+
+        If a list of filing_ids is provided, only rows for those filings are loaded.
+
+        Returns the number of rows loaded.
+        """
+        if filing_ids is not None:
+            return self.load_raw_data_for_filings(filing_ids)
+
+        # The table is replaced, so a chunked load can't resume where it left off
+        self.clear_chunk_progress()
+
+        rebuilder = IndexRebuilder(self.db_table)
+        rebuilder.collect()
+        rebuilder.drop()
+
+        c = connection.cursor()
+        try:
+            c.execute(self.raw_data_load_query)
+            rowcount = c.rowcount
+        except Exception:
+            exc_info = sys.exc_info()
+            c.close()
+            # Put the indexes back, without hiding why the load failed
+            try:
+                rebuilder.rebuild()
+            except Exception:
+                logger.exception("Couldn't rebuild the indexes on %s after its load failed" % self.db_table)
+            six.reraise(*exc_info)
+        c.close()
+        rebuilder.rebuild()
+        if timings is not None:
+            timings.extend(rebuilder.timings)
+        return rowcount
+
+    def load_raw_data_and_swap(self):
         """
-        Re-create constraints and indexes on the model and its fields.
+        Load the model into a staging table and then swap it in for the live table.
+
+        Indexes and constraints are built on the staging table after it's loaded, and
+        the live table is replaced by renaming inside a single transaction, so readers
+        never see it empty or unindexed.
+
+        Returns the number of rows loaded.
         """
-        with connection.schema_editor() as schema_editor:
-            schema_editor.alter_unique_together(
-                self.model,
-                (),
-                self.model._meta.unique_together,
+        live_table = self.model._meta.db_table
+        staging_table = '%s_staging' % live_table
+
+        # The table is replaced, so a chunked load can't resume where it left off
+        self.clear_chunk_progress()
+
+        with connection.cursor() as c:
+            c.execute('DROP TABLE IF EXISTS "%s"' % staging_table)
+            c.execute(
+                'CREATE TABLE "{0}" (LIKE "{1}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'.format(
+                    staging_table,
+                    live_table,
+                )
             )
+            c.execute(self.get_staging_load_query(staging_table))
+            rowcount = c.rowcount
+            renames = self.copy_constraints_and_indexes(c, live_table, staging_table)
+
+        with transaction.atomic():
+            with connection.cursor() as c:
+                self.swap_tables(c, live_table, staging_table, renames)
+
+        # Outside the swap, so checking other tables' rows doesn't hold its locks
+        self.validate_referencing_constraints()
+
+        return rowcount
+
+    def validate_referencing_constraints(self):
+        """
+        Validate the NOT VALID foreign keys on other tables that refer to the model's table.
+
+        Foreign keys whose rows still refer to rows missing from the table, until
+        their own tables are reloaded, are left NOT VALID.
 
-            schema_editor.alter_index_together(
-                self.model,
-                (),
-                self.model._meta.index_together,
+        Returns a list of (table, constraint name) tuples of those left NOT VALID.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT conrelid::regclass::text, conname
+                FROM pg_constraint
+                WHERE confrelid = %s::regclass
+                AND contype = 'f'
+                AND NOT convalidated
+                """,
+                [self.db_table],
             )
+            constraints = c.fetchall()
+
+        not_valid = []
+        for table, name in constraints:
+            try:
+                with transaction.atomic():
+                    with connection.cursor() as c:
+                        c.execute('ALTER TABLE %s VALIDATE CONSTRAINT "%s"' % (table, name))
+            except IntegrityError:
+                not_valid.append((table, name))
+        return not_valid
+
+    def get_staging_load_query(self, staging_table):
+        """
+        Return the model's raw sql load query, inserting into staging_table instead.
+        """
+        return re.sub(
+            r'INSERT INTO\s+"?%s\b"?' % self.model._meta.db_table,
+            'INSERT INTO "%s"' % staging_table,
+            self.raw_data_load_query,
+            count=1,
+            flags=re.IGNORECASE,
+        )
+
+    def copy_constraints_and_indexes(self, cursor, live_table, staging_table):
+        """
+        Create copies of the live table's constraints and indexes on the staging table.
+
+        Returns a list of (type, staging name, live name) tuples for renaming the
+        copies once the staging table is swapped in.
+        """
+        renames = []
 
-            for field in self.model.objects.constrained_fields:
-                field_copy = field.__copy__()
-                field_copy.db_constraint = False
-                schema_editor.alter_field(
-                    self.model, field_copy, field
+        # Primary key, unique and foreign key constraints (and the indexes behind them)
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass
+            AND contype IN ('p', 'u', 'f')
+            ORDER BY contype DESC
+            """,
+            [live_table],
+        )
+        for name, definition in cursor.fetchall():
+            staging_name = get_staging_name(name)
+            cursor.execute(
+                'ALTER TABLE "{0}" ADD CONSTRAINT "{1}" {2}'.format(
+                    staging_table,
+                    staging_name,
+                    definition.replace(' NOT VALID', ''),
                 )
+            )
+            renames.append(('CONSTRAINT', staging_name, name))
 
-            for field in self.model.objects.indexed_fields:
-                field_copy = field.__copy__()
-                field_copy.db_index = False
-                schema_editor.alter_field(
-                    self.model, field_copy, field
+        # All other indexes
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(i.oid)
+            FROM pg_index x
+            JOIN pg_class i
+            ON i.oid = x.indexrelid
+            WHERE x.indrelid = %s::regclass
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid
+            )
+            """,
+            [live_table],
+        )
+        for name, definition in cursor.fetchall():
+            staging_name = get_staging_name(name)
+            cursor.execute(
+                re.sub(
+                    r'INDEX \S+ ON (ONLY )?\S+ ',
+                    'INDEX "%s" ON "%s" ' % (staging_name, staging_table),
+                    definition,
+                    count=1,
                 )
+            )
+            renames.append(('INDEX', staging_name, name))
 
-    def drop_constraints_and_indexes(self):
+        return renames
+
+    def swap_tables(self, cursor, live_table, staging_table, renames):
         """
-        Temporarily drop constraints and indexes on the model and its fields.
+        Replace the live table with the loaded staging table.
+
+        Should be run inside a transaction.
         """
-        with connection.schema_editor() as schema_editor:
-            schema_editor.alter_unique_together(
-                self.model,
-                self.model._meta.unique_together,
-                (),
+        old_table = '%s_old' % live_table
+
+        # Foreign keys on other tables follow the live table when it's renamed
+        cursor.execute(
+            """
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE confrelid = %s::regclass
+            AND conrelid <> confrelid
+            AND contype = 'f'
+            """,
+            [live_table],
+        )
+        referencing_constraints = cursor.fetchall()
+
+        # Sequences (e.g., for the id column) are dropped with the table that owns them
+        cursor.execute(
+            """
+            SELECT s.relname, a.attname
+            FROM pg_depend d
+            JOIN pg_class s
+            ON s.oid = d.objid
+            AND s.relkind = 'S'
+            JOIN pg_attribute a
+            ON a.attrelid = d.refobjid
+            AND a.attnum = d.refobjsubid
+            WHERE d.refobjid = %s::regclass
+            AND d.deptype = 'a'
+            """,
+            [live_table],
+        )
+        owned_sequences = cursor.fetchall()
+
+        cursor.execute('ALTER TABLE "%s" RENAME TO "%s"' % (live_table, old_table))
+        cursor.execute('ALTER TABLE "%s" RENAME TO "%s"' % (staging_table, live_table))
+
+        # Point the other tables' foreign keys at the new table. Their rows are
+        # checked after the swap (see validate_referencing_constraints).
+        for table, name, definition in referencing_constraints:
+            cursor.execute('ALTER TABLE %s DROP CONSTRAINT "%s"' % (table, name))
+            cursor.execute(
+                'ALTER TABLE {0} ADD CONSTRAINT "{1}" {2} NOT VALID'.format(
+                    table,
+                    name,
+                    definition.replace(' NOT VALID', ''),
+                )
             )
 
-            schema_editor.alter_index_together(
-                self.model,
-                self.model._meta.index_together,
-                (),
+        for sequence, column in owned_sequences:
+            cursor.execute(
+                'ALTER SEQUENCE "%s" OWNED BY "%s"."%s"' % (sequence, live_table, column)
             )
 
-            for field in self.model.objects.constrained_fields:
-                field_copy = field.__copy__()
-                field_copy.db_constraint = False
-                schema_editor.alter_field(
-                    self.model, field, field_copy
-                )
+        cursor.execute('DROP TABLE "%s"' % old_table)
 
-            for field in self.model.objects.indexed_fields:
-                field_copy = field.__copy__()
-                field_copy.db_index = False
-                schema_editor.alter_field(
-                    self.model, field, field_copy
+        # Give the copied constraints and indexes their original names
+        for kind, staging_name, name in renames:
+            if kind == 'INDEX':
+                cursor.execute('ALTER INDEX "%s" RENAME TO "%s"' % (staging_name, name))
+            else:
+                cursor.execute(
+                    'ALTER TABLE "%s" RENAME CONSTRAINT "%s" TO "%s"' % (live_table, staging_name, name)
                 )
 
-    def load_raw_data(self):
+    def load_raw_data_for_filings(self, filing_ids):
         """
-        Load the model by executing its raw sql load query.
+        Load the model's rows for a list of filing_id values.
+
+        Constraints and indexes are left in place. Any existing rows for the
+        filings should be deleted first (see delete_filings).
 
-        Temporarily drops any constraints or indexes on the model.
+        Returns the number of rows loaded.
         """
-        try:
-            self.drop_constraints_and_indexes()
-        except ValueError as e:
-            print(e)
-            print('Constrained fields: %s' % self.constrained_fields)
-            print('Indexed fields: %s' % self.indexed_fields)
-            dropped = False
-        else:
-            dropped = True
+        return execute_for_filings(
+            self.raw_data_load_query,
+            filing_ids,
+            exclude_table=self.model._meta.db_table,
+        )
 
-        c = connection.cursor()
-        try:
-            c.execute(self.raw_data_load_query)
-        finally:
-            c.close()
-            if dropped:
-                self.add_constraints_and_indexes()
+    def load_raw_data_in_chunks(self, chunk_size, start_after=None, callback=None):
+        """
+        Load the model by executing its raw sql load query on one range of filing_id values at a time.
+
+        Each range spans chunk_size filing_id values and is committed on its own.
+        Constraints and indexes are left in place.
+
+        If start_after is provided, only filings with higher filing_id values are
+        loaded, so an interrupted load can pick up after its last completed chunk.
+
+        callback is called inside each chunk's transaction with the chunk's first
+        and last filing_id values, the highest filing_id value to be loaded and
+        the number of rows loaded.
+
+        Returns the total number of rows loaded.
+        """
+        sql = self.raw_data_load_query
+        first, last = get_filing_id_range(sql, exclude_table=self.db_table)
+        if first is None:
+            return 0
+        if start_after is not None:
+            first = max(first, start_after + 1)
+
+        total = 0
+        while first <= last:
+            chunk_last = min(first + chunk_size - 1, last)
+            with transaction.atomic():
+                rows = execute_for_filing_range(sql, first, chunk_last, exclude_table=self.db_table)
+                if callback:
+                    callback(first, chunk_last, last, rows)
+            total += rows
+            first = chunk_last + 1
+        return total
+
+    def clear_chunk_progress(self):
+        """
+        Forget the last chunk of filings recorded as loaded into the model by an unfinished chunked load.
+        """
+        ProcessedDataFile = apps.get_model('calaccess_processed', 'ProcessedDataFile')
+        ProcessedDataFile.objects.filter(
+            file_name=self.model._meta.object_name,
+        ).update(last_loaded_filing_id=None)
+
+    def set_logged(self, logged=True):
+        """
+        Switch the model's table to LOGGED, or to UNLOGGED if logged is False.
+
+        Unlogged tables skip the write-ahead log, so they load faster, but they
+        are emptied if the database server crashes.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'ALTER TABLE "%s" SET %s' % (self.db_table, 'LOGGED' if logged else 'UNLOGGED')
+            )
+
+    @property
+    def estimated_count(self):
+        """
+        Return the planner's estimate of the number of rows in the model's table.
+        """
+        return get_estimated_count(self.db_table)
+
+    def delete_filings(self, filing_ids):
+        """
+        Delete the model's rows for a list of filing_id values.
+
+        Returns the number of rows deleted.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                'DELETE FROM "{0}" WHERE {1}'.format(
+                    self.model._meta.db_table,
+                    get_filing_filter(self.model._meta.db_table),
+                ),
+                [list(filing_ids)],
+            )
+            return c.rowcount
 
     @property
     def constrained_fields(self):
         """
         Returns list of model's fields with db_constraint set to True.
         """
-        return [
-            f for f in self.model._meta.fields
-            if hasattr(f, 'db_constraint') and f.db_constraint
-        ]
+        return get_constrained_fields(self.model)
 
     @property
     def indexed_fields(self):
@@ -132,7 +585,7 @@ class ProcessedDataManager(models.Manager):
         """
         Return the model's database table name as a string.
         """
-        return self._meta.db_table
+        return self.model._meta.db_table
 
     @property
     def raw_data_load_query(self):
@@ -145,6 +598,28 @@ class ProcessedDataManager(models.Manager):
                 sql = f.read()
         return sql
 
+    @property
+    def load_dependencies(self):
+        """
+        Return set of processed database tables that must be loaded before the model.
+
+        Includes the tables read by the model's load query and the tables its
+        constrained foreign keys refer to.
+        """
+        tables = get_sql_table_names(self.raw_data_load_query)
+        tables.update(f.related_model._meta.db_table for f in self.constrained_fields)
+        tables.discard(self.db_table)
+        return tables
+
+    @property
+    def referencing_tables(self):
+        """
+        Return set of database tables whose constrained foreign keys refer to the model's table.
+
+        The reverse of load_dependencies' foreign key tables.
+        """
+        return get_referencing_tables(self.db_table)
+
     @property
     def raw_data_load_query_path(self):
         """
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='last_loaded_filing_id',
+            field=models.IntegerField(help_text='Highest filing_id value in the last completed chunk of a load run in chunks, used to resume an interrupted load', null=True, verbose_name='last loaded filing_id'),
+        ),
+    ]
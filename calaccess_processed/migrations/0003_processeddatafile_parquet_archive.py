@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0002_processeddatafile_last_loaded_filing_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='parquet_archive',
+            field=models.FileField(blank=True, help_text='An archive of the processed file in Parquet format', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='parquet archive of processed file'),
+        ),
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='parquet_size',
+            field=models.BigIntegerField(default=0, help_text='Size of the processed file in Parquet format (in bytes)', verbose_name='size of processed parquet file (in bytes)'),
+        ),
+    ]
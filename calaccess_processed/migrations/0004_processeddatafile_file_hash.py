@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0003_processeddatafile_parquet_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='file_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 hex digest of the contents of the processed file', max_length=64, verbose_name='hash of processed data file'),
+        ),
+    ]
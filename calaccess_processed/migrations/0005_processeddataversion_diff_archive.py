@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0004_processeddatafile_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='diff_archive',
+            field=models.FileField(blank=True, help_text='An archive zip of the rows added, removed or changed in each processed file since the diff base version', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='diff zip archive'),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='diff_base_version',
+            field=models.ForeignKey(help_text='Foreign key referencing the earlier processed data version the diff archive is compared with', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='calaccess_processed.ProcessedDataVersion', verbose_name='diff base version'),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='diff_size',
+            field=models.BigIntegerField(help_text='The size (in bytes) of the zip of diffs since the diff base version', null=True, verbose_name='size of diff zip (in bytes)'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+import calaccess_processed
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0005_processeddataversion_diff_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='duckdb_archive',
+            field=models.FileField(blank=True, help_text='An archive of a DuckDB database of all processed files', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='DuckDB database archive'),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='duckdb_size',
+            field=models.BigIntegerField(help_text='The size (in bytes) of the DuckDB database of processed files', null=True, verbose_name='size of DuckDB database (in bytes)'),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='sqlite_archive',
+            field=models.FileField(blank=True, help_text='An archive of a SQLite database of all processed files', max_length=255, upload_to=calaccess_processed.archive_directory_path, verbose_name='SQLite database archive'),
+        ),
+        migrations.AddField(
+            model_name='processeddataversion',
+            name='sqlite_size',
+            field=models.BigIntegerField(help_text='The size (in bytes) of the SQLite database of processed files', null=True, verbose_name='size of SQLite database (in bytes)'),
+        ),
+    ]
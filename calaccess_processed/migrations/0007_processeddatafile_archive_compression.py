@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0006_processeddataversion_snapshot_archives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='archive_compression',
+            field=models.CharField(blank=True, help_text='Compression of the archive of the processed file ("gzip" or "zstd"), or blank if it is not compressed', max_length=10, verbose_name='compression of archive'),
+        ),
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='archive_size',
+            field=models.BigIntegerField(default=0, help_text="Size of the archive of the processed file as stored (in bytes), which is smaller than the file's size if it is compressed", verbose_name='size of archive (in bytes)'),
+        ),
+    ]
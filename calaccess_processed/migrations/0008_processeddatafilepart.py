@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.3 on 2026-10-16 12:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calaccess_processed', '0007_processeddatafile_archive_compression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedDataFilePart',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part_number', models.IntegerField(help_text='Position of the part in the archive, starting at 1', verbose_name='part number')),
+                ('size', models.BigIntegerField(help_text='Size of the part (in bytes)', verbose_name='size of part (in bytes)')),
+                ('sha256', models.CharField(help_text='SHA-256 hex digest of the part, used to check that a retry would upload the same bytes', max_length=64, verbose_name='hash of part')),
+                ('etag', models.CharField(help_text='Entity tag the storage backend returned for the part', max_length=255, verbose_name='entity tag')),
+                ('processed_file', models.ForeignKey(help_text='Foreign key referencing the processed data file being uploaded', on_delete=django.db.models.deletion.CASCADE, related_name='upload_parts', to='calaccess_processed.ProcessedDataFile', verbose_name='processed data file')),
+            ],
+            options={
+                'ordering': ('processed_file', 'part_number'),
+                'verbose_name': 'TRACKING: processed CAL-ACCESS data file upload part',
+            },
+        ),
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='upload_id',
+            field=models.CharField(blank=True, help_text='Id of the unfinished upload of the archive in parts, used to resume it after a failure', max_length=255, verbose_name='unfinished upload id'),
+        ),
+        migrations.AddField(
+            model_name='processeddatafile',
+            name='upload_name',
+            field=models.CharField(blank=True, help_text='Name in storage of the archive being uploaded in parts', max_length=255, verbose_name='unfinished upload name'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='processeddatafilepart',
+            unique_together=set([('processed_file', 'part_number')]),
+        ),
+    ]
@@ -83,6 +83,7 @@ from .research import (
 from .tracking import (
     ProcessedDataVersion,
     ProcessedDataFile,
+    ProcessedDataFilePart,
 )
 from .proxies import (
     RawFilerToFilerTypeCdManager,
@@ -180,6 +181,7 @@ __all__ = (
     'FilingIDValue',
     'ProcessedDataVersion',
     'ProcessedDataFile',
+    'ProcessedDataFilePart',
     'RawFilerToFilerTypeCdManager',
     'ScrapedCandidateProxy',
     'ScrapedCandidateElectionProxy',
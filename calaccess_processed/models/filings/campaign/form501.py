@@ -9,6 +9,8 @@ from datetime import date
 import calaccess_processed
 from django.db import models
 from calaccess_processed import corrections
+from calaccess_processed.caches import ocd_cache
+from calaccess_processed.lookups import Form501Matcher
 from opencivicdata.elections.models import CandidateContest
 from calaccess_processed.managers import ProcessedDataManager
 from django.utils.encoding import python_2_unicode_compatible
@@ -20,6 +22,15 @@ class Form501FilingManager(ProcessedDataManager):
     """
     A custom manager for Form 501 filings.
     """
+    def get_matcher(self):
+        """
+        Return a Form501Matcher of every filing, built once and then kept in the OCD cache.
+        """
+        return ocd_cache.get(
+            (self.model._meta.label, 'matcher'),
+            lambda: Form501Matcher(self.get_queryset().order_by('filing_id').iterator())
+        )
+
     def without_candidacy(self):
         """
         Returns Form 501 filings that do not have an OCD Candidacy yet.
@@ -5,6 +5,8 @@ Proxy models for augmenting our source data tables with methods useful for proce
 """
 from __future__ import unicode_literals
 from django.db import models
+from calaccess_processed.caches import ocd_cache
+from calaccess_processed.lookups import FilerTypeIndex
 from calaccess_raw.models import FilerToFilerTypeCd, LookupCodesCd
 
 
@@ -12,6 +14,54 @@ class RawFilerToFilerTypeCdManager(models.Manager):
     """
     Custom helpers for the calaccess_raw FilerToFilerTypeCd model.
     """
+    def build_index(self):
+        """
+        Return a FilerTypeIndex of every row in the table.
+
+        Rows effective on the same date are ordered by id, so the index takes the
+        one with the highest id.
+        """
+        rows = self.get_queryset().order_by(
+            'filer_id',
+            'effect_dt',
+            'id',
+        ).values_list(
+            'filer_id',
+            'effect_dt',
+            'party_cd',
+            'race',
+            'district_cd',
+        ).iterator()
+        return FilerTypeIndex(rows)
+
+    def get_index(self):
+        """
+        Return the FilerTypeIndex of the table, built once and then kept in the OCD cache.
+        """
+        return ocd_cache.get((self.model._meta.label, 'index'), self.build_index)
+
+    def get_lookup_codes(self):
+        """
+        Return a dict mapping each LookupCodesCd code_id to the string of its object.
+
+        Codes shared by more than one object map to None. The dict is built once
+        and then kept in the OCD cache.
+        """
+        def build():
+            codes = {}
+            for obj in LookupCodesCd.objects.all().iterator():
+                codes[obj.code_id] = None if obj.code_id in codes else "{}".format(obj)
+            return codes
+        return ocd_cache.get((LookupCodesCd._meta.label, 'codes'), build)
+
+    def get_by_filer_id_and_date(self, filer_id, election_date):
+        """
+        Return a tuple (party_cd, race, district_cd) of the given filer_id, effective before election_date.
+
+        Returns None if not found.
+        """
+        return self.get_index().get(filer_id, election_date)
+
     def get_office_by_filer_id_and_date(self, filer_id, election_date):
         """
         Lookup the office for the given filer_id, effective before election_date.
@@ -19,28 +69,30 @@ class RawFilerToFilerTypeCdManager(models.Manager):
         Return a string containg the office name and district number (if applicable),
         or None if not found.
         """
-        # Try a straight query for it
+        # Try the index for it
         try:
-            ftft = self.get_queryset().filter(filer_id=filer_id, effect_dt__lte=election_date).latest('effect_dt')
-        except (self.model.DoesNotExist, ValueError):
+            ftft = self.get_by_filer_id_and_date(filer_id, election_date)
+        except ValueError:
+            ftft = None
+        if ftft is None:
             # If you don't find it, quit.
             return None
+        party_cd, race, district_cd = ftft
+        codes = self.get_lookup_codes()
 
         # Look up the race type
-        try:
-            office = LookupCodesCd.objects.get(code_id=ftft.race)
-        except (LookupCodesCd.DoesNotExist, LookupCodesCd.MultipleObjectsReturned):
+        office = codes.get(race)
+        if office is None:
             # If you can't find it, quit.
             return None
 
         # If we don't have a valid district code, just return the name.
-        if not ftft.district_cd or ftft.district_cd == 0:
-            return "{}".format(office).strip()
+        if not district_cd or district_cd == 0:
+            return office.strip()
 
         # Otherwise, get the district and tack that on
-        try:
-            district = LookupCodesCd.objects.get(code_id=ftft.district_cd)
-        except (LookupCodesCd.DoesNotExist, LookupCodesCd.MultipleObjectsReturned):
+        district = codes.get(district_cd)
+        if district is None:
             return None
 
         # If you found a district, return the string with office combined in there
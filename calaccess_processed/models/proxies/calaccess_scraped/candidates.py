@@ -7,9 +7,7 @@ from __future__ import unicode_literals
 import re
 import logging
 from calaccess_processed import corrections
-from django.db.models.functions import Concat
-from django.db.models import Value, CharField
-from ..opencivicdata.posts import OCDPostProxy
+from ..opencivicdata.posts import OCDPostProxy, OFFICE_NAME_REGEX
 from ..opencivicdata.parties import OCDPartyProxy
 from .candidateelections import ScrapedCandidateElectionProxy
 from calaccess_scraped.models import Candidate, Incumbent
@@ -77,9 +75,8 @@ class ScrapedNameMixin(object):
 
         Return a dict with two keys: type and district.
         """
-        office_pattern = r'^(?P<type>[A-Z ]+)(?P<district>\d{2})?$'
         try:
-            parsed = re.match(office_pattern, self.office_name.upper()).groupdict()
+            parsed = OFFICE_NAME_REGEX.match(self.office_name.upper()).groupdict()
         except AttributeError:
             parsed = {'type': None, 'district': None}
         else:
@@ -196,65 +193,15 @@ class ScrapedCandidateProxy(Candidate, ScrapedNameMixin):
 
         # filter all form501 lookups by office type, district and election year
         # get the most recently filed Form501 within the election_year
-        q = Form501Filing.objects.filter(
-            office__iexact=office_data['type'],
-            district=office_data['district'],
-            election_year__lte=election_data['year'],
+        return Form501Filing.objects.get_matcher().match(
+            office_data['type'],
+            office_data['district'],
+            election_data['year'],
+            election_data['type'],
+            filer_id=self.scraped_id,
+            name=self.name,
         )
 
-        if self.scraped_id != '':
-            try:
-                # first, try to get w/ filer_id and election_type
-                form501 = q.filter(
-                    filer_id=self.scraped_id,
-                    election_type=election_data['type']
-                ).latest('date_filed')
-            except Form501Filing.DoesNotExist:
-                # if that fails, try dropping election_type from filter
-                try:
-                    form501 = q.filter(filer_id=self.scraped_id).latest('date_filed')
-                except Form501Filing.DoesNotExist:
-                    form501 = None
-        else:
-            # if no filer_id, combine name fields from form501
-            # first try "<last_name>, <first_name>" format.
-            q = q.annotate(
-                full_name=Concat(
-                    'last_name',
-                    Value(', '),
-                    'first_name',
-                    output_field=CharField(),
-                )
-            )
-            # check if there are any with the "<last_name>, <first_name>"
-            if not q.filter(full_name=self.name).exists():
-                # use "<last_name>, <first_name> <middle_name>" format
-                q = q.annotate(
-                    full_name=Concat(
-                        'last_name',
-                        Value(', '),
-                        'first_name',
-                        Value(' '),
-                        'middle_name',
-                        output_field=CharField(),
-                    ),
-                )
-
-            try:
-                # first, try to get w/ filer_id and election_type
-                form501 = q.filter(
-                    full_name=self.name,
-                    election_type=election_data['type'],
-                ).latest('date_filed')
-            except Form501Filing.DoesNotExist:
-                # if that fails, try dropping election_type from filter
-                try:
-                    form501 = q.filter(full_name=self.name).latest('date_filed')
-                except Form501Filing.DoesNotExist:
-                    form501 = None
-
-        return form501
-
     def get_or_create_contest(self):
         """
         Get or create an OCD CandidateContest object.
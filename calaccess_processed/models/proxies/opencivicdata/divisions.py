@@ -6,6 +6,7 @@ Proxy models for augmenting our source data tables with methods useful for proce
 from __future__ import unicode_literals
 from django.db import models
 from opencivicdata.core.models import Division
+from calaccess_processed.caches import ocd_cache
 
 
 class OCDAssemblyDivisionManager(models.Manager):
@@ -44,7 +45,10 @@ class OCDCaliforniaDivisionManager(models.Manager):
         """
         Returns state of California division.
         """
-        return self.get_queryset().get(id='ocd-division/country:us/state:ca')
+        return ocd_cache.get(
+            (self.model._meta.label, 'california'),
+            lambda: self.get_queryset().get(id='ocd-division/country:us/state:ca')
+        )
 
 
 class OCDDivisionProxy(Division):
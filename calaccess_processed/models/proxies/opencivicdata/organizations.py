@@ -6,67 +6,85 @@ Proxy models for augmenting our source data tables with methods useful for proce
 from __future__ import unicode_literals
 from django.db import models
 from opencivicdata.core.models import Organization
+from calaccess_processed.caches import ocd_cache
 
 
 class OCDOrganizationManager(models.Manager):
     """
     Custom helpers for the OCD Organization model.
+
+    Each organization is fetched or created once, then kept in the OCD cache.
     """
+    def get_or_create_cached(self, key, **kwargs):
+        """
+        Get or create the organization with the given fields, unless it's cached under key.
+        """
+        return ocd_cache.get(
+            (self.model._meta.label, key),
+            lambda: self.get_queryset().get_or_create(**kwargs)[0]
+        )
+
     def senate(self):
         """
         Returns state senate organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'senate',
             name='California State Senate',
             classification='upper',
-        )[0]
+        )
 
     def assembly(self):
         """
         Returns state assembly organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'assembly',
             name='California State Assembly',
             classification='lower',
-        )[0]
+        )
 
     def executive_branch(self):
         """
         Returns executive branch organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'executive_branch',
             name='California State Executive Branch',
             classification='executive',
-        )[0]
+        )
 
     def secretary_of_state(self):
         """
         Returns secretary of state organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'secretary_of_state',
             name='California Secretary of State',
             classification='executive',
             parent=self.executive_branch(),
-        )[0]
+        )
 
     def elections_division(self):
         """
         Returns the elections division of the secretary of state organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'elections_division',
             name='Elections Division',
             classification='executive',
             parent=self.secretary_of_state(),
-        )[0]
+        )
 
     def board_of_equalization(self):
         """
         Returns board of equalization organization.
         """
-        return self.get_queryset().get_or_create(
+        return self.get_or_create_cached(
+            'board_of_equalization',
             name='State Board of Equalization',
             parent=self.executive_branch(),
-        )[0]
+        )
 
 
 class OCDOrganizationProxy(Organization):
@@ -6,7 +6,8 @@ Proxy models for augmenting our source data tables with methods useful for proce
 from __future__ import unicode_literals
 from django.db import models
 from opencivicdata.core.models import Organization
-from calaccess_raw.models import FilerToFilerTypeCd
+from calaccess_processed.caches import ocd_cache
+from ..calaccess_raw.filertofilertype import RawFilerToFilerTypeCdProxy
 
 
 class OCDPartyManager(models.Manager):
@@ -23,12 +24,27 @@ class OCDPartyManager(models.Manager):
         """
         Returns the UNKNOWN party.
         """
-        return self.get_queryset().get(name='UNKNOWN')
+        return ocd_cache.get(
+            (self.model._meta.label, 'unknown'),
+            lambda: self.get_queryset().get(name='UNKNOWN')
+        )
 
     def get_by_name(self, name):
         """
         Helper for getting the OCD party object giving a raw name from CAL-ACCESS.
 
+        If not found, return the "UNKNOWN" Organization object. Either way, the
+        party is kept in the OCD cache, so each name is looked up only once.
+        """
+        return ocd_cache.get(
+            (self.model._meta.label, 'name', name),
+            lambda: self.lookup_by_name(name)
+        )
+
+    def lookup_by_name(self, name):
+        """
+        Query the database for the OCD party object with a raw name from CAL-ACCESS.
+
         If not found, return the "UNKNOWN" Organization object.
         """
         # First try a full name
@@ -53,14 +69,11 @@ class OCDPartyManager(models.Manager):
         If not found, return the "UNKNOWN" Organization object.
         """
         # Try to see if the record exists in the raw data with a party code
-        try:
-            party_code = FilerToFilerTypeCd.objects.filter(
-                filer_id=filer_id,
-                effect_dt__lte=election_date,
-            ).latest('effect_dt').party_cd
-        except FilerToFilerTypeCd.DoesNotExist:
+        ftft = RawFilerToFilerTypeCdProxy.objects.get_by_filer_id_and_date(filer_id, election_date)
+        if ftft is None:
             # If it doesn't hit just quit now
             return self.unknown()
+        party_code = ftft[0]
 
         # IF we have a code, transform "INDEPENDENT" and "NON-PARTISAN" codes to "NO PARTY PREFERENCE"
         if party_code in [16007, 16009]:
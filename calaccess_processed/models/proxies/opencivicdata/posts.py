@@ -9,12 +9,19 @@ from django.db import models
 from .divisions import OCDDivisionProxy
 from opencivicdata.core.models import Post
 from .organizations import OCDOrganizationProxy
+from calaccess_processed.caches import post_cache
 from ..calaccess_raw.filertofilertype import RawFilerToFilerTypeCdProxy
 
+# "{TYPE NAME} [{DISTRICT NUMBER}]"
+OFFICE_NAME_REGEX = re.compile(r'^(?P<type>[A-Z ]+)(?P<district>\d{2})?$')
+
 
 class OCDPostManager(models.Manager):
     """
     Custom helpers for the OCD Post model.
+
+    Posts looked up by office name are kept in the post cache, so each name is
+    usually only resolved once.
     """
     def parse_office_name(self, office_name):
         """
@@ -24,9 +31,8 @@ class OCDPostManager(models.Manager):
 
         Return a dict with two keys: type and district.
         """
-        office_pattern = r'^(?P<type>[A-Z ]+)(?P<district>\d{2})?$'
         try:
-            parsed = re.match(office_pattern, office_name.upper()).groupdict()
+            parsed = OFFICE_NAME_REGEX.match(office_name.upper()).groupdict()
         except AttributeError:
             parsed = {'type': None, 'district': None}
         else:
@@ -41,6 +47,26 @@ class OCDPostManager(models.Manager):
     def get_by_name(self, office_name, method="get"):
         """
         Get a Post object with an office string.
+
+        The Post is cached, and returned from the cache for the same string after.
+        """
+        key = (self.model._meta.label, 'name', office_name)
+        if method != "get_or_create":
+            return post_cache.get(key, lambda: self.lookup_by_name(office_name, method))
+
+        # Only a lookup can create the Post, so a cached one was never just created
+        created = []
+
+        def lookup():
+            post, post_created = self.lookup_by_name(office_name, method)
+            created.append(post_created)
+            return post
+
+        return post_cache.get(key, lookup), any(created)
+
+    def lookup_by_name(self, office_name, method="get"):
+        """
+        Query the database for a Post object with an office string.
         """
         parsed_office = self.parse_office_name(office_name)
 
@@ -88,6 +114,19 @@ class OCDPostManager(models.Manager):
         # We'll use a hack on the method above to get this done so we can avoid repeating code.
         return self.get_by_name(office_name, method="get_or_create")
 
+    def prewarm(self, office_names):
+        """
+        Get or create the Post for every distinct string in office_names, and cache them.
+
+        Returns a list of the Posts created.
+        """
+        created_posts = []
+        for office_name in set(office_names):
+            post, created = self.get_or_create_by_name(office_name)
+            if created:
+                created_posts.append(post)
+        return created_posts
+
     def get_by_form501(self, form501):
         """
         Get a Post using data extracted from Form501Filing.
@@ -45,6 +45,52 @@ class ProcessedDataVersion(models.Model):
         verbose_name='zip of size (in bytes)',
         help_text='The expected size (in bytes) of the zip of processed files'
     )
+    diff_base_version = models.ForeignKey(
+        'self',
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='diff base version',
+        help_text='Foreign key referencing the earlier processed data version '
+                  'the diff archive is compared with'
+    )
+    diff_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='diff zip archive',
+        help_text='An archive zip of the rows added, removed or changed in each '
+                  'processed file since the diff base version'
+    )
+    diff_size = models.BigIntegerField(
+        null=True,
+        verbose_name='size of diff zip (in bytes)',
+        help_text='The size (in bytes) of the zip of diffs since the diff base version'
+    )
+    sqlite_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='SQLite database archive',
+        help_text='An archive of a SQLite database of all processed files'
+    )
+    sqlite_size = models.BigIntegerField(
+        null=True,
+        verbose_name='size of SQLite database (in bytes)',
+        help_text='The size (in bytes) of the SQLite database of processed files'
+    )
+    duckdb_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='DuckDB database archive',
+        help_text='An archive of a DuckDB database of all processed files'
+    )
+    duckdb_size = models.BigIntegerField(
+        null=True,
+        verbose_name='size of DuckDB database (in bytes)',
+        help_text='The size (in bytes) of the DuckDB database of processed files'
+    )
 
     class Meta:
         """
@@ -130,6 +176,12 @@ class ProcessedDataFile(models.Model):
         verbose_name='clean records count',
         help_text='Count of records in the processed file'
     )
+    last_loaded_filing_id = models.IntegerField(
+        null=True,
+        verbose_name='last loaded filing_id',
+        help_text='Highest filing_id value in the last completed chunk of a load '
+                  'run in chunks, used to resume an interrupted load'
+    )
     file_archive = models.FileField(
         blank=True,
         max_length=255,
@@ -143,6 +195,52 @@ class ProcessedDataFile(models.Model):
         verbose_name='size of processed data file (in bytes)',
         help_text='Size of the processed file (in bytes)'
     )
+    archive_compression = models.CharField(
+        blank=True,
+        max_length=10,
+        verbose_name='compression of archive',
+        help_text='Compression of the archive of the processed file ("gzip" or '
+                  '"zstd"), or blank if it is not compressed'
+    )
+    archive_size = models.BigIntegerField(
+        null=False,
+        default=0,
+        verbose_name='size of archive (in bytes)',
+        help_text='Size of the archive of the processed file as stored (in bytes), '
+                  'which is smaller than the file\'s size if it is compressed'
+    )
+    file_hash = models.CharField(
+        blank=True,
+        max_length=64,
+        verbose_name='hash of processed data file',
+        help_text='SHA-256 hex digest of the contents of the processed file'
+    )
+    upload_id = models.CharField(
+        blank=True,
+        max_length=255,
+        verbose_name='unfinished upload id',
+        help_text='Id of the unfinished upload of the archive in parts, used to '
+                  'resume it after a failure'
+    )
+    upload_name = models.CharField(
+        blank=True,
+        max_length=255,
+        verbose_name='unfinished upload name',
+        help_text='Name in storage of the archive being uploaded in parts'
+    )
+    parquet_archive = models.FileField(
+        blank=True,
+        max_length=255,
+        upload_to=archive_directory_path,
+        verbose_name='parquet archive of processed file',
+        help_text='An archive of the processed file in Parquet format'
+    )
+    parquet_size = models.BigIntegerField(
+        null=False,
+        default=0,
+        verbose_name='size of processed parquet file (in bytes)',
+        help_text='Size of the processed file in Parquet format (in bytes)'
+    )
 
     class Meta:
         """
@@ -156,6 +254,38 @@ class ProcessedDataFile(models.Model):
     def __str__(self):
         return self.file_name
 
+    def get_previous_file(self):
+        """
+        Return the same file from the most recent earlier version with a hash, or None.
+        """
+        return ProcessedDataFile.objects.filter(
+            file_name=self.file_name,
+            version__process_start_datetime__lt=self.version.process_start_datetime,
+        ).exclude(
+            file_hash='',
+        ).order_by(
+            '-version__process_start_datetime',
+        ).first()
+
+    def delete_archive(self, field_name):
+        """
+        Delete one of the file's archives, unless a file in another version shares it.
+
+        The field is cleared either way, without saving the file.
+        """
+        field_file = getattr(self, field_name)
+        if not field_file:
+            return
+        shared = ProcessedDataFile.objects.exclude(
+            pk=self.pk,
+        ).filter(
+            **{field_name: field_file.name}
+        ).exists()
+        if shared:
+            setattr(self, field_name, None)
+        else:
+            field_file.delete(save=False)
+
     def pretty_file_size(self):
         """
         Returns a prettified version (e.g., "725M") of the processed file's size.
@@ -163,3 +293,48 @@ class ProcessedDataFile(models.Model):
         return sizeformat(self.file_size)
     pretty_file_size.short_description = 'processed file size'
     pretty_file_size.admin_order_field = 'processed file size'
+
+
+@python_2_unicode_compatible
+class ProcessedDataFilePart(models.Model):
+    """
+    A part of a processed data file's archive uploaded by an unfinished upload in parts.
+    """
+    processed_file = models.ForeignKey(
+        'ProcessedDataFile',
+        on_delete=models.CASCADE,
+        related_name='upload_parts',
+        verbose_name='processed data file',
+        help_text='Foreign key referencing the processed data file being uploaded'
+    )
+    part_number = models.IntegerField(
+        verbose_name='part number',
+        help_text='Position of the part in the archive, starting at 1'
+    )
+    size = models.BigIntegerField(
+        verbose_name='size of part (in bytes)',
+        help_text='Size of the part (in bytes)'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        verbose_name='hash of part',
+        help_text='SHA-256 hex digest of the part, used to check that a retry '
+                  'would upload the same bytes'
+    )
+    etag = models.CharField(
+        max_length=255,
+        verbose_name='entity tag',
+        help_text='Entity tag the storage backend returned for the part'
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+        app_label = 'calaccess_processed'
+        unique_together = (('processed_file', 'part_number'),)
+        verbose_name = 'TRACKING: processed CAL-ACCESS data file upload part'
+        ordering = ('processed_file', 'part_number',)
+
+    def __str__(self):
+        return '%s part %s' % (self.processed_file, self.part_number)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for streaming models out of the database as newline-delimited JSON.
+"""
+from __future__ import unicode_literals
+from itertools import islice
+from collections import defaultdict
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import six
+
+# Objects read from the database, and whose related objects are fetched, at a time
+NDJSON_BATCH_SIZE = 2000
+
+# Reverse relations of OCD models whose objects are nested in their parents' JSON
+NESTED_RELATIONS = (
+    'identifiers',
+    'other_names',
+    'contact_details',
+    'links',
+    'sources',
+    'posts',
+    'options',
+)
+
+
+def get_nested_relations(model, names=NESTED_RELATIONS):
+    """
+    Return the reverse one-to-many relations of a model with the given accessor names.
+    """
+    return [
+        f for f in model._meta.get_fields()
+        if f.one_to_many and f.auto_created and f.get_accessor_name() in names
+    ]
+
+
+def get_nested_objects(relation, ids):
+    """
+    Return a dict of the values of a relation's objects, keyed by the id of the parent each belongs to.
+
+    The objects of every parent in ids are fetched with one query. Their own ids, and
+    the foreign keys to their parents, are left out.
+    """
+    fk = relation.field.attname
+    field_names = [
+        f.attname for f in relation.related_model._meta.concrete_fields
+        if not f.primary_key and f.attname != fk
+    ]
+    nested = defaultdict(list)
+    queryset = relation.related_model._base_manager.filter(
+        **{'%s__in' % fk: ids}
+    ).order_by(
+        relation.related_model._meta.pk.attname,
+    ).values(fk, *field_names)
+    for values in queryset:
+        nested[values.pop(fk)].append(values)
+    return nested
+
+
+def export_to_ndjson(queryset, out, batch_size=NDJSON_BATCH_SIZE, relation_names=NESTED_RELATIONS):
+    """
+    Write each object in a queryset as a line of JSON to the text file-like object out.
+
+    Objects are read through a server-side cursor, batch_size at a time, and the
+    objects of their nested relations are fetched with one query per relation per
+    batch. So memory use stays the same however many objects there are.
+
+    Returns the number of objects written.
+    """
+    model = queryset.model
+    pk_name = model._meta.pk.attname
+    relations = get_nested_relations(model, relation_names)
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+    count = 0
+    rows = queryset.order_by(pk_name).values(*[f.attname for f in model._meta.concrete_fields]).iterator()
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        ids = [obj[pk_name] for obj in batch]
+        nested = dict(
+            (relation.get_accessor_name(), get_nested_objects(relation, ids))
+            for relation in relations
+        )
+        for obj in batch:
+            for name, objects in nested.items():
+                obj[name] = objects.get(obj[pk_name], [])
+            out.write(six.text_type(encoder.encode(obj)))
+            out.write('\n')
+        count += len(batch)
+    return count
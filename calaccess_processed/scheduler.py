@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for running interdependent load tasks in dependency order.
+"""
+from __future__ import unicode_literals
+import re
+import traceback
+from collections import OrderedDict
+from multiprocessing import Pool
+from django import db
+from django.utils.six.moves import queue
+
+
+# Matches the names of this app's database tables in raw sql
+PROCESSED_TABLE_PATTERN = re.compile(r'\bcalaccess_processed_[a-z0-9_]+\b', re.IGNORECASE)
+
+
+def get_sql_table_names(sql):
+    """
+    Return the set of processed database table names referenced in a raw sql string.
+    """
+    return set(t.lower() for t in PROCESSED_TABLE_PATTERN.findall(sql))
+
+
+def _run_task(func, name):
+    """
+    Call func with name inside a worker process.
+
+    Returns a tuple (name, result, error), where error is a formatted traceback
+    string if the call raised an exception, otherwise None.
+    """
+    try:
+        result = func(name)
+    except Exception:
+        return name, None, traceback.format_exc()
+    finally:
+        # Don't leave the worker's connection open between tasks
+        db.connections.close_all()
+    return name, result, None
+
+
+class LoadScheduler(object):
+    """
+    Runs a set of named tasks so that each starts only after its dependencies finish.
+
+    Tasks without any unfinished dependencies run at the same time on a pool of
+    worker processes, each with its own database connection. With a single process,
+    tasks run one at a time in the current process in the order they were provided.
+    """
+    def __init__(self, dependencies, processes=1):
+        """
+        Set up the scheduler.
+
+        dependencies is a list of (name, names of required tasks) tuples. Required
+        tasks that aren't included in the list are assumed to be finished already.
+        """
+        self.dependencies = OrderedDict()
+        for name, required in dependencies:
+            self.dependencies[name] = set(required)
+        for name, required in self.dependencies.items():
+            required.intersection_update(self.dependencies)
+            required.discard(name)
+        self.processes = max(int(processes or 1), 1)
+        self.check_cycles()
+
+    def check_cycles(self):
+        """
+        Raise an exception if the tasks' dependencies include a cycle.
+        """
+        finished = set()
+        while len(finished) < len(self.dependencies):
+            ready = self.get_ready(finished, finished)
+            if not ready:
+                raise ValueError(
+                    "Circular dependency among: %s" % ', '.join(
+                        sorted(set(self.dependencies) - finished)
+                    )
+                )
+            finished.update(ready)
+
+    def get_ready(self, started, finished):
+        """
+        Return a list of the tasks not yet started with all of their dependencies finished.
+        """
+        return [
+            name for name, required in self.dependencies.items()
+            if name not in started and required.issubset(finished)
+        ]
+
+    @property
+    def order(self):
+        """
+        Return a list of task names in the order they'd run in a single process.
+        """
+        finished = []
+        while len(finished) < len(self.dependencies):
+            finished.append(self.get_ready(finished, finished)[0])
+        return finished
+
+    def run(self, func, start_callback=None, finish_callback=None):
+        """
+        Call func with the name of each task, respecting dependencies.
+
+        func must be a module-level function so it can be sent to worker processes.
+
+        start_callback is called with a task's name before it starts, and
+        finish_callback with a task's name and the value returned by func after
+        it finishes. Both are always called in the current process.
+        """
+        if self.processes == 1:
+            for name in self.order:
+                if start_callback:
+                    start_callback(name)
+                result = func(name)
+                if finish_callback:
+                    finish_callback(name, result)
+            return
+
+        # Each worker must open its own database connection
+        db.connections.close_all()
+        pool = Pool(self.processes)
+        results = queue.Queue()
+        started = set()
+        finished = set()
+        try:
+            while len(finished) < len(self.dependencies):
+                for name in self.get_ready(started, finished):
+                    if start_callback:
+                        start_callback(name)
+                    started.add(name)
+                    pool.apply_async(_run_task, (func, name), callback=results.put)
+
+                name, result, error = results.get()
+                if error:
+                    raise Exception("Loading %s failed:\n%s" % (name, error))
+                finished.add(name)
+                if finish_callback:
+                    finish_callback(name, result)
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for exporting processed tables into single-file SQLite and DuckDB databases.
+"""
+from __future__ import unicode_literals
+import json
+import datetime
+from decimal import Decimal
+from itertools import islice
+from django.db import connection, models
+from django.utils import six
+
+# Rows read from the database and inserted into SQLite at a time
+SQLITE_BATCH_SIZE = 10000
+
+
+def get_index_columns(model):
+    """
+    Return the columns of a model worth indexing in a snapshot: filing_id, filer_id and foreign keys.
+    """
+    return [
+        f.column for f in model._meta.concrete_fields
+        if not f.primary_key and (f.is_relation or f.column in ('filing_id', 'filer_id'))
+    ]
+
+
+def get_sqlite_type(field):
+    """
+    Return the SQLite column type for the values of a concrete model field.
+    """
+    if field.is_relation:
+        return get_sqlite_type(field.target_field)
+    if isinstance(field, (models.BooleanField, models.NullBooleanField, models.IntegerField, models.AutoField)):
+        return 'INTEGER'
+    if isinstance(field, models.FloatField):
+        return 'REAL'
+    if isinstance(field, models.DecimalField):
+        return 'NUMERIC'
+    return 'TEXT'
+
+
+def to_sqlite_value(value):
+    """
+    Return a value as one SQLite can store.
+
+    Decimals become strings, which NUMERIC columns convert to numbers. Dates are
+    stored as ISO 8601 strings, and lists and dicts as JSON.
+    """
+    if value is None or isinstance(value, (six.text_type, six.binary_type, float) + six.integer_types):
+        return value
+    if isinstance(value, Decimal):
+        return six.text_type(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return six.text_type(value)
+
+
+def export_to_sqlite(model, conn, batch_size=SQLITE_BATCH_SIZE):
+    """
+    Copy every row of a model into a new table in an open SQLite connection, then index it.
+
+    Rows are read through a server-side cursor and inserted batch_size at a time,
+    in a single transaction. Returns the number of rows copied.
+    """
+    fields = model._meta.concrete_fields
+    db_table = model._meta.db_table
+
+    conn.execute('DROP TABLE IF EXISTS "%s"' % db_table)
+    conn.execute(
+        'CREATE TABLE "%s" (%s)' % (
+            db_table,
+            ', '.join('"%s" %s' % (f.column, get_sqlite_type(f)) for f in fields),
+        )
+    )
+    insert_sql = 'INSERT INTO "%s" VALUES (%s)' % (db_table, ', '.join('?' * len(fields)))
+
+    count = 0
+    queryset = model._base_manager.order_by().values_list(*[f.attname for f in fields])
+    rows = queryset.iterator()
+    with conn:
+        while True:
+            batch = [tuple(to_sqlite_value(v) for v in row) for row in islice(rows, batch_size)]
+            if not batch:
+                break
+            conn.executemany(insert_sql, batch)
+            count += len(batch)
+
+    # Index after loading, which is faster than keeping the indexes up to date
+    with conn:
+        conn.execute(
+            'CREATE UNIQUE INDEX "{0}_pk" ON "{0}" ("{1}")'.format(db_table, model._meta.pk.column)
+        )
+        for column in get_index_columns(model):
+            conn.execute('CREATE INDEX "{0}_{1}" ON "{0}" ("{1}")'.format(db_table, column))
+    return count
+
+
+def get_duckdb_type(field):
+    """
+    Return the DuckDB column type for the values of a concrete model field.
+    """
+    if field.is_relation:
+        return get_duckdb_type(field.target_field)
+    if isinstance(field, (models.BooleanField, models.NullBooleanField)):
+        return 'BOOLEAN'
+    if isinstance(field, models.SmallIntegerField):
+        return 'SMALLINT'
+    if isinstance(field, (models.BigIntegerField, models.BigAutoField)):
+        return 'BIGINT'
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return 'INTEGER'
+    if isinstance(field, models.FloatField):
+        return 'DOUBLE'
+    if isinstance(field, models.DecimalField):
+        return 'DECIMAL(%s, %s)' % (field.max_digits, field.decimal_places)
+    # DateTimeField is a subclass of DateField, so check it first
+    if isinstance(field, models.DateTimeField):
+        return 'TIMESTAMPTZ'
+    if isinstance(field, models.DateField):
+        return 'DATE'
+    return 'VARCHAR'
+
+
+def export_to_duckdb(model, conn, csv_path):
+    """
+    Copy every row of a model into a new table in an open DuckDB connection.
+
+    The rows are streamed out of PostgreSQL with COPY into a .csv file at csv_path,
+    which DuckDB then loads in bulk. DuckDB doesn't need the indexes SQLite does,
+    so none are made. Returns the number of rows copied.
+    """
+    fields = model._meta.concrete_fields
+    db_table = model._meta.db_table
+
+    with open(csv_path, 'wb') as csv_file:
+        with connection.cursor() as c:
+            # Name the columns, in case the table's are in a different order than the model's
+            c.cursor.copy_expert(
+                'COPY "%s" (%s) TO STDOUT CSV HEADER;' % (
+                    db_table,
+                    ', '.join('"%s"' % f.column for f in fields),
+                ),
+                csv_file,
+            )
+            count = c.cursor.rowcount
+
+    conn.execute('DROP TABLE IF EXISTS "%s"' % db_table)
+    conn.execute(
+        'CREATE TABLE "%s" (%s)' % (
+            db_table,
+            ', '.join('"%s" %s' % (f.column, get_duckdb_type(f)) for f in fields),
+        )
+    )
+    # PostgreSQL writes NULL as an empty value and an empty string as ""
+    conn.execute(
+        "COPY \"%s\" FROM '%s' (HEADER, NULL '', ALLOW_QUOTED_NULLS false)" % (
+            db_table,
+            csv_path.replace("'", "''"),
+        )
+    )
+    return count
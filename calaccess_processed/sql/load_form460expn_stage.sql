@@ -0,0 +1,72 @@
+-- route the Form 460 schedule rows of EXPN_CD into one table with a single scan
+DROP TABLE IF EXISTS calaccess_processed_form460expn;
+
+CREATE UNLOGGED TABLE calaccess_processed_form460expn AS
+SELECT
+    filing_version.id AS filing_version_id,
+    -- only the columns the item loaders read
+    expn."AGENT_NAMF",
+    expn."AGENT_NAML",
+    expn."AGENT_NAMS",
+    expn."AGENT_NAMT",
+    expn."AMEND_ID",
+    expn."AMOUNT",
+    expn."BAKREF_TID",
+    expn."BAL_JURIS",
+    expn."BAL_NAME",
+    expn."BAL_NUM",
+    expn."CAND_NAMF",
+    expn."CAND_NAML",
+    expn."CAND_NAMS",
+    expn."CAND_NAMT",
+    expn."CMTE_ID",
+    expn."CUM_OTH",
+    expn."CUM_YTD",
+    expn."DIST_NO",
+    expn."ENTITY_CD",
+    expn."EXPN_CHKNO",
+    expn."EXPN_CODE",
+    expn."EXPN_DATE",
+    expn."EXPN_DSCR",
+    expn."FILING_ID",
+    expn."FORM_TYPE",
+    expn."G_FROM_E_F",
+    expn."JURIS_CD",
+    expn."JURIS_DSCR",
+    expn."LINE_ITEM",
+    expn."MEMO_CODE",
+    expn."MEMO_REFNO",
+    expn."OFF_S_H_CD",
+    expn."OFFIC_DSCR",
+    expn."OFFICE_CD",
+    expn."PAYEE_CITY",
+    expn."PAYEE_NAMF",
+    expn."PAYEE_NAML",
+    expn."PAYEE_NAMS",
+    expn."PAYEE_NAMT",
+    expn."PAYEE_ST",
+    expn."PAYEE_ZIP4",
+    expn."SUP_OPP_CD",
+    expn."TRAN_ID",
+    expn."TRES_CITY",
+    expn."TRES_NAMF",
+    expn."TRES_NAML",
+    expn."TRES_NAMS",
+    expn."TRES_NAMT",
+    expn."TRES_ST",
+    expn."TRES_ZIP4"
+FROM "EXPN_CD" expn
+JOIN calaccess_processed_form460filingversion filing_version
+ON expn."FILING_ID" = filing_version.filing_id
+AND expn."AMEND_ID" = filing_version.amend_id
+WHERE expn."FORM_TYPE" IN ('D', 'E', 'G')
+-- keep each schedule's rows together on disk
+ORDER BY expn."FORM_TYPE";
+
+CREATE INDEX calaccess_processed_form460expn_form_type_idx
+ON calaccess_processed_form460expn ("FORM_TYPE");
+
+CREATE INDEX calaccess_processed_form460expn_filing_idx
+ON calaccess_processed_form460expn ("FILING_ID");
+
+ANALYZE calaccess_processed_form460expn;
@@ -57,12 +57,7 @@ SELECT
     f460.loan_guarantees_received,
     f460.cash_equivalents,
     f460.outstanding_debts
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_form460filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_latestversion latest
 JOIN calaccess_processed_form460filingversion f460
-ON latest.filing_id = f460.filing_id
-AND latest.amendment_count = f460.amend_id;
\ No newline at end of file
+ON latest.filing_version_id = f460.id
+WHERE latest.form = 'F460';
\ No newline at end of file
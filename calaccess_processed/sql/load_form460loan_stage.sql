@@ -0,0 +1,66 @@
+-- route the Form 460 schedule rows of LOAN_CD into one table with a single scan
+DROP TABLE IF EXISTS calaccess_processed_form460loan;
+
+CREATE UNLOGGED TABLE calaccess_processed_form460loan AS
+SELECT
+    filing_version.id AS filing_version_id,
+    -- only the columns the item loaders read
+    loan."AMEND_ID",
+    loan."CMTE_ID",
+    loan."ENTITY_CD",
+    loan."FILING_ID",
+    loan."FORM_TYPE",
+    loan."INTR_CITY",
+    loan."INTR_NAMF",
+    loan."INTR_NAML",
+    loan."INTR_NAMS",
+    loan."INTR_NAMT",
+    loan."INTR_ST",
+    loan."INTR_ZIP4",
+    loan."LINE_ITEM",
+    loan."LNDR_NAMF",
+    loan."LNDR_NAML",
+    loan."LNDR_NAMS",
+    loan."LNDR_NAMT",
+    loan."LOAN_AMT1",
+    loan."LOAN_AMT2",
+    loan."LOAN_AMT3",
+    loan."LOAN_AMT4",
+    loan."LOAN_AMT5",
+    loan."LOAN_AMT6",
+    loan."LOAN_AMT7",
+    loan."LOAN_AMT8",
+    loan."LOAN_CITY",
+    loan."LOAN_DATE1",
+    loan."LOAN_DATE2",
+    loan."LOAN_EMP",
+    loan."LOAN_OCC",
+    loan."LOAN_RATE",
+    loan."LOAN_SELF",
+    loan."LOAN_ST",
+    loan."LOAN_TYPE",
+    loan."LOAN_ZIP4",
+    loan."MEMO_REFNO",
+    loan."TRAN_ID",
+    loan."TRES_CITY",
+    loan."TRES_NAMF",
+    loan."TRES_NAML",
+    loan."TRES_NAMS",
+    loan."TRES_NAMT",
+    loan."TRES_ST",
+    loan."TRES_ZIP4"
+FROM "LOAN_CD" loan
+JOIN calaccess_processed_form460filingversion filing_version
+ON loan."FILING_ID" = filing_version.filing_id
+AND loan."AMEND_ID" = filing_version.amend_id
+WHERE loan."FORM_TYPE" IN ('B1', 'B2', 'H', 'H1', 'H2')
+-- keep each schedule's rows together on disk
+ORDER BY loan."FORM_TYPE";
+
+CREATE INDEX calaccess_processed_form460loan_form_type_idx
+ON calaccess_processed_form460loan ("FORM_TYPE");
+
+CREATE INDEX calaccess_processed_form460loan_filing_idx
+ON calaccess_processed_form460loan ("FILING_ID");
+
+ANALYZE calaccess_processed_form460loan;
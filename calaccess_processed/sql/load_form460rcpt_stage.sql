@@ -0,0 +1,58 @@
+-- route the Form 460 schedule rows of RCPT_CD into one table with a single scan
+DROP TABLE IF EXISTS calaccess_processed_form460rcpt;
+
+CREATE UNLOGGED TABLE calaccess_processed_form460rcpt AS
+SELECT
+    filing_version.id AS filing_version_id,
+    -- only the columns the item loaders read
+    rcpt."AMEND_ID",
+    rcpt."AMOUNT",
+    rcpt."CMTE_ID",
+    rcpt."CTRIB_CITY",
+    rcpt."CTRIB_DSCR",
+    rcpt."CTRIB_EMP",
+    rcpt."CTRIB_NAMF",
+    rcpt."CTRIB_NAML",
+    rcpt."CTRIB_NAMS",
+    rcpt."CTRIB_NAMT",
+    rcpt."CTRIB_OCC",
+    rcpt."CTRIB_SELF",
+    rcpt."CTRIB_ST",
+    rcpt."CTRIB_ZIP4",
+    rcpt."CUM_OTH",
+    rcpt."CUM_YTD",
+    rcpt."DATE_THRU",
+    rcpt."ENTITY_CD",
+    rcpt."FILING_ID",
+    rcpt."FORM_TYPE",
+    rcpt."INTR_CITY",
+    rcpt."INTR_CMTEID",
+    rcpt."INTR_EMP",
+    rcpt."INTR_NAMF",
+    rcpt."INTR_NAML",
+    rcpt."INTR_NAMS",
+    rcpt."INTR_NAMT",
+    rcpt."INTR_OCC",
+    rcpt."INTR_SELF",
+    rcpt."INTR_ST",
+    rcpt."INTR_ZIP4",
+    rcpt."LINE_ITEM",
+    rcpt."MEMO_REFNO",
+    rcpt."RCPT_DATE",
+    rcpt."TRAN_ID",
+    rcpt."TRAN_TYPE"
+FROM "RCPT_CD" rcpt
+JOIN calaccess_processed_form460filingversion filing_version
+ON rcpt."FILING_ID" = filing_version.filing_id
+AND rcpt."AMEND_ID" = filing_version.amend_id
+WHERE rcpt."FORM_TYPE" IN ('A', 'A-1', 'C', 'I')
+-- keep each schedule's rows together on disk
+ORDER BY rcpt."FORM_TYPE";
+
+CREATE INDEX calaccess_processed_form460rcpt_form_type_idx
+ON calaccess_processed_form460rcpt ("FORM_TYPE");
+
+CREATE INDEX calaccess_processed_form460rcpt_filing_idx
+ON calaccess_processed_form460rcpt ("FILING_ID");
+
+ANALYZE calaccess_processed_form460rcpt;
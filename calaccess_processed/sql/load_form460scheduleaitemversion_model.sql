@@ -34,7 +34,7 @@ INSERT INTO calaccess_processed_form460scheduleaitemversion (
     cumulative_election_amount
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    rcpt.filing_version_id,
     rcpt."LINE_ITEM" AS line_item,
     rcpt."RCPT_DATE" AS date_received,
     rcpt."DATE_THRU" AS date_received_thru,
@@ -97,8 +97,5 @@ SELECT
     rcpt."AMOUNT" AS amount,
     rcpt."CUM_YTD" AS cumulative_ytd_amount,
     rcpt."CUM_OTH" AS cumulative_election_amount
-FROM "RCPT_CD" rcpt
-JOIN calaccess_processed_form460filingversion filing_version
-ON rcpt."FILING_ID" = filing_version.filing_id
-AND rcpt."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460rcpt rcpt
 WHERE rcpt."FORM_TYPE" IN ('A', 'A-1');
\ No newline at end of file
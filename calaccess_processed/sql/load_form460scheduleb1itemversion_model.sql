@@ -42,7 +42,7 @@ INSERT INTO calaccess_processed_form460scheduleb1itemversion (
     memo_reference_number
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     UPPER(loan."ENTITY_CD") as lender_code,
     TRIM(
@@ -97,10 +97,7 @@ SELECT
     loan."LOAN_AMT3" AS cumulative_ytd_contributions,
     loan."TRAN_ID" AS transaction_id,
     loan."MEMO_REFNO" AS memo_reference_number
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" = 'B1'
 -- Exclude loan guarantor items from the older version of
 -- Schedule B, Part 1
@@ -75,9 +75,7 @@ SELECT
     item_version.interest_paid,
     item_version.transaction_id,
     item_version.memo_reference_number
-FROM calaccess_processed_form460filing filing
-JOIN calaccess_processed_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+FROM calaccess_processed_latestversion filing
 JOIN calaccess_processed_form460scheduleb2itemversionold item_version
-ON filing_version.id = item_version.filing_version_id;
\ No newline at end of file
+ON filing.filing_version_id = item_version.filing_version_id
+WHERE filing.form = 'F460';
\ No newline at end of file
@@ -23,7 +23,7 @@ INSERT INTO calaccess_processed_form460scheduleb2itemversion (
     reported_on_b1
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     UPPER(loan."ENTITY_CD") as guarantor_code,
     UPPER(loan."LNDR_NAMT") AS guarantor_title,
@@ -49,10 +49,7 @@ SELECT
     loan."TRAN_ID" AS transaction_id,
     loan."MEMO_REFNO" AS memo_reference_number,
     false as reported_on_b1
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" = 'B2'
 AND loan."LOAN_TYPE" = ''
 AND loan."LOAN_DATE1" >= '2000-12-22'
@@ -60,7 +57,7 @@ AND loan."LOAN_DATE1" >= '2000-12-22'
 -- of Schedule B, Part 1
 UNION
 SELECT
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     UPPER(loan."ENTITY_CD") as guarantor_code,
     UPPER(loan."LNDR_NAMT") AS guarantor_title,
@@ -86,9 +83,6 @@ SELECT
     loan."TRAN_ID" AS transaction_id,
     loan."MEMO_REFNO" AS memo_reference_number,
     true as reported_on_b1
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" = 'B1'
 AND loan."LOAN_TYPE" = 'B1G';
\ No newline at end of file
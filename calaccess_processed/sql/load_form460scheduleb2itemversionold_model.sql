@@ -38,7 +38,7 @@ INSERT INTO calaccess_processed_form460scheduleb2itemversionold (
     memo_reference_number
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     UPPER(loan."ENTITY_CD") as lender_code,
     TRIM(
@@ -89,10 +89,7 @@ SELECT
     loan."LOAN_AMT3" AS interest_paid,
     loan."TRAN_ID" AS transaction_id,
     loan."MEMO_REFNO" AS memo_reference_number
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" = 'B2'
 AND (
     loan."LOAN_TYPE" <> '' OR 
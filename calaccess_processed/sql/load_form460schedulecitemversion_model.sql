@@ -35,7 +35,7 @@ INSERT INTO calaccess_processed_form460schedulecitemversion (
     cumulative_election_amount
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    rcpt.filing_version_id,
     rcpt."LINE_ITEM" AS line_item,
     rcpt."RCPT_DATE" AS date_received,
     rcpt."DATE_THRU" AS date_received_thru,
@@ -93,8 +93,5 @@ SELECT
     rcpt."CTRIB_DSCR" AS contribution_description,
     rcpt."CUM_YTD" AS cumulative_ytd_amount,
     rcpt."CUM_OTH" AS cumulative_election_amount
-FROM "RCPT_CD" rcpt
-JOIN calaccess_processed_form460filingversion filing_version
-ON rcpt."FILING_ID" = filing_version.filing_id
-AND rcpt."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460rcpt rcpt
 WHERE rcpt."FORM_TYPE" = 'C';
\ No newline at end of file
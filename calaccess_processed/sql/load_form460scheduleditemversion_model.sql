@@ -42,7 +42,7 @@ INSERT INTO calaccess_processed_form460scheduleditemversion (
     office_sought_held
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    expn.filing_version_id,
     expn."LINE_ITEM" AS line_item,
     CASE
         WHEN UPPER(expn."ENTITY_CD") IN (
@@ -213,9 +213,6 @@ SELECT
         ) THEN UPPER(expn."OFF_S_H_CD") 
         ELSE '?'
     END AS office_sought_held
-FROM "EXPN_CD" expn
-JOIN calaccess_processed_form460filingversion filing_version
-ON expn."FILING_ID" = filing_version.filing_id
-AND expn."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460expn expn
 WHERE expn."FORM_TYPE" = 'D'
 AND expn."MEMO_CODE" = '';
\ No newline at end of file
@@ -11,9 +11,7 @@ SELECT
     summary_version.unitemized_expenditures,
     summary_version.interest_paid,
     summary_version.total_expenditures
-FROM calaccess_processed_form460filing filing
-JOIN calaccess_processed_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+FROM calaccess_processed_latestversion filing
 JOIN calaccess_processed_form460scheduleesummaryversion summary_version
-ON filing_version.id = summary_version.filing_version_id;
+ON filing.filing_version_id = summary_version.filing_version_id
+WHERE filing.form = 'F460';
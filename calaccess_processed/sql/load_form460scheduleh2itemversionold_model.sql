@@ -37,7 +37,7 @@ INSERT INTO calaccess_processed_form460scheduleh2itemversionold (
     memo_reference_number
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     loan."LOAN_DATE2" AS date_repaid_or_forgiven,
     loan."LOAN_DATE1" AS date_of_original_loan,
@@ -87,8 +87,5 @@ SELECT
     loan."LOAN_AMT2" AS outstanding_principle,
     loan."TRAN_ID" AS transaction_id,
     loan."MEMO_REFNO" AS memo_reference_number
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" = 'H2';
\ No newline at end of file
@@ -43,7 +43,7 @@ INSERT INTO calaccess_processed_form460schedulehitemversion (
     reported_on_h1
 )
 SELECT 
-    filing_version.id AS filing_version_id,
+    loan.filing_version_id,
     loan."LINE_ITEM" AS line_item,
     UPPER(loan."ENTITY_CD") as recipient_code,
     TRIM(
@@ -102,8 +102,5 @@ SELECT
         WHEN 'H1' THEN true
         ELSE false
     END AS reported_on_h1
-FROM "LOAN_CD" loan
-JOIN calaccess_processed_form460filingversion filing_version
-ON loan."FILING_ID" = filing_version.filing_id
-AND loan."AMEND_ID" = filing_version.amend_id
+FROM calaccess_processed_form460loan loan
 WHERE loan."FORM_TYPE" in ('H', 'H1');
\ No newline at end of file
@@ -15,12 +15,7 @@ SELECT
     f497.filer_lastname,
     f497.filer_firstname,
     f497.election_date
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_form497filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_latestversion latest
 JOIN calaccess_processed_form497filingversion f497
-ON latest.filing_id = f497.filing_id
-AND latest.amendment_count = f497.amend_id;
+ON latest.filing_version_id = f497.id
+WHERE latest.form = 'F497';
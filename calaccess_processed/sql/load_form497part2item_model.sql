@@ -63,9 +63,7 @@ SELECT
     item_version.ballot_measure_jurisdiction,
     item_version.support_opposition_code,
     item_version.election_date
-FROM calaccess_processed_form497filing filing
-JOIN calaccess_processed_form497filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+FROM calaccess_processed_latestversion filing
 JOIN calaccess_processed_form497part2itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
\ No newline at end of file
+ON filing.filing_version_id = item_version.filing_version_id
+WHERE filing.form = 'F497';
\ No newline at end of file
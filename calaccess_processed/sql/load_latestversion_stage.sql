@@ -0,0 +1,41 @@
+-- look up the most recent amendment of each filing once for every loader
+DROP TABLE IF EXISTS calaccess_processed_latestversion;
+
+CREATE UNLOGGED TABLE calaccess_processed_latestversion AS
+SELECT * FROM (
+    SELECT DISTINCT ON (filing_id)
+        'F460'::varchar(4) AS form,
+        filing_id,
+        amend_id AS amendment_count,
+        id AS filing_version_id
+    FROM calaccess_processed_form460filingversion
+    ORDER BY filing_id, amend_id DESC
+) AS f460
+UNION ALL
+SELECT * FROM (
+    SELECT DISTINCT ON (filing_id)
+        'F497'::varchar(4) AS form,
+        filing_id,
+        amend_id AS amendment_count,
+        id AS filing_version_id
+    FROM calaccess_processed_form497filingversion
+    ORDER BY filing_id, amend_id DESC
+) AS f497
+UNION ALL
+SELECT * FROM (
+    SELECT DISTINCT ON (filing_id)
+        'F501'::varchar(4) AS form,
+        filing_id,
+        amend_id AS amendment_count,
+        id AS filing_version_id
+    FROM calaccess_processed_form501filingversion
+    ORDER BY filing_id, amend_id DESC
+) AS f501;
+
+CREATE INDEX calaccess_processed_latestversion_version_idx
+ON calaccess_processed_latestversion (form, filing_version_id, filing_id);
+
+CREATE INDEX calaccess_processed_latestversion_filing_idx
+ON calaccess_processed_latestversion (filing_id);
+
+ANALYZE calaccess_processed_latestversion;
@@ -0,0 +1,35 @@
+-- pivot the column A amount of each summary line into one row per form
+DROP TABLE IF EXISTS calaccess_processed_smrypivot;
+
+CREATE UNLOGGED TABLE calaccess_processed_smrypivot AS
+SELECT
+    "FILING_ID" AS filing_id,
+    "AMEND_ID" AS amend_id,
+    UPPER("FORM_TYPE") AS form_type,
+    MAX(CASE WHEN "LINE_ITEM" = '1' THEN "AMOUNT_A" END) AS line_1,
+    MAX(CASE WHEN "LINE_ITEM" = '2' THEN "AMOUNT_A" END) AS line_2,
+    MAX(CASE WHEN "LINE_ITEM" = '3' THEN "AMOUNT_A" END) AS line_3,
+    MAX(CASE WHEN "LINE_ITEM" = '4' THEN "AMOUNT_A" END) AS line_4,
+    MAX(CASE WHEN "LINE_ITEM" = '5' THEN "AMOUNT_A" END) AS line_5,
+    MAX(CASE WHEN "LINE_ITEM" = '6' THEN "AMOUNT_A" END) AS line_6,
+    MAX(CASE WHEN "LINE_ITEM" = '7' THEN "AMOUNT_A" END) AS line_7,
+    MAX(CASE WHEN "LINE_ITEM" = '8' THEN "AMOUNT_A" END) AS line_8,
+    MAX(CASE WHEN "LINE_ITEM" = '9' THEN "AMOUNT_A" END) AS line_9,
+    MAX(CASE WHEN "LINE_ITEM" = '10' THEN "AMOUNT_A" END) AS line_10,
+    MAX(CASE WHEN "LINE_ITEM" = '11' THEN "AMOUNT_A" END) AS line_11,
+    MAX(CASE WHEN "LINE_ITEM" = '12' THEN "AMOUNT_A" END) AS line_12,
+    MAX(CASE WHEN "LINE_ITEM" = '13' THEN "AMOUNT_A" END) AS line_13,
+    MAX(CASE WHEN "LINE_ITEM" = '14' THEN "AMOUNT_A" END) AS line_14,
+    MAX(CASE WHEN "LINE_ITEM" = '15' THEN "AMOUNT_A" END) AS line_15,
+    MAX(CASE WHEN "LINE_ITEM" = '16' THEN "AMOUNT_A" END) AS line_16,
+    MAX(CASE WHEN "LINE_ITEM" = '17' THEN "AMOUNT_A" END) AS line_17,
+    MAX(CASE WHEN "LINE_ITEM" = '18' THEN "AMOUNT_A" END) AS line_18,
+    MAX(CASE WHEN "LINE_ITEM" = '19' THEN "AMOUNT_A" END) AS line_19
+FROM "SMRY_CD"
+WHERE UPPER("FORM_TYPE") IN ('F460', 'A', 'C', 'E')
+GROUP BY 1, 2, 3;
+
+CREATE INDEX calaccess_processed_smrypivot_filing_idx
+ON calaccess_processed_smrypivot (filing_id, amend_id, form_type);
+
+ANALYZE calaccess_processed_smrypivot;
@@ -0,0 +1,52 @@
+-- new or amended Form 460 filings
+SELECT cvr."FILING_ID" AS filing_id
+FROM "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+LEFT JOIN calaccess_processed_form460filingversion f460
+ON cvr."FILING_ID" = f460.filing_id
+AND cvr."AMEND_ID" = f460.amend_id
+WHERE cvr."FORM_TYPE" = 'F460'
+AND f460.id IS NULL
+UNION
+-- new or amended Form 497 filings
+SELECT cvr."FILING_ID" AS filing_id
+FROM "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+LEFT JOIN calaccess_processed_form497filingversion f497
+ON cvr."FILING_ID" = f497.filing_id
+AND cvr."AMEND_ID" = f497.amend_id
+WHERE cvr."FORM_TYPE" = 'F497'
+AND f497.id IS NULL
+UNION
+-- new or amended Form 501 filings
+SELECT ci."FILING_ID" AS filing_id
+FROM "F501_502_CD" ci
+LEFT JOIN calaccess_processed_form501filingversion f501
+ON ci."FILING_ID" = f501.filing_id
+AND ci."AMEND_ID" = f501.amend_id
+WHERE ci."FORM_TYPE" = 'F501'
+AND f501.id IS NULL
+UNION
+-- Form 460 and 497 versions no longer in the raw data
+SELECT f460.filing_id
+FROM calaccess_processed_form460filingversion f460
+LEFT JOIN "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+ON cvr."FILING_ID" = f460.filing_id
+AND cvr."AMEND_ID" = f460.amend_id
+AND cvr."FORM_TYPE" = 'F460'
+WHERE cvr."FILING_ID" IS NULL
+UNION
+SELECT f497.filing_id
+FROM calaccess_processed_form497filingversion f497
+LEFT JOIN "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+ON cvr."FILING_ID" = f497.filing_id
+AND cvr."AMEND_ID" = f497.amend_id
+AND cvr."FORM_TYPE" = 'F497'
+WHERE cvr."FILING_ID" IS NULL
+UNION
+-- Form 501 versions no longer in the raw data
+SELECT f501.filing_id
+FROM calaccess_processed_form501filingversion f501
+LEFT JOIN "F501_502_CD" ci
+ON ci."FILING_ID" = f501.filing_id
+AND ci."AMEND_ID" = f501.amend_id
+AND ci."FORM_TYPE" = 'F501'
+WHERE ci."FILING_ID" IS NULL;
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Intermediate tables built before loading the processed models that read them.
+"""
+from __future__ import unicode_literals
+import os
+import re
+from django.db import connection
+from calaccess_processed.scheduler import get_sql_table_names
+from calaccess_processed.managers import execute_for_filings
+
+
+class LoadStage(object):
+    """
+    An intermediate table built by a raw sql query and shared by the load queries of processed models.
+
+    Each stage's query lives in sql/load_{name}_stage.sql, where it drops, creates
+    and indexes the calaccess_processed_{name} table. Stages are rebuilt with
+    every load and are not archived.
+    """
+    def __init__(self, name):
+        """
+        Set the name of the stage.
+        """
+        self.name = name
+
+    @property
+    def label(self):
+        """
+        Return a label for the stage that won't clash with any model's label.
+        """
+        return 'stage:%s' % self.name
+
+    @property
+    def db_table(self):
+        """
+        Return the stage's database table name as a string.
+        """
+        return 'calaccess_processed_%s' % self.name
+
+    @property
+    def raw_data_load_query_path(self):
+        """
+        Return the path to the .sql file with the stage's loading query.
+        """
+        return os.path.join(
+            os.path.dirname(__file__),
+            'sql',
+            'load_%s_stage.sql' % self.name,
+        )
+
+    @property
+    def raw_data_load_query(self):
+        """
+        Return string of raw sql for loading the stage.
+        """
+        with open(self.raw_data_load_query_path) as f:
+            return f.read()
+
+    @property
+    def load_dependencies(self):
+        """
+        Return set of processed database tables read by the stage's load query.
+        """
+        tables = get_sql_table_names(self.raw_data_load_query)
+        tables.discard(self.db_table)
+        return tables
+
+    def load_raw_data(self, filing_ids=None):
+        """
+        Build the stage's table by executing its raw sql load query.
+
+        If a list of filing_ids is provided, only rows for those filings are included.
+        """
+        if filing_ids is not None:
+            execute_for_filings(self.raw_data_load_query, filing_ids, exclude_table=self.db_table)
+        else:
+            with connection.cursor() as c:
+                c.execute(self.raw_data_load_query)
+
+    def drop(self):
+        """
+        Drop the stage's table, if it exists.
+        """
+        with connection.cursor() as c:
+            c.execute('DROP TABLE IF EXISTS "%s"' % self.db_table)
+
+
+def get_stage_list():
+    """
+    Return a list of all the load stages with a .sql load query file.
+    """
+    sql_dir = os.path.join(os.path.dirname(__file__), 'sql')
+    names = [
+        re.match(r'^load_(\w+)_stage\.sql$', f).group(1)
+        for f in sorted(os.listdir(sql_dir))
+        if re.match(r'^load_(\w+)_stage\.sql$', f)
+    ]
+    return [LoadStage(name) for name in names]
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the archive streaming utilities.
+"""
+import os
+import hashlib
+import shutil
+import tempfile
+import threading
+import zlib
+from io import BytesIO
+from unittest import TestCase
+from zipfile import ZipFile
+from django.core.files.storage import FileSystemStorage
+from calaccess_processed import archives
+from calaccess_processed.archives import (
+    CompressReader,
+    CompressWriter,
+    HashWriter,
+    StreamPipe,
+    TeeWriter,
+    add_files_to_zip,
+    can_stream,
+    compact_zip,
+    copy_archive,
+    save_archive,
+)
+
+
+class SeekingStorage(FileSystemStorage):
+    """
+    A FileSystemStorage that seeks to the start of what it saves, like S3Boto3Storage.
+    """
+    def _save(self, name, content):
+        """
+        Seek to the start, then save.
+        """
+        content.seek(0)
+        return super(SeekingStorage, self)._save(name, content)
+
+
+class FakeField(object):
+    """
+    Stands in for a model's FileField.
+    """
+    max_length = 255
+
+
+class FakeFieldFile(object):
+    """
+    Stands in for the FieldFile of a processed file's archive.
+    """
+    field = FakeField()
+
+    def __init__(self, storage):
+        """
+        Set up saving to storage.
+        """
+        self.storage = storage
+
+
+class ArchiveStreamTest(TestCase):
+    """
+    Test streaming bytes between threads and into zips.
+    """
+    def setUp(self):
+        """
+        Make a scratch directory.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Remove the scratch directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_pipe(self):
+        """
+        Confirm every byte written to the pipe and a second target is read back in order and hashed.
+        """
+        pipe = StreamPipe(max_chunks=2)
+        copy = open(os.path.join(self.tmp_dir, 'copy.csv'), 'wb')
+        hasher = HashWriter()
+        writer = TeeWriter(pipe, hasher, copy)
+        rows = [('%s,row\n' % i).encode('utf-8') for i in range(50000)]
+        received = []
+
+        reader = threading.Thread(target=lambda: received.append(pipe.read()))
+        reader.start()
+        for row in rows:
+            writer.write(row)
+        writer.flush()
+        pipe.close()
+        copy.close()
+        reader.join()
+
+        self.assertEqual(received[0], b''.join(rows))
+        self.assertEqual(writer.size, len(received[0]))
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(received[0]).hexdigest())
+        with open(copy.name, 'rb') as f:
+            self.assertEqual(f.read(), received[0])
+
+    def test_pipe_error(self):
+        """
+        Confirm the reader of a pipe hears about a failed writer.
+        """
+        pipe = StreamPipe()
+        pipe.write(b'partial')
+        pipe.close(ValueError('failed'))
+        with self.assertRaises(IOError):
+            pipe.read()
+
+    def test_compress(self):
+        """
+        Confirm gzip compression while writing or reading gives back the original bytes.
+        """
+        data = b''.join(('%s,row\n' % i).encode('utf-8') for i in range(50000))
+
+        target = BytesIO()
+        writer = CompressWriter(target, 'gzip')
+        for i in range(0, len(data), 1000):
+            writer.write(data[i:i + 1000])
+        writer.close()
+        self.assertEqual(writer.size, len(target.getvalue()))
+        self.assertLess(writer.size, len(data))
+        self.assertEqual(zlib.decompress(target.getvalue(), 16 + zlib.MAX_WBITS), data)
+
+        reader = CompressReader(BytesIO(data), 'gzip')
+        chunks = []
+        while True:
+            chunk = reader.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.assertEqual(zlib.decompress(b''.join(chunks), 16 + zlib.MAX_WBITS), data)
+
+    def test_compact_zip(self):
+        """
+        Confirm only the last copy of a file added to a zip twice is kept.
+        """
+        zip_path = os.path.join(self.tmp_dir, 'processed.zip')
+        with ZipFile(zip_path, 'w') as zf:
+            zf.writestr('a.csv', b'old')
+            zf.writestr('b.csv', b'b')
+        with ZipFile(zip_path, 'a') as zf:
+            zf.writestr('a.csv', b'new')
+
+        compact_zip(zip_path)
+
+        with ZipFile(zip_path) as zf:
+            self.assertEqual(sorted(zf.namelist()), ['a.csv', 'b.csv'])
+            self.assertEqual(zf.read('a.csv'), b'new')
+
+    def test_add_files_to_zip(self):
+        """
+        Confirm files compressed in parallel make a standard archive, after anything already in it.
+        """
+        zip_path = os.path.join(self.tmp_dir, 'processed.zip')
+        with ZipFile(zip_path, 'w') as zf:
+            zf.writestr('streamed.csv', b'streamed')
+
+        contents = {}
+        for i in range(5):
+            name = '%s.csv' % i
+            contents[name] = ('%s,row\n' % i).encode('utf-8') * (10000 * i)
+            with open(os.path.join(self.tmp_dir, name), 'wb') as f:
+                f.write(contents[name])
+        add_files_to_zip(
+            zip_path,
+            [(os.path.join(self.tmp_dir, name), name) for name in sorted(contents)],
+            processes=3,
+        )
+
+        with ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ['streamed.csv'] + sorted(contents))
+            for name, data in contents.items():
+                self.assertEqual(zf.read(name), data)
+
+    def test_add_files_to_zip64(self):
+        """
+        Confirm ZIP64 records are written where sizes and offsets pass the limit, and still read.
+        """
+        zip_path = os.path.join(self.tmp_dir, 'processed.zip')
+        contents = {}
+        for i in range(3):
+            name = '%s.csv' % i
+            contents[name] = ('%s,row\n' % i).encode('utf-8') * 1000
+            with open(os.path.join(self.tmp_dir, name), 'wb') as f:
+                f.write(contents[name])
+
+        zip64_limit = archives.ZIP64_LIMIT
+        archives.ZIP64_LIMIT = 100
+        try:
+            add_files_to_zip(zip_path, [(os.path.join(self.tmp_dir, name), name) for name in sorted(contents)])
+            with ZipFile(zip_path, 'a') as zf:
+                zf.writestr('0.csv', b'replaced')
+            compact_zip(zip_path)
+        finally:
+            archives.ZIP64_LIMIT = zip64_limit
+
+        with open(zip_path, 'rb') as f:
+            self.assertIn(archives.ZIP64_END_RECORD_SIGNATURE, f.read())
+        contents['0.csv'] = b'replaced'
+        with ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), sorted(contents))
+            for name, data in contents.items():
+                self.assertEqual(zf.read(name), data)
+
+    def test_copy_archive(self):
+        """
+        Confirm a copied archive outlives the one it was copied from.
+        """
+        storage = FileSystemStorage(location=self.tmp_dir)
+        source_name = storage.save('2016-01-01/a.csv', BytesIO(b'a,row\n'))
+
+        name = copy_archive(FakeFieldFile(storage), '2016-02-01/a.csv', source_name)
+        self.assertEqual(name, '2016-02-01/a.csv')
+        storage.delete(source_name)
+        with storage.open(name, 'rb') as f:
+            self.assertEqual(f.read(), b'a,row\n')
+
+    def test_save_archive(self):
+        """
+        Confirm a pipe is saved straight to a FileSystemStorage, and through a temporary file otherwise.
+        """
+        data = b''.join(('%s,row\n' % i).encode('utf-8') for i in range(50000))
+
+        def write(pipe):
+            pipe.write(data)
+            pipe.close()
+
+        for storage in (FileSystemStorage(location=self.tmp_dir), SeekingStorage(location=self.tmp_dir)):
+            pipe = StreamPipe()
+            writer = threading.Thread(target=write, args=(pipe,))
+            writer.start()
+            name = save_archive(FakeFieldFile(storage), 'processed/a.csv', pipe)
+            writer.join()
+            with storage.open(name, 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+        self.assertTrue(can_stream(FileSystemStorage(location=self.tmp_dir)))
+        self.assertFalse(can_stream(SeekingStorage(location=self.tmp_dir)))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for caching looked up objects.
+"""
+from unittest import TestCase
+from calaccess_processed.caches import IdentityCache
+
+
+class IdentityCacheTest(TestCase):
+    """
+    Test looking up objects through an IdentityCache.
+    """
+    def test_get(self):
+        """
+        Confirm each key is looked up once until the cache is cleared.
+        """
+        lookups = []
+
+        def lookup():
+            lookups.append(1)
+            return object()
+
+        cache = IdentityCache()
+        obj = cache.get('a', lookup)
+        self.assertIs(cache.get('a', lookup), obj)
+        self.assertEqual(len(lookups), 1)
+
+        cache.clear()
+        self.assertIsNot(cache.get('a', lookup), obj)
+        self.assertEqual(len(lookups), 2)
+
+    def test_maxsize(self):
+        """
+        Confirm the least recently used object is dropped once the cache is full.
+        """
+        cache = IdentityCache(maxsize=2)
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get(key, object)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(len(cache.objects), 2)
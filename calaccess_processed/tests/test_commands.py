@@ -6,17 +6,28 @@ Unittests for management commands.
 import os
 import shutil
 import calaccess_processed
+from django.apps import apps
 from django.conf import settings
 from django.core.management import call_command
 from django.core.management.base import CommandError
-from django.db.models import Count
+from django.db import connection
+from django.db.models import Count, F
+from django.utils.six import StringIO
 from django.utils.timezone import now
 from datetime import date
 from django.test import TestCase, override_settings
 from calaccess_raw.models import RawDataVersion
 from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed.management.commands.loadcalaccessfilings import Command as LoadFilingsCommand
 from calaccess_processed import corrections
-from calaccess_processed.models import ProcessedDataVersion, ScrapedCandidateProxy
+from calaccess_processed.models import (
+    Form460Filing,
+    Form460FilingVersion,
+    Form460ScheduleASummary,
+    ProcessedDataVersion,
+    ScrapedCandidateProxy,
+)
+from calaccess_processed.stages import get_stage_list
 from calaccess_scraped.models import Candidate as ScrapedCandidate
 from calaccess_scraped.models import Proposition as ScrapedProposition
 from opencivicdata.core.models import Person
@@ -342,3 +353,130 @@ class ProcessedDataTest(TestCase):
         """
         obj = ScrapedCandidateProxy.objects.get(name='WINSTON, ALMA MARIE')
         self.assertEqual(obj.get_party().name, 'REPUBLICAN')
+
+    @override_settings(CALACCESS_STORE_ARCHIVE=False)
+    def test_incremental_load(self):
+        """
+        Confirm an incremental load finds an amended filing and replaces its rows.
+        """
+        filing_models = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if not m._meta.abstract and 'filings' in str(m)
+        ]
+        counts = dict((m, m.objects.count()) for m in filing_models)
+        version = Form460FilingVersion.objects.order_by('filing_id', 'amend_id').first()
+        self.assertNotIn(version.filing_id, LoadFilingsCommand().get_changed_filing_ids())
+
+        # Fake an amendment the processed data hasn't caught up with
+        Form460FilingVersion.objects.filter(id=version.id).update(amend_id=F('amend_id') + 100)
+        self.assertIn(version.filing_id, LoadFilingsCommand().get_changed_filing_ids())
+
+        call_command("loadcalaccessfilings", incremental=True, verbosity=0)
+
+        # Rows must have been deleted dependents first, or the deferred foreign keys fail here
+        with connection.cursor() as c:
+            c.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        self.assertTrue(
+            Form460FilingVersion.objects.filter(
+                filing_id=version.filing_id,
+                amend_id=version.amend_id,
+            ).exists()
+        )
+        self.assertNotIn(version.filing_id, LoadFilingsCommand().get_changed_filing_ids())
+        for m in filing_models:
+            self.assertEqual(m.objects.count(), counts[m], msg=m._meta.object_name)
+
+        # The stages built for the changed filings aren't left behind
+        table_names = connection.introspection.table_names()
+        for stage in get_stage_list():
+            self.assertNotIn(stage.db_table, table_names)
+
+    @override_settings(CALACCESS_STORE_ARCHIVE=False)
+    def test_swap_load(self):
+        """
+        Confirm loading with staging tables swaps them in with the live tables' structure.
+        """
+        filing_models = [
+            m for m in apps.get_app_config('calaccess_processed').get_models()
+            if not m._meta.abstract and 'filings' in str(m)
+        ]
+        counts = dict((m, m.objects.count()) for m in filing_models)
+
+        def get_structure(db_table):
+            with connection.cursor() as c:
+                c.execute('SELECT indexname FROM pg_indexes WHERE tablename = %s', [db_table])
+                indexes = set(row[0] for row in c.fetchall())
+                c.execute('SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass', [db_table])
+                constraints = set(row[0] for row in c.fetchall())
+                c.execute("SELECT pg_get_serial_sequence(%s, 'id')", [db_table])
+                sequence = c.fetchone()[0]
+            return indexes, constraints, sequence
+
+        structures = dict((m, get_structure(m._meta.db_table)) for m in filing_models)
+
+        call_command("loadcalaccessfilings", swap=True, restart=True, verbosity=0)
+
+        table_names = connection.introspection.table_names()
+        for m in filing_models:
+            db_table = m._meta.db_table
+            self.assertEqual(m.objects.count(), counts[m], msg=db_table)
+            # Same index and constraint names, and the id sequence still belongs to the table
+            self.assertEqual(get_structure(db_table), structures[m], msg=db_table)
+            self.assertNotIn('%s_staging' % db_table, table_names)
+            self.assertNotIn('%s_old' % db_table, table_names)
+
+        # Every foreign key re-pointed by a swap has been validated
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT conrelid::regclass::text, conname
+                FROM pg_constraint
+                WHERE contype = 'f'
+                AND NOT convalidated
+                """
+            )
+            self.assertEqual(c.fetchall(), [])
+
+    @override_settings(CALACCESS_STORE_ARCHIVE=False)
+    def test_unlogged_resume(self):
+        """
+        Confirm a resumed unlogged load leaves tables that finished models refer to LOGGED.
+        """
+        # Interrupt the load after a model that refers to another one finishes
+        version = LoadFilingsCommand().get_or_create_processed_version()[0]
+        version.files.update(process_finish_datetime=None)
+        version.files.update_or_create(
+            file_name=Form460ScheduleASummary._meta.object_name,
+            defaults=dict(process_finish_datetime=now()),
+        )
+
+        out = StringIO()
+        call_command("loadcalaccessfilings", unlogged=True, verbosity=1, stdout=out)
+
+        self.assertIn(" Leaving %s LOGGED" % Form460Filing._meta.db_table, out.getvalue())
+        self.assertTrue(Form460Filing.objects.exists())
+        # Every table is LOGGED again afterward
+        with connection.cursor() as c:
+            c.execute(
+                "SELECT relname FROM pg_class WHERE relkind = 'r' AND relpersistence = 'u'"
+            )
+            self.assertEqual(c.fetchall(), [])
+
+    def test_resume_archives_finished_models(self):
+        """
+        Confirm a resumed load archives a model that finished before the load was interrupted.
+        """
+        # Interrupt the load after one model finishes, before it's archived
+        version = LoadFilingsCommand().get_or_create_processed_version()[0]
+        version.files.update(process_finish_datetime=None)
+        finished_file, created = version.files.update_or_create(
+            file_name=Form460FilingVersion._meta.object_name,
+            defaults=dict(process_finish_datetime=now(), file_archive=''),
+        )
+
+        call_command("loadcalaccessfilings", verbosity=0)
+
+        processed_file = version.files.get(pk=finished_file.pk)
+        # It isn't loaded again, but it's archived
+        self.assertEqual(processed_file.process_finish_datetime, finished_file.process_finish_datetime)
+        self.assertTrue(processed_file.file_archive)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the corrections registries.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from calaccess_processed.corrections import CandidatePartyCorrections
+
+
+class CandidatePartyCorrectionsTest(TestCase):
+    """
+    Test looking up corrections to candidates' parties.
+    """
+    header = 'candidate_name,year,election_type,office,party,source\n'
+
+    def setUp(self):
+        """
+        Make a scratch corrections file.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'candidate_party.csv')
+        self.write(
+            '"WINSTON, ALMA MARIE",2014,PRIMARY,GOVERNOR,REPUBLICAN,\n'
+            '"DOE, JANE",2014,PRIMARY,GOVERNOR,,\n'
+            '"DOE, JOHN",2016,GENERAL,ASSEMBLY 01,DEMOCRATIC,\n'
+            '"DOE, JOHN",2016,GENERAL,ASSEMBLY 01,REPUBLICAN,\n',
+            mtime=1000000000,
+        )
+        self.corrections = CandidatePartyCorrections(self.path)
+
+    def tearDown(self):
+        """
+        Remove the scratch directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, rows, mtime):
+        """
+        Write rows to the corrections file and set when it was modified.
+        """
+        with open(self.path, 'w') as f:
+            f.write(self.header + rows)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_lookup(self):
+        """
+        Confirm corrections are found by name, year, election type and office.
+        """
+        get = self.corrections.get_party_name
+        self.assertEqual(get('WINSTON, ALMA MARIE', 2014, 'PRIMARY', 'GOVERNOR'), 'REPUBLICAN')
+        self.assertEqual(get('WINSTON, ALMA MARIE', '2014', 'PRIMARY', 'GOVERNOR'), 'REPUBLICAN')
+        self.assertIsNone(get('WINSTON, ALMA MARIE', 2016, 'PRIMARY', 'GOVERNOR'))
+        self.assertIsNone(get('DOE, JANE', 2014, 'PRIMARY', 'GOVERNOR'))
+        with self.assertRaises(Exception):
+            get('DOE, JOHN', 2016, 'GENERAL', 'ASSEMBLY 01')
+
+    def test_reload(self):
+        """
+        Confirm the file is only parsed again after it's modified.
+        """
+        get = self.corrections.get_party_name
+        self.assertEqual(get('WINSTON, ALMA MARIE', 2014, 'PRIMARY', 'GOVERNOR'), 'REPUBLICAN')
+
+        self.corrections.corrections = {}
+        self.assertIsNone(get('WINSTON, ALMA MARIE', 2014, 'PRIMARY', 'GOVERNOR'))
+
+        self.write('"WINSTON, ALMA MARIE",2014,PRIMARY,GOVERNOR,GREEN,\n', mtime=1000000100)
+        self.assertEqual(get('WINSTON, ALMA MARIE', 2014, 'PRIMARY', 'GOVERNOR'), 'GREEN')
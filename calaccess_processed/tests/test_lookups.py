@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the in-memory indexes of raw and filing rows.
+"""
+from datetime import date
+from unittest import TestCase
+from calaccess_processed.lookups import FilerTypeIndex, Form501Matcher
+
+
+class Filing(object):
+    """
+    A stand-in for a Form501Filing with just the fields matched on.
+    """
+    def __init__(self, filing_id, **kwargs):
+        """
+        Set the fields, defaulting to a 2016 general election filing for governor.
+        """
+        self.filing_id = filing_id
+        self.office = 'Governor'
+        self.district = None
+        self.election_year = 2016
+        self.election_type = 'GENERAL'
+        self.filer_id = '100'
+        self.last_name = 'DOE'
+        self.first_name = 'JANE'
+        self.middle_name = None
+        self.date_filed = date(2016, 1, 1)
+        self.__dict__.update(kwargs)
+
+
+class FilerTypeIndexTest(TestCase):
+    """
+    Test looking up the party, race and district of filers on a date.
+    """
+    def setUp(self):
+        """
+        Index a few filers' rows, ordered as build_index orders them.
+        """
+        self.index = FilerTypeIndex([
+            (None, date(2010, 1, 1), 16001, 30001, None),
+            (100, None, 16001, 30001, None),
+            (100, date(2010, 1, 1), 16001, 30001, None),
+            (100, date(2012, 6, 5), 16002, 30002, 17001),
+            (100, date(2012, 6, 5), 16003, 30003, 17002),
+            (200, date(2014, 1, 1), None, None, None),
+        ])
+
+    def test_unknown_filer(self):
+        """
+        Confirm filers without rows, or with ids that aren't numbers, aren't found.
+        """
+        for filer_id in (50, 150, 300, '', None, 'abc'):
+            self.assertIsNone(self.index.get(filer_id, date(2016, 1, 1)))
+
+    def test_date_boundaries(self):
+        """
+        Confirm a row is in effect from its effective date on, and not before.
+        """
+        self.assertIsNone(self.index.get(100, date(2009, 12, 31)))
+        self.assertEqual(self.index.get(100, date(2010, 1, 1)), (16001, 30001, None))
+        self.assertEqual(self.index.get('100', date(2012, 6, 4)), (16001, 30001, None))
+        self.assertEqual(self.index.get(100, date(2012, 6, 5))[0], 16003)
+        self.assertIsNone(self.index.get(200, date(2013, 12, 31)))
+        self.assertEqual(self.index.get(200, date(2014, 1, 1)), (None, None, None))
+        with self.assertRaises(ValueError):
+            self.index.get(100, None)
+
+    def test_ties(self):
+        """
+        Confirm the last of the rows effective on the same date wins.
+        """
+        self.assertEqual(self.index.get(100, date(2016, 1, 1)), (16003, 30003, 17002))
+
+    def test_unordered(self):
+        """
+        Confirm rows out of filer order are refused.
+        """
+        with self.assertRaises(ValueError):
+            FilerTypeIndex([
+                (200, date(2014, 1, 1), None, None, None),
+                (100, date(2010, 1, 1), None, None, None),
+            ])
+
+
+class Form501MatcherTest(TestCase):
+    """
+    Test matching scraped candidates to Form 501 filings in memory.
+    """
+    def get_id(self, matcher, office='GOVERNOR', district=None, year=2016, election_type='GENERAL', **kwargs):
+        """
+        Return the filing_id of the filing a candidate matches, or None.
+        """
+        filing = matcher.match(office, district, year, election_type, **kwargs)
+        return filing.filing_id if filing else None
+
+    def test_office_and_district(self):
+        """
+        Confirm the office matches regardless of case, and a null office or district only matches null.
+        """
+        matcher = Form501Matcher([
+            Filing(1),
+            Filing(2, office='State Senate', district=4),
+            Filing(3, office=None),
+        ])
+        self.assertEqual(self.get_id(matcher, filer_id='100'), 1)
+        self.assertEqual(self.get_id(matcher, 'STATE SENATE', 4, filer_id='100'), 2)
+        self.assertIsNone(self.get_id(matcher, 'STATE SENATE', 5, filer_id='100'))
+        self.assertIsNone(self.get_id(matcher, 'STATE SENATE', None, filer_id='100'))
+        self.assertEqual(self.get_id(matcher, None, filer_id='100'), 3)
+        self.assertIsNone(self.get_id(matcher, '', filer_id='100'))
+
+    def test_filer_id(self):
+        """
+        Confirm a candidate with a filer id only matches that filer's filings, whatever its name.
+        """
+        matcher = Form501Matcher([
+            Filing(1, filer_id='100', last_name='SMITH'),
+            Filing(2, filer_id='200'),
+        ])
+        self.assertEqual(self.get_id(matcher, filer_id='100', name='DOE, JANE'), 1)
+        self.assertEqual(self.get_id(matcher, filer_id='200'), 2)
+        self.assertIsNone(self.get_id(matcher, filer_id='300', name='DOE, JANE'))
+
+    def test_names(self):
+        """
+        Confirm names match "<last>, <first>" first, and "<last>, <first> <middle>" only if none do.
+        """
+        matcher = Form501Matcher([
+            Filing(1, middle_name='Q'),
+            Filing(2, last_name='ROE', first_name=None),
+            Filing(3, last_name='POE', middle_name='Q', date_filed=date(2017, 1, 1)),
+            Filing(4, last_name='POE', election_year=2018),
+        ])
+        self.assertEqual(self.get_id(matcher, name='DOE, JANE'), 1)
+        self.assertEqual(self.get_id(matcher, name='DOE, JANE Q'), 1)
+        self.assertEqual(self.get_id(matcher, name='ROE, '), 2)
+        self.assertEqual(self.get_id(matcher, name='ROE,  '), 2)
+        self.assertIsNone(self.get_id(matcher, name='DOE, JANE X'))
+        # A "<last>, <first>" match outside the election year window doesn't count
+        self.assertEqual(self.get_id(matcher, name='POE, JANE Q'), 3)
+
+    def test_election_year(self):
+        """
+        Confirm only filings for the election year or earlier match.
+        """
+        matcher = Form501Matcher([
+            Filing(1, election_year=2014, date_filed=date(2013, 1, 1)),
+            Filing(2, election_year=2016, date_filed=date(2015, 1, 1)),
+            Filing(3, election_year=2018, date_filed=date(2017, 1, 1)),
+            Filing(4, election_year=None, date_filed=date(2017, 1, 1)),
+        ])
+        self.assertIsNone(self.get_id(matcher, year=2012, filer_id='100'))
+        self.assertEqual(self.get_id(matcher, year=2014, filer_id='100'), 1)
+        self.assertEqual(self.get_id(matcher, year=2016, filer_id='100'), 2)
+        self.assertEqual(self.get_id(matcher, year=2018, filer_id='100'), 3)
+
+    def test_latest(self):
+        """
+        Confirm the latest filed matches, counting a filing without a date as the latest.
+        """
+        matcher = Form501Matcher([
+            Filing(1, date_filed=date(2016, 3, 1)),
+            Filing(2, date_filed=date(2016, 1, 1)),
+        ])
+        self.assertEqual(self.get_id(matcher, filer_id='100'), 1)
+        self.assertEqual(self.get_id(matcher, name='DOE, JANE'), 1)
+
+        matcher = Form501Matcher([
+            Filing(1, date_filed=date(2016, 3, 1)),
+            Filing(2, date_filed=None),
+        ])
+        self.assertEqual(self.get_id(matcher, filer_id='100'), 2)
+
+    def test_election_type(self):
+        """
+        Confirm filings for the same type of election come first, including a null type, then any type.
+        """
+        matcher = Form501Matcher([
+            Filing(1, election_type='PRIMARY', date_filed=date(2016, 1, 1)),
+            Filing(2, election_type='GENERAL', date_filed=date(2015, 1, 1)),
+            Filing(3, election_type=None, date_filed=date(2014, 1, 1)),
+        ])
+        self.assertEqual(self.get_id(matcher, election_type='GENERAL', filer_id='100'), 2)
+        self.assertEqual(self.get_id(matcher, election_type='PRIMARY', name='DOE, JANE'), 1)
+        self.assertEqual(self.get_id(matcher, election_type=None, filer_id='100'), 3)
+        self.assertEqual(self.get_id(matcher, election_type='SPECIAL', filer_id='100'), 1)
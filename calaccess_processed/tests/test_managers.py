@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the utilities behind processed data managers.
+"""
+from unittest import TestCase
+from calaccess_processed.managers import get_raw_table_names
+
+
+class RawTableNamesTest(TestCase):
+    """
+    Test finding the raw tables read by a raw sql query.
+    """
+    def test_raw_table_names(self):
+        """
+        Confirm only quoted table names after FROM and JOIN are found, not quoted columns.
+        """
+        sql = """
+        INSERT INTO calaccess_processed_form460filing (filing_id)
+        SELECT cvr."FILING_ID"
+        FROM "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+        LEFT JOIN
+            "FILER_FILINGS_CD" ff
+        ON cvr."FILING_ID" = ff."FILING_ID"
+        WHERE cvr."FORM_TYPE" = 'F460';
+        """
+        self.assertEqual(
+            get_raw_table_names(sql),
+            set(['CVR_CAMPAIGN_DISCLOSURE_CD', 'FILER_FILINGS_CD']),
+        )
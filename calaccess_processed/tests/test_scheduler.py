@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the load scheduler.
+"""
+from unittest import TestCase
+from calaccess_processed.scheduler import LoadScheduler, get_sql_table_names
+
+
+class LoadSchedulerTest(TestCase):
+    """
+    Test how load tasks are ordered by their dependencies.
+    """
+    def test_sql_table_names(self):
+        """
+        Confirm processed tables are extracted from a raw sql query.
+        """
+        sql = """
+        INSERT INTO calaccess_processed_form460filing (filing_id)
+        SELECT f460.filing_id
+        FROM calaccess_processed_form460filingversion f460
+        JOIN "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+        ON cvr."FILING_ID" = f460.filing_id;
+        """
+        self.assertEqual(
+            get_sql_table_names(sql),
+            set([
+                'calaccess_processed_form460filing',
+                'calaccess_processed_form460filingversion',
+            ])
+        )
+
+    def test_order(self):
+        """
+        Confirm tasks run after their dependencies, otherwise in the given order.
+        """
+        scheduler = LoadScheduler([
+            ('item', ['filing', 'item_version']),
+            ('filing', ['filing_version']),
+            ('item_version', ['filing_version', 'raw_table']),
+            ('filing_version', []),
+        ])
+        self.assertEqual(
+            scheduler.order,
+            ['filing_version', 'filing', 'item_version', 'item'],
+        )
+
+    def test_run(self):
+        """
+        Confirm callbacks are called for every task in a single process.
+        """
+        started = []
+        finished = []
+        scheduler = LoadScheduler([('b', ['a']), ('a', [])])
+        scheduler.run(
+            str.upper,
+            start_callback=started.append,
+            finish_callback=lambda name, result: finished.append(result),
+        )
+        self.assertEqual(started, ['a', 'b'])
+        self.assertEqual(finished, ['A', 'B'])
+
+    def test_circular_dependency(self):
+        """
+        Confirm circular dependencies are rejected.
+        """
+        with self.assertRaises(ValueError):
+            LoadScheduler([('a', ['b']), ('b', ['a'])])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for uploading archives in parts.
+"""
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import TestCase
+from django.core.files.storage import FileSystemStorage
+from calaccess_processed.uploads import FileSystemPartStore, upload_parts
+
+
+class FailingPartStore(FileSystemPartStore):
+    """
+    A FileSystemPartStore that fails to upload one part and counts the parts it uploads.
+    """
+    def __init__(self, storage, fail_at=None):
+        """
+        Set up failing at the part number fail_at.
+        """
+        super(FailingPartStore, self).__init__(storage)
+        self.fail_at = fail_at
+        self.uploaded = []
+
+    def upload_part(self, name, upload_id, number, data):
+        """
+        Fail at the chosen part, or upload it.
+        """
+        if number == self.fail_at:
+            raise IOError("Connection reset")
+        self.uploaded.append(number)
+        return super(FailingPartStore, self).upload_part(name, upload_id, number, data)
+
+
+class UploadPartsTest(TestCase):
+    """
+    Test uploading to a local filesystem storage in parts.
+    """
+    def setUp(self):
+        """
+        Make a scratch storage directory.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.tmp_dir)
+        self.data = b''.join(('%s,row\n' % i).encode('utf-8') for i in range(10000))
+
+    def tearDown(self):
+        """
+        Remove the scratch storage directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_resume(self):
+        """
+        Confirm a retry after a failed upload only uploads the parts that are missing.
+        """
+        completed = {}
+
+        def record(number, size, digest, etag):
+            completed[number] = (size, digest, etag)
+
+        store = FailingPartStore(self.storage, fail_at=4)
+        upload_id = store.start('a.csv')
+        with self.assertRaises(IOError):
+            upload_parts(store, 'a.csv', upload_id, BytesIO(self.data), 10000, completed, record)
+        self.assertEqual(store.uploaded, [1, 2, 3])
+
+        store = FailingPartStore(self.storage)
+        parts = upload_parts(store, 'a.csv', upload_id, BytesIO(self.data), 10000, completed, record)
+        self.assertEqual(store.uploaded, list(range(4, len(parts) + 1)))
+
+        store.complete('a.csv', upload_id, parts)
+        with self.storage.open('a.csv', 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_changed_part(self):
+        """
+        Confirm a part whose bytes changed since the failed attempt is uploaded again.
+        """
+        completed = {}
+
+        def record(number, size, digest, etag):
+            completed[number] = (size, digest, etag)
+
+        store = FailingPartStore(self.storage, fail_at=3)
+        upload_id = store.start('b.csv')
+        with self.assertRaises(IOError):
+            upload_parts(store, 'b.csv', upload_id, BytesIO(self.data), 10000, completed, record)
+
+        changed = b'x' + self.data[1:]
+        store = FailingPartStore(self.storage)
+        parts = upload_parts(store, 'b.csv', upload_id, BytesIO(changed), 10000, completed, record)
+        self.assertEqual(store.uploaded, [1] + list(range(3, len(parts) + 1)))
+
+        store.complete('b.csv', upload_id, parts)
+        with self.storage.open('b.csv', 'rb') as f:
+            self.assertEqual(f.read(), changed)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Utilities for uploading archives to storage in parts that survive a failed attempt.
+"""
+from __future__ import unicode_literals
+import os
+import abc
+import uuid
+import shutil
+import hashlib
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import six
+
+# Smallest part S3 accepts, other than the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+@six.add_metaclass(abc.ABCMeta)
+class PartStore(object):
+    """
+    Base class for uploading an object to a storage backend in numbered parts.
+
+    Subclasses start an upload, upload each part and then join the parts into
+    the object. Parts uploaded by an attempt that failed stay in place, so a
+    retry with the same upload id only has to upload the rest. They also copy
+    objects already in storage without uploading them again.
+    """
+    def __init__(self, storage):
+        """
+        Set up uploading to a Django storage backend.
+        """
+        self.storage = storage
+
+    @abc.abstractmethod
+    def start(self, name):
+        """
+        Start an upload of the object with the given name and return its upload id.
+        """
+
+    @abc.abstractmethod
+    def upload_part(self, name, upload_id, number, data):
+        """
+        Upload the bytes of a part of the object and return its entity tag.
+        """
+
+    @abc.abstractmethod
+    def complete(self, name, upload_id, parts):
+        """
+        Join a list of (part number, entity tag) tuples into the object.
+        """
+
+    @abc.abstractmethod
+    def abort(self, name, upload_id):
+        """
+        Discard an unfinished upload and its parts.
+        """
+
+    @abc.abstractmethod
+    def copy(self, source_name, name):
+        """
+        Copy the object with source_name to a new object with the given name.
+        """
+
+
+class FileSystemPartStore(PartStore):
+    """
+    Uploads an object in parts to a FileSystemStorage.
+
+    Each part is saved as a file in a directory beside the object, and joined
+    into the object when the upload is complete.
+    """
+    def get_parts_dir(self, name, upload_id):
+        """
+        Return the path of the directory holding an upload's parts.
+        """
+        return '%s.%s.parts' % (self.storage.path(name), upload_id)
+
+    def start(self, name):
+        """
+        Start an upload of the object with the given name and return its upload id.
+        """
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self.get_parts_dir(name, upload_id))
+        return upload_id
+
+    def upload_part(self, name, upload_id, number, data):
+        """
+        Save the bytes of a part of the object and return its SHA-256 hash.
+        """
+        path = os.path.join(self.get_parts_dir(name, upload_id), '%05d' % number)
+        # Write to a temporary file first, so a failure never leaves half a part
+        with open('%s.tmp' % path, 'wb') as f:
+            f.write(data)
+        os.rename('%s.tmp' % path, path)
+        return hashlib.sha256(data).hexdigest()
+
+    def complete(self, name, upload_id, parts):
+        """
+        Join the parts into the object and remove them.
+        """
+        parts_dir = self.get_parts_dir(name, upload_id)
+        path = self.storage.path(name)
+        with open('%s.tmp' % path, 'wb') as f:
+            for number, etag in parts:
+                with open(os.path.join(parts_dir, '%05d' % number), 'rb') as part:
+                    shutil.copyfileobj(part, f)
+        os.rename('%s.tmp' % path, path)
+        if self.storage.file_permissions_mode is not None:
+            os.chmod(path, self.storage.file_permissions_mode)
+        shutil.rmtree(parts_dir)
+
+    def abort(self, name, upload_id):
+        """
+        Remove the parts of an unfinished upload.
+        """
+        shutil.rmtree(self.get_parts_dir(name, upload_id), ignore_errors=True)
+
+    def copy(self, source_name, name):
+        """
+        Link the object with source_name to the given name, or copy it where files can't be linked.
+        """
+        source_path = self.storage.path(source_name)
+        path = self.storage.path(name)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        try:
+            # Archives are never changed in place, so the two names can share the data
+            os.link(source_path, path)
+        except (AttributeError, OSError):
+            shutil.copyfile(source_path, '%s.tmp' % path)
+            os.rename('%s.tmp' % path, path)
+            if self.storage.file_permissions_mode is not None:
+                os.chmod(path, self.storage.file_permissions_mode)
+
+
+class S3PartStore(PartStore):
+    """
+    Uploads an object to the S3 bucket of a django-storages S3Boto3Storage with a multipart upload.
+    """
+    def __init__(self, storage):
+        """
+        Set up uploading to the storage's bucket.
+        """
+        super(S3PartStore, self).__init__(storage)
+        self.client = storage.connection.meta.client
+        self.bucket_name = storage.bucket_name
+
+    def get_key(self, name):
+        """
+        Return the key in the bucket of the object with the given name.
+        """
+        clean_name = getattr(self.storage, '_clean_name', None)
+        if clean_name is None:
+            from storages.utils import clean_name
+        return self.storage._normalize_name(clean_name(name))
+
+    def start(self, name):
+        """
+        Start a multipart upload of the object with the given name and return its upload id.
+        """
+        return self.client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.get_key(name),
+        )['UploadId']
+
+    def upload_part(self, name, upload_id, number, data):
+        """
+        Upload the bytes of a part of the object and return its entity tag.
+        """
+        return self.client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.get_key(name),
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=data,
+        )['ETag']
+
+    def complete(self, name, upload_id, parts):
+        """
+        Join the uploaded parts into the object.
+        """
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.get_key(name),
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [{'PartNumber': number, 'ETag': etag} for number, etag in parts]
+            },
+        )
+
+    def abort(self, name, upload_id):
+        """
+        Discard an unfinished multipart upload and its parts.
+        """
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.get_key(name),
+            UploadId=upload_id,
+        )
+
+    def copy(self, source_name, name):
+        """
+        Copy the object with source_name to the given name inside the bucket, in parts if it's large.
+        """
+        self.client.copy(
+            {'Bucket': self.bucket_name, 'Key': self.get_key(source_name)},
+            self.bucket_name,
+            self.get_key(name),
+        )
+
+
+def get_part_store(storage):
+    """
+    Return a PartStore for a storage backend, or None if it can't be uploaded to in parts.
+    """
+    if isinstance(storage, FileSystemStorage):
+        return FileSystemPartStore(storage)
+    if hasattr(storage, 'bucket_name') and hasattr(storage, 'connection'):
+        return S3PartStore(storage)
+    return None
+
+
+def get_part_size():
+    """
+    Return the size of parts to upload archives in, or None if they're uploaded whole.
+
+    Comes from the CALACCESS_ARCHIVE_PART_SIZE setting, and is never smaller than
+    the 5 MB S3 requires.
+    """
+    part_size = getattr(settings, 'CALACCESS_ARCHIVE_PART_SIZE', None)
+    if not part_size:
+        return None
+    return max(part_size, MIN_PART_SIZE)
+
+
+def read_part(content, size):
+    """
+    Read size bytes from the file-like object content, or fewer only at its end.
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = content.read(remaining)
+        if not data:
+            break
+        chunks.append(data)
+        remaining -= len(data)
+    return b''.join(chunks)
+
+
+def upload_parts(store, name, upload_id, content, part_size, completed, record):
+    """
+    Upload everything read from the file-like object content to storage in parts of part_size bytes.
+
+    completed is a dict of the parts uploaded by earlier attempts, with each
+    part number mapped to a tuple (size, SHA-256 hash, entity tag). Those whose
+    bytes are the same this time aren't uploaded again. record is called with
+    the number, size, hash and entity tag of each part after it's uploaded.
+
+    Returns a list of (part number, entity tag) tuples of every part, in order.
+    """
+    parts = []
+    while True:
+        data = read_part(content, part_size)
+        # An empty object is still uploaded as one empty part
+        if not data and parts:
+            break
+        number = len(parts) + 1
+        size = len(data)
+        digest = hashlib.sha256(data).hexdigest()
+
+        previous = completed.get(number)
+        if previous and previous[0] == size and previous[1] == digest:
+            etag = previous[2]
+        else:
+            etag = store.upload_part(name, upload_id, number, data)
+            record(number, size, digest, etag)
+        parts.append((number, etag))
+        if size < part_size:
+            break
+    return parts
+
+
+def upload_archive(processed_file, field_file, archive_name, content, store, part_size):
+    """
+    Upload the contents of one of a processed file's archives in parts, resuming an earlier attempt.
+
+    The upload's id, the object's name and each uploaded part are saved to the
+    database as soon as they're known, so a retry after a failure only uploads
+    the parts that are missing or have changed.
+
+    Returns the name of the uploaded object.
+    """
+    from calaccess_processed.models.tracking import ProcessedDataFilePart
+
+    # Resume the unfinished upload of an archive with the same extension
+    name = processed_file.upload_name
+    upload_id = processed_file.upload_id
+    if upload_id and os.path.splitext(name)[1] != os.path.splitext(archive_name)[1]:
+        store.abort(name, upload_id)
+        upload_id = None
+    if not upload_id:
+        processed_file.upload_parts.all().delete()
+        name = field_file.storage.get_available_name(archive_name, max_length=field_file.field.max_length)
+        upload_id = store.start(name)
+        processed_file.upload_name = name
+        processed_file.upload_id = upload_id
+        processed_file.save(update_fields=['upload_name', 'upload_id'])
+
+    completed = dict(
+        (p.part_number, (p.size, p.sha256, p.etag)) for p in processed_file.upload_parts.all()
+    )
+
+    def record(number, size, digest, etag):
+        ProcessedDataFilePart.objects.update_or_create(
+            processed_file=processed_file,
+            part_number=number,
+            defaults=dict(size=size, sha256=digest, etag=etag),
+        )
+
+    parts = upload_parts(store, name, upload_id, content, part_size, completed, record)
+    store.complete(name, upload_id, parts)
+
+    # The upload is finished, so there's nothing left to resume
+    processed_file.upload_parts.all().delete()
+    processed_file.upload_name = ''
+    processed_file.upload_id = ''
+    processed_file.save(update_fields=['upload_name', 'upload_id'])
+    return name
@@ -52,6 +52,11 @@ from the California Secretary of State’s CAL-ACCESS database',
         'opencivicdata>=2.0',
         'psycopg2>=2.5.4',
     ),
+    extras_require={
+        'parquet': ['pyarrow>=0.15'],
+        'duckdb': ['duckdb>=0.9'],
+        'zstd': ['zstandard>=0.11'],
+    },
     cmdclass={'test': TestCommand,},
     classifiers=(
         'Development Status :: 5 - Production/Stable',